@@ -0,0 +1,110 @@
+"""Measure API cold start: import time, time to first response and agent construction.
+
+Each run starts a fresh interpreter with -X importtime, imports the app,
+runs its lifespan startup, answers GET /api/health in-process, then builds
+both agents as the first takeoff would. Reports the median of each stage
+and the slowest top-level packages by import time (self time summed per
+package), and whether pydantic_ai/openai were loaded before the first
+response.
+
+Usage (from the repository root):
+    python -m benchmarks.bench_cold_start --runs 5
+"""
+
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+from collections import defaultdict
+
+CHILD = r"""
+import time
+started = time.perf_counter()
+import asyncio, json, sys
+
+import python_api._main as main
+imported = time.perf_counter()
+
+import httpx
+
+async def first_response():
+    async with main.app.router.lifespan_context(main.app):
+        ready = time.perf_counter()
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://app") as client:
+            response = await client.get("/api/health")
+        response.raise_for_status()
+        return ready, time.perf_counter()
+
+ready, responded = asyncio.run(first_response())
+heavy = sorted(m for m in ("pydantic_ai", "openai") if m in sys.modules)
+
+from python_api.agents import get_scale_detector_agent, get_takeoff_agent
+get_takeoff_agent()
+get_scale_detector_agent()
+agents = time.perf_counter()
+
+print(json.dumps({
+    "import_ms": (imported - started) * 1000,
+    "startup_ms": (ready - imported) * 1000,
+    "first_response_ms": (responded - started) * 1000,
+    "agents_ms": (agents - responded) * 1000,
+    "heavy_before_response": heavy,
+}))
+"""
+
+IMPORT_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|(\s*)(\S+)")
+
+
+def run_once(env: dict) -> tuple[dict, dict[str, float]]:
+    start = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", CHILD],
+        capture_output=True,
+        text=True,
+        env=env,
+        check=True,
+    )
+    result = json.loads(start.stdout.strip().splitlines()[-1])
+
+    # Self time per top-level package
+    packages: dict[str, float] = defaultdict(float)
+    for line in start.stderr.splitlines():
+        match = IMPORT_LINE.match(line)
+        if match:
+            packages[match.group(4).split(".")[0]] += int(match.group(1)) / 1000
+    return result, packages
+
+
+def main(args: argparse.Namespace) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        env = {
+            **os.environ,
+            "GOOGLE_API_KEY": os.environ.get("GOOGLE_API_KEY", "benchmark"),
+            "TAKEOFF_JOB_DB": os.path.join(tmp, "jobs.sqlite3"),
+        }
+        runs = [run_once(env) for _ in range(args.runs)]
+
+    print(f"{'stage':<28}{'median ms':>10}")
+    for key in ("import_ms", "startup_ms", "first_response_ms", "agents_ms"):
+        print(f"{key:<28}{statistics.median(r[key] for r, _ in runs):>10.1f}")
+    print(f"{'heavy modules before first response':<28}: {runs[-1][0]['heavy_before_response'] or 'none'}")
+
+    totals: dict[str, list[float]] = defaultdict(list)
+    for _, packages in runs:
+        for name, ms in packages.items():
+            totals[name].append(ms)
+    print(f"\n{'package (self time)':<28}{'median ms':>10}")
+    ranked = sorted(totals.items(), key=lambda kv: -statistics.median(kv[1]))
+    for name, values in ranked[: args.top]:
+        print(f"{name:<28}{statistics.median(values):>10.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=12)
+    main(parser.parse_args())
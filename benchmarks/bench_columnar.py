@@ -0,0 +1,108 @@
+"""Benchmark takeoff result serialization: JSON against columnar msgpack.
+
+For results of each size, times encoding from TakeoffResult models (the
+/analyze path) and from the stored JSON (the job path: JSON is spliced
+in as stored; columns are built from the parsed JSON, and the old way
+validates it into models first). Reports payload sizes, gzipped as well,
+since both would usually go out compressed.
+
+Usage (from the repository root):
+    python -m benchmarks.bench_columnar --items 1000 10000 100000
+"""
+
+import argparse
+import gzip
+import json
+import random
+import time
+
+from python_api.models import TakeoffItem, TakeoffResult
+from python_api.services import ColumnarService, SummaryService
+
+NAMES = [
+    "Interior Door 3'-0\" x 6'-8\"", "Exterior Door", "Window Type A", "Window Type B",
+    "Interior Partition", "Exterior Wall", "Base Trim", "Floor Finish", "Ceiling Tile",
+    "Duplex Outlet", "Light Fixture", "Sprinkler Head", "Slab on Grade", "Footing",
+]
+KINDS = [("count", "ea"), ("linear", "LF"), ("area", "SF"), ("volume", "CY")]
+
+
+def build_result(count: int, seed: int = 0) -> TakeoffResult:
+    rng = random.Random(seed)
+    items = []
+    for i in range(count):
+        category, unit = KINDS[i % len(KINDS)]
+        items.append(TakeoffItem(
+            name=rng.choice(NAMES),
+            category=category,
+            quantity=round(rng.uniform(1, 500), 2),
+            unit=unit,
+            location=f"Page {1 + i // 400} - Room {100 + rng.randrange(60)}",
+            notes="Verify in field" if rng.random() < 0.1 else None,
+            confidence=round(rng.uniform(0.6, 0.99), 2),
+        ))
+    summary, type_totals = SummaryService.summarize(items)
+    return TakeoffResult(items=items, summary=summary, type_totals=type_totals, page_count=1 + count // 400)
+
+
+def best_ms(fn, repeats: int) -> float:
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return round(min(timings) * 1000, 2)
+
+
+def run_case(count: int, repeats: int) -> dict:
+    result = build_result(count)
+    stored = result.model_dump_json()
+    json_body = stored.encode()
+    msgpack_body = ColumnarService.encode_result(result)
+
+    # Round trip check
+    decoded = ColumnarService.decode_items(
+        ColumnarService.stored_result_columns(stored)["items"]
+    )
+    assert decoded == [item.model_dump(mode="json") for item in result.items]
+
+    return {
+        "items": count,
+        "json_kb": round(len(json_body) / 1024, 1),
+        "msgpack_kb": round(len(msgpack_body) / 1024, 1),
+        "json_gzip_kb": round(len(gzip.compress(json_body, 6)) / 1024, 1),
+        "msgpack_gzip_kb": round(len(gzip.compress(msgpack_body, 6)) / 1024, 1),
+        # From models (/analyze)
+        "json_ms": best_ms(lambda: result.model_dump_json(), repeats),
+        "msgpack_ms": best_ms(lambda: ColumnarService.encode_result(result), repeats),
+        # From stored JSON (jobs): validating into models first, against columns from parsed JSON
+        "stored_models_msgpack_ms": best_ms(
+            lambda: ColumnarService.encode_result(TakeoffResult.model_validate_json(stored)), repeats
+        ),
+        "stored_msgpack_ms": best_ms(
+            lambda: ColumnarService.pack(ColumnarService.stored_result_columns(stored)), repeats
+        ),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--items", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    parser.add_argument("--repeats", type=int, default=5, help="Runs per measurement")
+    parser.add_argument("--json", action="store_true", help="Print machine-readable JSON")
+    args = parser.parse_args()
+
+    results = [run_case(count, args.repeats) for count in args.items]
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print(
+            f"{'items':>7} {'JSON KB':>8} {'mpk KB':>8} {'JSON gz':>8} {'mpk gz':>7} "
+            f"{'JSON ms':>8} {'mpk ms':>7} {'stored->models->mpk':>20} {'stored->mpk':>12}"
+        )
+        for r in results:
+            print(
+                f"{r['items']:>7} {r['json_kb']:>8} {r['msgpack_kb']:>8} {r['json_gzip_kb']:>8} "
+                f"{r['msgpack_gzip_kb']:>7} {r['json_ms']:>8} {r['msgpack_ms']:>7} "
+                f"{r['stored_models_msgpack_ms']:>20} {r['stored_msgpack_ms']:>12}"
+            )
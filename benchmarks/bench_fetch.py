@@ -0,0 +1,165 @@
+"""Benchmark blueprint fetch latency: per-request client vs the pooled FileService client.
+
+Serves a blueprint-sized payload from a local HTTP(S) server and fetches it
+with N concurrent requests, once creating a fresh httpx.AsyncClient per
+request (the previous FileService behaviour) and once through the shared,
+lifespan-managed client.
+
+Usage (from the repository root):
+    python -m benchmarks.bench_fetch --concurrency 64 --requests 1000 --tls
+"""
+
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import ssl
+import statistics
+import subprocess
+import tempfile
+import time
+
+import httpx
+
+from python_api.services import FileService
+
+
+async def _handle_connection(reader: asyncio.StreamReader, writer: asyncio.StreamWriter, response: bytes) -> None:
+    """Answer every GET on a keep-alive connection with the same blob."""
+    try:
+        while await reader.readuntil(b"\r\n\r\n"):
+            writer.write(response)
+            await writer.drain()
+    except (asyncio.IncompleteReadError, ConnectionError, ssl.SSLError):
+        pass
+    finally:
+        writer.close()
+
+
+def _make_cert(directory: str) -> tuple[str, str]:
+    """Create a throwaway cert that clients trust via SSL_CERT_FILE."""
+    cert = os.path.join(directory, "cert.pem")
+    key = os.path.join(directory, "key.pem")
+    subprocess.run(
+        [
+            "openssl", "req", "-x509", "-newkey", "rsa:2048", "-nodes",
+            "-keyout", key, "-out", cert, "-days", "1", "-subj", "/CN=127.0.0.1",
+            "-addext", "subjectAltName=IP:127.0.0.1",
+        ],
+        check=True,
+        capture_output=True,
+    )
+    os.environ["SSL_CERT_FILE"] = cert
+    return cert, key
+
+
+def _serve(port_queue: multiprocessing.Queue, payload_size: int, cert: tuple[str, str] | None) -> None:
+    payload = os.urandom(payload_size)
+    response = (
+        b"HTTP/1.1 200 OK\r\nContent-Type: application/pdf\r\n"
+        + f"Content-Length: {len(payload)}\r\n\r\n".encode()
+        + payload
+    )
+
+    context = None
+    if cert:
+        context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+        context.load_cert_chain(*cert)
+
+    async def run() -> None:
+        server = await asyncio.start_server(
+            lambda r, w: _handle_connection(r, w, response),
+            "127.0.0.1", 0, ssl=context, backlog=1024,
+        )
+        port_queue.put(server.sockets[0].getsockname()[1])
+        await server.serve_forever()
+
+    asyncio.run(run())
+
+
+def start_server(payload_size: int, tls: bool) -> tuple[str, multiprocessing.Process]:
+    """Start a local asyncio blob server in its own process (so it doesn't share our GIL)."""
+    cert = _make_cert(tempfile.mkdtemp()) if tls else None
+    port_queue: multiprocessing.Queue = multiprocessing.Queue()
+    process = multiprocessing.Process(target=_serve, args=(port_queue, payload_size, cert), daemon=True)
+    process.start()
+    port = port_queue.get(timeout=10)
+    scheme = "https" if tls else "http"
+    return f"{scheme}://127.0.0.1:{port}/blueprint.pdf", process
+
+
+async def fetch_per_request(url: str) -> bytes:
+    """Previous behaviour: a new client (and connection) for every fetch."""
+    async with httpx.AsyncClient() as client:
+        response = await client.get(url, timeout=60.0)
+        response.raise_for_status()
+        return response.content
+
+
+async def run_mode(name: str, fetch, url: str, requests: int, concurrency: int) -> dict:
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: list[float] = []
+
+    # One untimed wave so a long-lived pool is measured in its steady state
+    await asyncio.gather(*(fetch(url) for _ in range(concurrency)))
+
+    async def one():
+        async with semaphore:
+            start = time.perf_counter()
+            await fetch(url)
+            latencies.append((time.perf_counter() - start) * 1000)
+
+    wall_start = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(requests)))
+    wall = time.perf_counter() - wall_start
+
+    latencies.sort()
+    return {
+        "mode": name,
+        "requests": requests,
+        "concurrency": concurrency,
+        "p50_ms": round(statistics.median(latencies), 2),
+        "p95_ms": round(latencies[int(len(latencies) * 0.95) - 1], 2),
+        "p99_ms": round(latencies[int(len(latencies) * 0.99) - 1], 2),
+        "requests_per_sec": round(requests / wall, 1),
+    }
+
+
+async def main(args: argparse.Namespace) -> list[dict]:
+    url, server = start_server(args.payload_kb * 1024, args.tls)
+
+    try:
+        results = [
+            await run_mode("per-request client", fetch_per_request, url, args.requests, args.concurrency)
+        ]
+
+        await FileService.startup()
+        results.append(
+            await run_mode("pooled client", FileService.fetch_file, url, args.requests, args.concurrency)
+        )
+    finally:
+        await FileService.shutdown()
+        server.terminate()
+
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--payload-kb", type=int, default=256)
+    parser.add_argument("--tls", action="store_true", help="Serve over HTTPS with a self-signed cert")
+    parser.add_argument("--json", action="store_true", help="Print machine-readable JSON")
+    args = parser.parse_args()
+
+    results = asyncio.run(main(args))
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        for r in results:
+            print(
+                f"{r['mode']:<20} p50={r['p50_ms']:>8.2f}ms p95={r['p95_ms']:>8.2f}ms "
+                f"p99={r['p99_ms']:>8.2f}ms  {r['requests_per_sec']:>8.1f} req/s"
+            )
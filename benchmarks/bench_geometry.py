@@ -0,0 +1,59 @@
+"""Benchmark vector geometry extraction: time to measure sheets of growing size.
+
+Builds synthetic floor plans with the given numbers of stroked wall
+segments (plus one closed room per 50 segments) and times
+GeometryService.measure on each, from PDF bytes to TakeoffItems. Content
+streams are compressed, so the time includes inflating them.
+
+Usage (from the repository root):
+    python -m benchmarks.bench_geometry --segments 10000 100000 300000
+"""
+
+import argparse
+import json
+import statistics
+import time
+
+from benchmarks.samples import build_pdf, floor_plan_content
+from python_api.models import ScaleInfo
+from python_api.services import GeometryService
+
+SCALE = ScaleInfo(scale_string="1/4\" = 1'-0\"")
+
+
+def run_case(segments: int, repeats: int) -> dict:
+    pdf = build_pdf([floor_plan_content(1, segments=segments, rooms=segments // 50)])
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        items = GeometryService.measure(pdf, SCALE)
+        timings.append(time.perf_counter() - start)
+
+    best = min(timings)
+    return {
+        "segments": segments,
+        "pdf_kb": round(len(pdf) / 1024, 1),
+        "items": len(items),
+        "best_ms": round(best * 1000, 1),
+        "median_ms": round(statistics.median(timings) * 1000, 1),
+        "segments_per_sec": round(segments / best),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--segments", type=int, nargs="+", default=[10_000, 100_000, 300_000])
+    parser.add_argument("--repeats", type=int, default=5, help="Runs per sheet size")
+    parser.add_argument("--json", action="store_true", help="Print machine-readable JSON")
+    args = parser.parse_args()
+
+    results = [run_case(segments, args.repeats) for segments in args.segments]
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print(f"{'segments':>9} {'PDF KB':>8} {'items':>5} {'best ms':>8} {'median ms':>9} {'segments/s':>11}")
+        for r in results:
+            print(
+                f"{r['segments']:>9} {r['pdf_kb']:>8} {r['items']:>5} {r['best_ms']:>8} "
+                f"{r['median_ms']:>9} {r['segments_per_sec']:>11}"
+            )
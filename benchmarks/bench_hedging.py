@@ -0,0 +1,78 @@
+"""Simulate hedged scale detection calls against a long-tailed upstream.
+
+Most simulated calls take --latency seconds (with some jitter); a
+--slow-rate fraction take --slow-factor times longer. The same call
+sequence is run with and without Hedger, and p50/p95/p99 latency and the
+extra requests sent are reported.
+
+Usage (from the repository root):
+    python -m benchmarks.bench_hedging --calls 400 --budget 0.05
+"""
+
+import argparse
+import asyncio
+import random
+import time
+
+from python_api.agents import Hedger
+
+
+def percentile(values: list[float], q: float) -> float:
+    ordered = sorted(values)
+    return ordered[int(q * (len(ordered) - 1))]
+
+
+async def run(args: argparse.Namespace, hedged: bool) -> dict:
+    rng = random.Random(args.seed)
+    hedger = Hedger("bench", budget=args.budget)
+    sent = 0
+
+    async def call() -> None:
+        nonlocal sent
+        sent += 1
+        duration = args.latency * rng.uniform(0.8, 1.3)
+        if rng.random() < args.slow_rate:
+            duration *= args.slow_factor
+        await asyncio.sleep(duration)
+
+    latencies = []
+    for _ in range(args.calls // args.concurrency):
+        async def one() -> None:
+            started = time.perf_counter()
+            if hedged:
+                await hedger.run(call)
+            else:
+                await call()
+            latencies.append(time.perf_counter() - started)
+
+        await asyncio.gather(*(one() for _ in range(args.concurrency)))
+
+    stats = hedger.stats()
+    return {
+        "case": "hedged" if hedged else "plain",
+        "p50": round(percentile(latencies, 0.5), 3),
+        "p95": round(percentile(latencies, 0.95), 3),
+        "p99": round(percentile(latencies, 0.99), 3),
+        "extra_requests": f"{(sent - len(latencies)) / len(latencies):.1%}",
+        "hedges_won": f"{stats['won']}/{stats['fired']}" if hedged else "-",
+    }
+
+
+async def main(args: argparse.Namespace) -> None:
+    rows = [await run(args, hedged=False), await run(args, hedged=True)]
+    columns = list(rows[0])
+    print("  ".join(f"{c:>14}" for c in columns))
+    for row in rows:
+        print("  ".join(f"{row[c]!s:>14}" for c in columns))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--calls", type=int, default=400)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--latency", type=float, default=0.05, help="Typical seconds per call")
+    parser.add_argument("--slow-rate", type=float, default=0.03)
+    parser.add_argument("--slow-factor", type=float, default=10)
+    parser.add_argument("--budget", type=float, default=0.05)
+    parser.add_argument("--seed", type=int, default=7)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,355 @@
+"""Offline load test of the takeoff API with a stubbed model and a local blob server.
+
+Starts the API in a subprocess with both agents pointed at stub models
+(fixed latency, token rate and output size; see stub_model.py). A local
+blob server in its own process serves sample blueprints. Each endpoint is
+then driven at increasing concurrency:
+
+- /takeoff/analyze
+- /takeoff/stream
+- /takeoff/detect-scale
+
+Every blob URL carries a nonce, and the server appends it to the file.
+Requests therefore never hit the result cache and never coalesce with
+each other, so each one pays for a full fetch and model run. The sample
+PDF has a text layer with a scale notation, so /detect-scale answers it
+without the model; use --file png to send scale detection to the model
+as well.
+
+Reports per endpoint and concurrency level:
+
+- p50/p95/p99 latency
+- time to first event (the first SSE event for /stream, response headers
+  otherwise) and, for /stream, time to the first item
+- requests/sec and errors
+- peak RSS of the API process during the level
+
+Results are printed as a table, or as JSON (with the git commit and
+settings) to compare across commits.
+
+Usage (from the repository root):
+    python -m benchmarks.bench_load --concurrency 1,8,32 --requests 32
+    python -m benchmarks.bench_load --json --output load.json
+"""
+
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from urllib.parse import parse_qs, urlsplit
+
+import httpx
+
+ENDPOINTS = ["analyze", "stream", "detect-scale"]
+
+
+# Local blob server
+
+def _sample_files(pages: int) -> dict[str, tuple[str, bytes]]:
+    from benchmarks.samples import floor_plan_pdf, scanned_plan_png
+
+    return {
+        "/plan.pdf": ("application/pdf", floor_plan_pdf(pages)),
+        "/scan.png": ("image/png", scanned_plan_png(2400, 1600)),
+    }
+
+
+async def _handle_blob(reader: asyncio.StreamReader, writer: asyncio.StreamWriter, files: dict) -> None:
+    """Serve sample files on a keep-alive connection, appending the URL's nonce."""
+    try:
+        while True:
+            head = await reader.readuntil(b"\r\n\r\n")
+            target = urlsplit(head.split(b" ", 2)[1].decode())
+            if target.path not in files:
+                writer.write(b"HTTP/1.1 404 Not Found\r\nContent-Length: 0\r\n\r\n")
+                continue
+            content_type, body = files[target.path]
+            nonce = parse_qs(target.query).get("n", [""])[0]
+            # Trailing bytes after %%EOF / IEND are ignored by readers
+            body += f"\n%{nonce}\n".encode()
+            writer.write(
+                f"HTTP/1.1 200 OK\r\nContent-Type: {content_type}\r\n"
+                f"Content-Length: {len(body)}\r\n\r\n".encode() + body
+            )
+            await writer.drain()
+    except (asyncio.IncompleteReadError, ConnectionError):
+        pass
+    finally:
+        writer.close()
+
+
+def _serve_blobs(port_queue: multiprocessing.Queue, pages: int) -> None:
+    files = _sample_files(pages)
+
+    async def run() -> None:
+        server = await asyncio.start_server(
+            lambda r, w: _handle_blob(r, w, files), "127.0.0.1", 0, backlog=1024
+        )
+        port_queue.put(server.sockets[0].getsockname()[1])
+        await server.serve_forever()
+
+    asyncio.run(run())
+
+
+def start_blob_server(pages: int) -> tuple[str, multiprocessing.Process]:
+    """Start the blob server in its own process (so it doesn't share the driver's GIL)."""
+    port_queue: multiprocessing.Queue = multiprocessing.Queue()
+    process = multiprocessing.Process(target=_serve_blobs, args=(port_queue, pages), daemon=True)
+    process.start()
+    return f"http://127.0.0.1:{port_queue.get(timeout=60)}", process
+
+
+# API under test
+
+def serve_api(args: argparse.Namespace) -> None:
+    """Run the API with stub models (the --serve side of this script)."""
+    import uvicorn
+
+    from benchmarks.stub_model import StubConfig, install
+    from python_api._main import app
+
+    install(StubConfig(
+        latency=args.latency,
+        tokens_per_sec=args.tokens_per_sec,
+        items=args.items,
+    ))
+    uvicorn.run(app, host="127.0.0.1", port=args.port, log_level="warning", access_log=False)
+
+
+def start_api(args: argparse.Namespace, env: dict) -> tuple[str, subprocess.Popen]:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+
+    process = subprocess.Popen(
+        [
+            sys.executable, "-m", "benchmarks.bench_load", "--serve",
+            "--port", str(port),
+            "--latency", str(args.latency),
+            "--tokens-per-sec", str(args.tokens_per_sec),
+            "--items", str(args.items),
+        ],
+        env=env,
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        try:
+            httpx.get(f"{base_url}/api/health").raise_for_status()
+            return base_url, process
+        except httpx.HTTPError:
+            time.sleep(0.2)
+    process.kill()
+    raise RuntimeError("API did not start")
+
+
+def read_rss_mb(pid: int) -> float | None:
+    """Resident set size of a process (Linux only)."""
+    try:
+        with open(f"/proc/{pid}/status") as status:
+            for line in status:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return None
+
+
+# Load driver
+
+def percentile(values: list[float], q: float) -> float:
+    ordered = sorted(values)
+    return ordered[int(q * (len(ordered) - 1))] if ordered else 0.0
+
+
+async def call(client: httpx.AsyncClient, endpoint: str, blob_url: str) -> tuple[float, float | None]:
+    """Make one request; returns time to first event and time to first item (stream only)."""
+    started = time.perf_counter()
+    if endpoint == "detect-scale":
+        response = await client.post("/takeoff/detect-scale", params={"blueprint_url": blob_url})
+        first = time.perf_counter() - started
+        response.raise_for_status()
+        return first, None
+
+    body = {"blueprint_url": blob_url}
+    if endpoint == "analyze":
+        response = await client.post("/takeoff/analyze", json=body)
+        first = time.perf_counter() - started
+        response.raise_for_status()
+        return first, None
+
+    first = first_item = None
+    event = None
+    async with client.stream("POST", "/takeoff/stream", json=body) as response:
+        response.raise_for_status()
+        async for line in response.aiter_lines():
+            if line.startswith("event:"):
+                event = line[6:].strip()
+                if first is None:
+                    first = time.perf_counter() - started
+                if event == "item" and first_item is None:
+                    first_item = time.perf_counter() - started
+            elif event == "error" and line.startswith("data:"):
+                raise RuntimeError(line[5:].strip())
+    return first, first_item
+
+
+async def run_level(
+    client: httpx.AsyncClient, endpoint: str, blob_url: str, concurrency: int, requests: int, pid: int
+) -> dict:
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: list[float] = []
+    firsts: list[float] = []
+    first_items: list[float] = []
+    errors = 0
+    peak_rss = read_rss_mb(pid) or 0.0
+
+    async def one(i: int) -> None:
+        nonlocal errors
+        async with semaphore:
+            started = time.perf_counter()
+            try:
+                first, first_item = await call(client, endpoint, f"{blob_url}?n={endpoint}-{concurrency}-{i}")
+            except (httpx.HTTPError, RuntimeError):
+                errors += 1
+                return
+            latencies.append(time.perf_counter() - started)
+            firsts.append(first)
+            if first_item is not None:
+                first_items.append(first_item)
+
+    async def sample_rss() -> None:
+        nonlocal peak_rss
+        while True:
+            peak_rss = max(peak_rss, read_rss_mb(pid) or 0.0)
+            await asyncio.sleep(0.05)
+
+    sampler = asyncio.create_task(sample_rss())
+    wall_started = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(requests)))
+    wall = time.perf_counter() - wall_started
+    sampler.cancel()
+
+    def ms(values: list[float], q: float) -> float:
+        return round(percentile(values, q) * 1000, 1)
+
+    return {
+        "endpoint": endpoint,
+        "concurrency": concurrency,
+        "requests": requests,
+        "errors": errors,
+        "p50_ms": ms(latencies, 0.5),
+        "p95_ms": ms(latencies, 0.95),
+        "p99_ms": ms(latencies, 0.99),
+        "first_event_p50_ms": ms(firsts, 0.5),
+        "first_item_p50_ms": ms(first_items, 0.5) if first_items else None,
+        "requests_per_sec": round(len(latencies) / wall, 2),
+        "peak_rss_mb": round(peak_rss, 1),
+    }
+
+
+def git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def drive(args: argparse.Namespace, base_url: str, blob_base: str, pid: int) -> list[dict]:
+    blob_url = f"{blob_base}/{'scan.png' if args.file == 'png' else 'plan.pdf'}"
+    levels = [int(c) for c in args.concurrency.split(",")]
+    limits = httpx.Limits(max_connections=max(levels) * 2)
+    rows = []
+    async with httpx.AsyncClient(base_url=base_url, timeout=300, limits=limits) as client:
+        # Warm up imports, the agents and the connection pools
+        for endpoint in args.endpoints:
+            await call(client, endpoint, f"{blob_url}?n=warmup-{endpoint}")
+
+        for endpoint in args.endpoints:
+            for concurrency in levels:
+                requests = max(args.requests, concurrency)
+                row = await run_level(client, endpoint, blob_url, concurrency, requests, pid)
+                rows.append(row)
+                if not args.json:
+                    print_row(row, header=len(rows) == 1)
+    return rows
+
+
+COLUMNS = [
+    ("endpoint", 14), ("concurrency", 12), ("errors", 7), ("p50_ms", 9), ("p95_ms", 9),
+    ("p99_ms", 9), ("first_event_p50_ms", 19), ("first_item_p50_ms", 18),
+    ("requests_per_sec", 17), ("peak_rss_mb", 12),
+]
+
+
+def print_row(row: dict, header: bool = False) -> None:
+    if header:
+        print("".join(f"{name:>{width}}" for name, width in COLUMNS))
+    print("".join(f"{row[name] if row[name] is not None else '-'!s:>{width}}" for name, width in COLUMNS))
+
+
+def main(args: argparse.Namespace) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        env = {
+            **os.environ,
+            "GOOGLE_API_KEY": os.environ.get("GOOGLE_API_KEY", "benchmark"),
+            "TAKEOFF_JOB_DB": os.path.join(tmp, "jobs.sqlite3"),
+        }
+        blob_base, blob_server = start_blob_server(args.pages)
+        base_url, api = start_api(args, env)
+        try:
+            rows = asyncio.run(drive(args, base_url, blob_base, api.pid))
+        finally:
+            api.terminate()
+            api.wait()
+            blob_server.terminate()
+
+    if args.json:
+        report = {
+            "commit": git_commit(),
+            "settings": {
+                "file": args.file,
+                "pages": args.pages,
+                "latency": args.latency,
+                "tokens_per_sec": args.tokens_per_sec,
+                "items": args.items,
+            },
+            "results": rows,
+        }
+        output = json.dumps(report, indent=2)
+        if args.output:
+            with open(args.output, "w") as f:
+                f.write(output + "\n")
+        else:
+            print(output)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--concurrency", default="1,8,32", help="Comma-separated concurrency levels")
+    parser.add_argument("--requests", type=int, default=32, help="Requests per level (at least the concurrency)")
+    parser.add_argument("--endpoints", nargs="+", choices=ENDPOINTS, default=ENDPOINTS)
+    parser.add_argument("--file", choices=["pdf", "png"], default="pdf")
+    parser.add_argument("--pages", type=int, default=1, help="Sheets in the sample PDF")
+    parser.add_argument("--latency", type=float, default=0.5, help="Stub model seconds to first token")
+    parser.add_argument("--tokens-per-sec", type=float, default=500.0, help="Stub model output rate")
+    parser.add_argument("--items", type=int, default=20, help="Takeoff items in each stub response")
+    parser.add_argument("--json", action="store_true", help="Print machine-readable JSON")
+    parser.add_argument("--output", help="Write the JSON report to this file")
+    parser.add_argument("--serve", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--port", type=int, default=0, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        serve_api(args)
+    else:
+        args.json = args.json or bool(args.output)
+        main(args)
@@ -0,0 +1,143 @@
+"""Benchmark prepared documents: bytes sent upstream and latency, inline against a stand-in file store.
+
+Runs the auto-scale takeoff the way the API does: scale detection (the
+title-block crops aren't confident, so the whole page follows) overlapping
+a takeoff whose first turn calls tools and whose second writes the items.
+Both stub models take a fixed base latency plus the time to send their
+request over the uplink. Documents are sent inline (every request carries
+the base64 file, encoded once) or uploaded once to LocalFileStore, which
+takes the same uplink time per upload, and referred to by handle.
+
+Production sends documents inline: the model path (Gemini's
+OpenAI-compatible endpoint) can't resolve file handles. The store rows show
+what a provider file store would save, not what the API does today.
+
+Usage (from the repository root):
+    python -m benchmarks.bench_prepared --uplink-mbps 20 --base-ms 800
+"""
+
+import argparse
+import asyncio
+import json
+import time
+
+from pydantic_ai.messages import ModelResponse, ToolCallPart
+from pydantic_ai.models.function import AgentInfo, FunctionModel
+
+from benchmarks.samples import scanned_plan_pdf, scanned_plan_png
+from benchmarks.stub_model import scale_output, takeoff_output
+from python_api.agents import ScheduledModel, get_scale_detector_agent, get_takeoff_agent
+from python_api.agents.provider import request_bytes
+from python_api.models import TakeoffRequest
+from python_api.routers.takeoffs import _resolve_scale
+from python_api.services import PreparedDocument, StageTimer, TakeoffService, current_timer
+from python_api.services.document_service import LocalFileStore
+
+
+class SlowFileStore(LocalFileStore):
+    """The local store, taking as long to upload as the uplink would."""
+
+    def __init__(self, uplink_mbps: float):
+        super().__init__()
+        self.uplink_mbps = uplink_mbps
+
+    async def upload(self, data, media_type: str, digest: str) -> str:
+        await asyncio.sleep(len(data) * 8 / (self.uplink_mbps * 1_000_000))
+        return await super().upload(data, media_type, digest)
+
+
+async def send(messages, args: argparse.Namespace) -> None:
+    await asyncio.sleep(args.base_ms / 1000 + request_bytes(messages) * 8 / (args.uplink_mbps * 1_000_000))
+
+
+def scale_model(args: argparse.Namespace) -> FunctionModel:
+    """Unsure from the crops, sure from the whole page."""
+    async def respond(messages, info: AgentInfo) -> ModelResponse:
+        await send(messages, args)
+        output = scale_output()
+        if "crops" in str(messages[0].parts[0].content[0]):
+            output["scale_info"]["confidence"] = 0.6
+        return ModelResponse(parts=[ToolCallPart(info.output_tools[0].name, output)])
+
+    return FunctionModel(respond)
+
+
+def takeoff_model(args: argparse.Namespace) -> FunctionModel:
+    """Calls the scale and area tools, then writes the items."""
+    async def respond(messages, info: AgentInfo) -> ModelResponse:
+        await send(messages, args)
+        if len(messages) == 1:
+            tools = {tool.name for tool in info.function_tools}
+            calls = [ToolCallPart("calculate_areas", {"lengths": [12.0, 14.5], "widths": [10.0, 11.0]})]
+            if "get_scale" in tools:
+                calls.append(ToolCallPart("get_scale", {}))
+            return ModelResponse(parts=calls)
+        return ModelResponse(parts=[ToolCallPart(info.output_tools[0].name, takeoff_output(20))])
+
+    return FunctionModel(respond)
+
+
+async def run_case(name: str, data: bytes, store: str, args: argparse.Namespace) -> dict:
+    PreparedDocument.store = SlowFileStore(args.uplink_mbps) if store == "local" else None
+    request = TakeoffRequest(blueprint_url=f"https://example.com/{name}", auto_detect_scale=True)
+
+    timer = StageTimer("bench")
+    token = current_timer.set(timer)
+    try:
+        with (
+            get_scale_detector_agent().override(model=ScheduledModel(scale_model(args))),
+            get_takeoff_agent().override(model=ScheduledModel(takeoff_model(args))),
+        ):
+            start = time.perf_counter()
+            document = PreparedDocument(data)
+            scale, _, scale_task = await _resolve_scale(request, document)
+            await TakeoffService.run(document, scale, None, scale_task)
+            if scale_task:
+                await scale_task
+            total_s = time.perf_counter() - start
+    finally:
+        current_timer.reset(token)
+        PreparedDocument.store = None
+
+    sent = timer.upstream_bytes
+    return {
+        "sample": name,
+        "store": store,
+        "input_kb": round(len(data) / 1024, 1),
+        "model_requests": timer.model_requests,
+        "request_kb": round(sent.get("model_request", 0) / 1024, 1),
+        "upload_kb": round(sent.get("file_upload", 0) / 1024, 1),
+        "upstream_kb": round(sum(sent.values()) / 1024, 1),
+        "end_to_end_ms": round(total_s * 1000, 1),
+    }
+
+
+async def main(args: argparse.Namespace) -> list[dict]:
+    samples = {"scan-png": scanned_plan_png(), "scan-pdf": scanned_plan_pdf()}
+    results = []
+    for name, data in samples.items():
+        for store in ("inline", "local"):
+            results.append(await run_case(name, data, store, args))
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--base-ms", type=float, default=800, help="Fixed model latency per call")
+    parser.add_argument("--uplink-mbps", type=float, default=20, help="Upload bandwidth to the model API")
+    parser.add_argument("--json", action="store_true", help="Print machine-readable JSON")
+    args = parser.parse_args()
+
+    results = asyncio.run(main(args))
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print(
+            f"{'sample':<9} {'store':<7} {'input KB':>9} {'requests':>8} {'request KB':>11} "
+            f"{'upload KB':>10} {'upstream KB':>12} {'e2e ms':>9}"
+        )
+        for r in results:
+            print(
+                f"{r['sample']:<9} {r['store']:<7} {r['input_kb']:>9} {r['model_requests']:>8} "
+                f"{r['request_kb']:>11} {r['upload_kb']:>10} {r['upstream_kb']:>12} {r['end_to_end_ms']:>9}"
+            )
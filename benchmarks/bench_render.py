@@ -0,0 +1,104 @@
+"""Benchmark render profiles: model payload size, render time and end-to-end latency.
+
+Prepares synthetic vector sheets and raster scans with each render profile
+(and with the original file) and runs the takeoff against a stubbed model
+whose latency is a fixed base cost plus upload time for the payload bytes,
+so the end-to-end number reflects what shrinking the payload buys.
+
+Usage (from the repository root):
+    python -m benchmarks.bench_render --uplink-mbps 20 --base-ms 1500
+"""
+
+import argparse
+import asyncio
+import json
+import time
+
+from pydantic_ai.messages import BinaryContent, ModelResponse, ToolCallPart
+from pydantic_ai.models.function import AgentInfo, FunctionModel
+
+from benchmarks.samples import floor_plan_pdf, scanned_plan_pdf, scanned_plan_png
+from python_api.agents import get_takeoff_agent
+from python_api.services import RasterService, TakeoffService
+
+PROFILES = [None, "fast", "balanced", "accurate"]
+
+
+def payload_bytes(messages) -> int:
+    """Total size of the binary attachments in a request."""
+    total = 0
+    for message in messages:
+        for part in getattr(message, "parts", []):
+            content = getattr(part, "content", None)
+            if isinstance(content, list):
+                total += sum(len(c.data) for c in content if isinstance(c, BinaryContent))
+    return total
+
+
+def stub_model(base_ms: float, uplink_mbps: float, sent: list[int]) -> FunctionModel:
+    """A model that takes base_ms plus the time to upload its input."""
+    async def respond(messages, info: AgentInfo) -> ModelResponse:
+        size = payload_bytes(messages)
+        sent.append(size)
+        await asyncio.sleep(base_ms / 1000 + size * 8 / (uplink_mbps * 1_000_000))
+        return ModelResponse(parts=[ToolCallPart(info.output_tools[0].name, {"items": []})])
+
+    return FunctionModel(respond)
+
+
+async def run_case(name: str, data: bytes, profile: str | None, args: argparse.Namespace) -> dict:
+    start = time.perf_counter()
+    pages = await TakeoffService.prepare_pages(data, profile)
+    render_s = time.perf_counter() - start
+
+    sent: list[int] = []
+    with get_takeoff_agent().override(model=stub_model(args.base_ms, args.uplink_mbps, sent)):
+        start = time.perf_counter()
+        await TakeoffService.run(data, "1/4\" = 1'-0\"", None, render_profile=profile)
+        total_s = time.perf_counter() - start
+
+    image_pages = sum(1 for page in pages if page.image_data is not None)
+    return {
+        "sample": name,
+        "profile": profile or "original",
+        "input_kb": round(len(data) / 1024, 1),
+        "payload_kb": round(sum(sent) / 1024, 1),
+        "image_pages": image_pages,
+        "model_calls": len(sent),
+        "render_ms": round(render_s * 1000, 1),
+        "end_to_end_ms": round(total_s * 1000, 1),
+    }
+
+
+async def main(args: argparse.Namespace) -> list[dict]:
+    samples = {
+        "vector-1p": floor_plan_pdf(pages=1),
+        "vector-6p": floor_plan_pdf(pages=6),
+        "scan-png": scanned_plan_png(),
+        "scan-pdf": scanned_plan_pdf(),
+    }
+    results = []
+    for name, data in samples.items():
+        for profile in PROFILES:
+            results.append(await run_case(name, data, profile, args))
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--base-ms", type=float, default=1500, help="Fixed model latency per call")
+    parser.add_argument("--uplink-mbps", type=float, default=20, help="Upload bandwidth to the model API")
+    parser.add_argument("--json", action="store_true", help="Print machine-readable JSON")
+    args = parser.parse_args()
+
+    results = asyncio.run(main(args))
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        header = f"{'sample':<10} {'profile':<9} {'input KB':>9} {'payload KB':>11} {'img pages':>9} {'calls':>5} {'render ms':>10} {'e2e ms':>9}"
+        print(header)
+        for r in results:
+            print(
+                f"{r['sample']:<10} {r['profile']:<9} {r['input_kb']:>9} {r['payload_kb']:>11} "
+                f"{r['image_pages']:>9} {r['model_calls']:>5} {r['render_ms']:>10} {r['end_to_end_ms']:>9}"
+            )
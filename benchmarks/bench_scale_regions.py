@@ -0,0 +1,96 @@
+"""Benchmark scale detection on whole sheets vs cropped regions of interest.
+
+Runs detect_scale on E-size sheets whose scale isn't in a parseable text
+layer, sending either the whole page (as-is or rendered with a profile) or
+only the title block and scale-text crops. The stubbed model takes a fixed
+base cost plus upload time for the payload bytes. The "regions, fallback"
+mode answers the crops with low confidence to show the cost of falling
+back to the whole page.
+
+Usage (from the repository root):
+    python -m benchmarks.bench_scale_regions --uplink-mbps 20 --base-ms 800
+"""
+
+import argparse
+import asyncio
+import json
+import time
+
+from pydantic_ai.messages import ModelResponse, ToolCallPart
+from pydantic_ai.models.function import AgentInfo, FunctionModel
+
+from benchmarks.bench_render import payload_bytes
+from benchmarks.samples import E_SHEET_SIZE, floor_plan_pdf, scanned_plan_pdf
+from python_api.agents import detect_scale, get_scale_detector_agent
+
+MODES = {
+    "whole page": {"use_regions": False},
+    "whole page, balanced": {"use_regions": False, "render_profile": "balanced"},
+    "regions": {"use_regions": True},
+    "regions, fallback": {"use_regions": True},
+}
+
+
+def stub_detector(base_ms: float, uplink_mbps: float, sent: list[int], crop_confidence: float) -> FunctionModel:
+    """A detector that takes base_ms plus upload time and answers from the crops with crop_confidence."""
+    async def respond(messages, info: AgentInfo) -> ModelResponse:
+        size = payload_bytes(messages)
+        sent.append(size)
+        await asyncio.sleep(base_ms / 1000 + size * 8 / (uplink_mbps * 1_000_000))
+        confidence = crop_confidence if "crops" in str(messages[0].parts[-1].content[0]) else 0.9
+        return ModelResponse(parts=[ToolCallPart(info.output_tools[0].name, {
+            "detected": True,
+            "scale_info": {"scale_string": "1/8\" = 1'-0\"", "confidence": confidence},
+            "reasoning": "Read from the title block",
+        })])
+
+    return FunctionModel(respond)
+
+
+async def run_case(name: str, data: bytes, mode: str, args: argparse.Namespace) -> dict:
+    sent: list[int] = []
+    crop_confidence = 0.5 if mode.endswith("fallback") else 0.9
+    with get_scale_detector_agent().override(model=stub_detector(args.base_ms, args.uplink_mbps, sent, crop_confidence)):
+        start = time.perf_counter()
+        await detect_scale(data, use_text_layer=False, **MODES[mode])
+        total_s = time.perf_counter() - start
+
+    return {
+        "sample": name,
+        "mode": mode,
+        "input_kb": round(len(data) / 1024, 1),
+        "payload_kb": round(sum(sent) / 1024, 1),
+        "model_calls": len(sent),
+        "end_to_end_ms": round(total_s * 1000, 1),
+    }
+
+
+async def main(args: argparse.Namespace) -> list[dict]:
+    samples = {
+        "vector-E": floor_plan_pdf(pages=1, size=E_SHEET_SIZE, scale="SEE GRAPHIC"),
+        "scan-E": scanned_plan_pdf(6600, 5100, dpi=150),
+    }
+    results = []
+    for name, data in samples.items():
+        for mode in MODES:
+            results.append(await run_case(name, data, mode, args))
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--base-ms", type=float, default=800, help="Fixed model latency per call")
+    parser.add_argument("--uplink-mbps", type=float, default=20, help="Upload bandwidth to the model API")
+    parser.add_argument("--json", action="store_true", help="Print machine-readable JSON")
+    args = parser.parse_args()
+
+    results = asyncio.run(main(args))
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print(f"{'sample':<9} {'mode':<21} {'input KB':>9} {'payload KB':>11} {'calls':>5} {'e2e ms':>9}")
+        for r in results:
+            print(
+                f"{r['sample']:<9} {r['mode']:<21} {r['input_kb']:>9} {r['payload_kb']:>11} "
+                f"{r['model_calls']:>5} {r['end_to_end_ms']:>9}"
+            )
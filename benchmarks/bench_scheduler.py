@@ -0,0 +1,123 @@
+"""Simulate a burst of model requests against a rate-limited upstream.
+
+The fake upstream serves up to --capacity concurrent requests and answers
+429 with Retry-After beyond that. A burst of batch requests arrives first,
+then interactive ones. Three ways of calling it are compared:
+
+- unbounded: every request goes straight out, no retries
+- retry only: 429s are retried after Retry-After, no concurrency limit
+- scheduled: ModelScheduler's adaptive limit, priorities and retries
+
+Reports successes, 429s and latency percentiles per priority class.
+
+Usage (from the repository root):
+    python -m benchmarks.bench_scheduler --requests 60 --capacity 6
+"""
+
+import argparse
+import asyncio
+import time
+
+import httpx
+from pydantic_ai.exceptions import ModelHTTPError
+from pydantic_ai.messages import ModelRequest, ModelResponse, TextPart, UserPromptPart
+from pydantic_ai.models import ModelRequestParameters
+from pydantic_ai.models.function import FunctionModel
+
+from python_api.agents import ModelScheduler, ScheduledModel, model_priority
+
+
+class Upstream:
+    """Fake model endpoint with a hard concurrency capacity."""
+
+    def __init__(self, capacity: int, latency: float, retry_after: float):
+        self.capacity = capacity
+        self.latency = latency
+        self.retry_after = retry_after
+        self.active = 0
+        self.throttled = 0
+
+    async def request(self, messages, info) -> ModelResponse:
+        if self.active >= self.capacity:
+            self.throttled += 1
+            error = ModelHTTPError(429, "sim", {"error": "rate limited"})
+            cause = Exception("429")
+            cause.response = httpx.Response(429, headers={"retry-after": str(self.retry_after)})
+            error.__cause__ = cause
+            await asyncio.sleep(0.005)
+            raise error
+        self.active += 1
+        try:
+            # Latency grows as the upstream gets busier
+            await asyncio.sleep(self.latency * (1 + self.active / self.capacity))
+            return ModelResponse(parts=[TextPart("ok")])
+        finally:
+            self.active -= 1
+
+
+class RetryOnly(ModelScheduler):
+    """Retries 429s but never limits concurrency."""
+
+    def __init__(self):
+        super().__init__(limit=10_000, min_limit=10_000, max_limit=10_000)
+
+
+def percentile(values: list[float], q: float) -> float:
+    ordered = sorted(values)
+    return ordered[int(q * (len(ordered) - 1))] if ordered else 0.0
+
+
+async def run_case(name: str, model, upstream: Upstream, batch: int, interactive: int) -> dict:
+    messages = [ModelRequest(parts=[UserPromptPart("Analyze")])]
+    params = ModelRequestParameters()
+    results: dict[str, list] = {"batch": [], "interactive": []}
+
+    async def one(priority: str) -> None:
+        model_priority.set(priority)
+        started = time.perf_counter()
+        try:
+            await model.request(messages, None, params)
+            results[priority].append(time.perf_counter() - started)
+        except ModelHTTPError:
+            results[priority].append(None)
+
+    tasks = [asyncio.create_task(one("batch")) for _ in range(batch)]
+    await asyncio.sleep(upstream.latency / 2)
+    tasks += [asyncio.create_task(one("interactive")) for _ in range(interactive)]
+    await asyncio.gather(*tasks)
+
+    row = {"case": name, "429s": upstream.throttled}
+    for priority, latencies in results.items():
+        ok = [t for t in latencies if t is not None]
+        row[f"{priority}_ok"] = f"{len(ok)}/{len(latencies)}"
+        row[f"{priority}_p50"] = round(percentile(ok, 0.5), 2)
+        row[f"{priority}_p95"] = round(percentile(ok, 0.95), 2)
+    return row
+
+
+async def main(args: argparse.Namespace) -> None:
+    interactive = args.requests // 3
+    batch = args.requests - interactive
+    rows = []
+    for name in ("unbounded", "retry only", "scheduled"):
+        upstream = Upstream(args.capacity, args.latency, args.retry_after)
+        model = FunctionModel(upstream.request)
+        if name == "retry only":
+            model = ScheduledModel(model, RetryOnly())
+        elif name == "scheduled":
+            model = ScheduledModel(model, ModelScheduler(limit=args.capacity * 2))
+        rows.append(await run_case(name, model, upstream, batch, interactive))
+
+    columns = list(rows[0])
+    print("  ".join(f"{c:>14}" for c in columns))
+    for row in rows:
+        print("  ".join(f"{row[c]!s:>14}" for c in columns))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=60)
+    parser.add_argument("--capacity", type=int, default=6)
+    parser.add_argument("--latency", type=float, default=0.2, help="Seconds per request when idle")
+    parser.add_argument("--retry-after", type=float, default=0.5)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,125 @@
+"""Microbenchmark SSE encoding and coalescing for takeoff streams.
+
+Measures events/sec for each way of encoding TakeoffItem events, and the
+number of writes and bytes sent for a burst-y item stream with different
+coalescing windows. Also reports the bytes the old full-text "chunk"
+events would have cost for the same output.
+
+Usage (from the repository root):
+    python -m benchmarks.bench_sse --items 10000
+"""
+
+import argparse
+import asyncio
+import json
+import time
+
+from sse_starlette.sse import ensure_bytes
+
+from python_api.models import TakeoffItem
+from python_api.services import StreamService
+from python_api.services.stream_service import ENCODERS
+
+
+def make_items(count: int) -> list[TakeoffItem]:
+    return [
+        TakeoffItem(
+            name=f"Interior partition type {i % 12}",
+            category=["linear", "area", "count"][i % 3],
+            quantity=round(12.5 + i * 0.37, 2),
+            unit=["LF", "SF", "EA"][i % 3],
+            location=f"Page {1 + i // 200} - Room {100 + i % 200}",
+            notes="Verify against door schedule" if i % 5 == 0 else None,
+            confidence=0.85,
+        )
+        for i in range(count)
+    ]
+
+
+def bench_encoders(items: list[TakeoffItem]) -> list[dict]:
+    cases = {
+        "model_dump + json.dumps": lambda item: StreamService.format_sse("item", json.dumps(item.model_dump(mode="json"))),
+        "model_dump_json": lambda item: StreamService.format_sse("item", item),
+    }
+    if "orjson" in ENCODERS:
+        cases["model_dump + orjson"] = lambda item: StreamService.format_sse(
+            "item", ENCODERS["orjson"](item.model_dump(mode="json"))
+        )
+
+    results = []
+    for name, encode in cases.items():
+        start = time.perf_counter()
+        size = sum(len(encode(item)) for item in items)
+        elapsed = time.perf_counter() - start
+        results.append({
+            "encoder": name,
+            "events_per_sec": round(len(items) / elapsed),
+            "bytes": size,
+        })
+    return results
+
+
+async def item_stream(items: list[TakeoffItem], burst: int, interval: float):
+    """Items arrive in small bursts, like partial validation closing a few at a time."""
+    for i in range(0, len(items), burst):
+        for item in items[i:i + burst]:
+            yield StreamService.format_sse("item", item)
+        await asyncio.sleep(interval)
+
+
+async def bench_coalescing(items: list[TakeoffItem], window_ms: float, burst: int, interval: float) -> dict:
+    writes = 0
+    size = 0
+    start = time.perf_counter()
+    async for chunk in StreamService.coalesce(item_stream(items, burst, interval), window=window_ms / 1000):
+        body = ensure_bytes(chunk, "\r\n")
+        writes += 1
+        size += len(body)
+    return {
+        "window_ms": window_ms,
+        "writes": writes,
+        "bytes": size,
+        "elapsed_s": round(time.perf_counter() - start, 3),
+    }
+
+
+def full_text_chunk_bytes(items: list[TakeoffItem], delta: int = 20) -> int:
+    """Bytes the previous full-text chunk events sent for the same output."""
+    text = json.dumps({"items": [item.model_dump(mode="json") for item in items]})
+    return sum(
+        len(StreamService.format_sse("chunk", {"text": text[:end]}))
+        for end in range(delta, len(text) + delta, delta)
+    )
+
+
+async def main(args: argparse.Namespace) -> dict:
+    items = make_items(args.items)
+    stream_items = items[:args.stream_items]
+    return {
+        "encoders": bench_encoders(items),
+        "coalescing": [
+            await bench_coalescing(stream_items, window, args.burst, args.interval_ms / 1000)
+            for window in (0, 20, 50)
+        ],
+        "full_text_chunks_bytes": full_text_chunk_bytes(stream_items),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--items", type=int, default=10000, help="Items for the encoder benchmark")
+    parser.add_argument("--stream-items", type=int, default=500, help="Items in the simulated stream")
+    parser.add_argument("--burst", type=int, default=2, help="Items closed per partial validation")
+    parser.add_argument("--interval-ms", type=float, default=5, help="Time between bursts")
+    parser.add_argument("--json", action="store_true", help="Print machine-readable JSON")
+    args = parser.parse_args()
+
+    results = asyncio.run(main(args))
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        for r in results["encoders"]:
+            print(f"{r['encoder']:<26} {r['events_per_sec']:>10} events/s {r['bytes']:>12} bytes")
+        for r in results["coalescing"]:
+            print(f"window {r['window_ms']:>4} ms  {r['writes']:>6} writes {r['bytes']:>10} bytes {r['elapsed_s']:>7} s")
+        print(f"full-text chunk events for the same stream: {results['full_text_chunks_bytes']} bytes")
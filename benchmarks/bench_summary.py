@@ -0,0 +1,80 @@
+"""Benchmark server-side totals: model output tokens and latency with and without a model-written summary.
+
+Runs the whole-file takeoff on the stub model twice per output size: once
+with the model also writing totals by category and item type (as it did
+when TakeoffResult.summary came from the model), and once with items only,
+the totals computed by SummaryService. Output time follows the stub's
+token rate, so fewer output tokens shows up directly as lower latency.
+
+Usage (from the repository root):
+    python -m benchmarks.bench_summary --items 20 100 300 --tokens-per-sec 500
+"""
+
+import argparse
+import asyncio
+import json
+import time
+
+from benchmarks.samples import floor_plan_pdf
+from benchmarks.stub_model import StubConfig, stub_model, takeoff_output
+from python_api.agents import ScheduledModel, get_takeoff_agent
+from python_api.services import StageTimer, SummaryService, TakeoffService, current_timer
+
+
+async def run_case(pdf: bytes, items: int, summary: bool, args: argparse.Namespace) -> dict:
+    config = StubConfig(latency=args.latency, tokens_per_sec=args.tokens_per_sec, items=items)
+    output = takeoff_output(items, summary=summary)
+    timer = StageTimer("bench")
+    token = current_timer.set(timer)
+    try:
+        with get_takeoff_agent().override(model=ScheduledModel(stub_model(config, output))):
+            start = time.perf_counter()
+            result = await TakeoffService.run_file(pdf, "1/4\" = 1'-0\"", None)
+            total_s = time.perf_counter() - start
+    finally:
+        current_timer.reset(token)
+
+    # Post-processing alone, for its share of the run
+    start = time.perf_counter()
+    for _ in range(10):
+        SummaryService.summarize(result.items)
+    summarize_ms = (time.perf_counter() - start) * 100
+
+    return {
+        "items": items,
+        "summary_by": "model" if summary else "server",
+        "output_chars": len(json.dumps(output)),
+        "output_tokens": timer.tokens["output"],
+        "end_to_end_ms": round(total_s * 1000, 1),
+        "summarize_ms": round(summarize_ms, 3),
+        "summary_keys": len(result.summary) + len(result.type_totals),
+    }
+
+
+async def main(args: argparse.Namespace) -> list[dict]:
+    pdf = floor_plan_pdf(pages=1)
+    results = []
+    for items in args.items:
+        for summary in (True, False):
+            results.append(await run_case(pdf, items, summary, args))
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--items", type=int, nargs="+", default=[20, 100, 300])
+    parser.add_argument("--latency", type=float, default=0.5, help="Seconds before the first token")
+    parser.add_argument("--tokens-per-sec", type=float, default=500.0, help="Stub output token rate")
+    parser.add_argument("--json", action="store_true", help="Print machine-readable JSON")
+    args = parser.parse_args()
+
+    results = asyncio.run(main(args))
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print(f"{'items':>5} {'summary':>8} {'out chars':>10} {'out tokens':>10} {'e2e ms':>9} {'sum ms':>7} {'totals':>6}")
+        for r in results:
+            print(
+                f"{r['items']:>5} {r['summary_by']:>8} {r['output_chars']:>10} {r['output_tokens']:>10} "
+                f"{r['end_to_end_ms']:>9} {r['summarize_ms']:>7} {r['summary_keys']:>6}"
+            )
@@ -0,0 +1,207 @@
+"""Synthetic blueprint files for benchmarks.
+
+Generates vector PDFs that look like CAD-exported floor plans (wall
+linework, closed room outlines, a title block with a scale notation) and
+raster scans, without any third-party drawing library.
+"""
+
+import io
+import random
+import zlib
+
+# 36" x 24" architectural D-size sheet in PDF units (72 per inch)
+SHEET_SIZE = (2592, 1728)
+
+# 44" x 34" ANSI E-size sheet
+E_SHEET_SIZE = (3168, 2448)
+
+
+def _pdf_string(text: str) -> bytes:
+    escaped = text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+    return b"(" + escaped.encode("latin-1") + b")"
+
+
+def floor_plan_content(
+    sheet_number: int,
+    segments: int = 2000,
+    rooms: int = 40,
+    scale: str = "1/4\" = 1'-0\"",
+    size: tuple[int, int] = SHEET_SIZE,
+    seed: int = 0,
+) -> bytes:
+    """Build a page content stream with walls, rooms and a title block."""
+    rng = random.Random(seed * 7919 + sheet_number)
+    width, height = size
+    ops: list[bytes] = [b"q 0.5 w 0 0 0 RG"]
+
+    # Wall linework as individual stroked segments on a grid
+    path = []
+    for _ in range(segments):
+        x = rng.randrange(72, width - 700)
+        y = rng.randrange(200, height - 72)
+        if rng.random() < 0.5:
+            path.append(b"%d %d m %d %d l" % (x, y, x + rng.randrange(18, 240), y))
+        else:
+            path.append(b"%d %d m %d %d l" % (x, y, x, y + rng.randrange(18, 240)))
+    ops.append(b" ".join(path) + b" S")
+
+    # Closed room outlines
+    for _ in range(rooms):
+        x = rng.randrange(72, width - 900)
+        y = rng.randrange(200, height - 300)
+        w = rng.randrange(60, 200)
+        h = rng.randrange(60, 200)
+        ops.append(b"%d %d %d %d re S" % (x, y, w, h))
+    ops.append(b"Q")
+
+    # Title block in the bottom right corner
+    tx, ty = width - 620, 40
+    ops.append(b"q 1 w %d %d 580 260 re S Q" % (tx, ty))
+    lines = [
+        "LAYERWISE SAMPLE PROJECT",
+        f"SHEET A-{100 + sheet_number}",
+        "FLOOR PLAN",
+        f"SCALE: {scale}",
+    ]
+    text_ops = [b"BT /F1 18 Tf"]
+    for i, line in enumerate(lines):
+        text_ops.append(b"1 0 0 1 %d %d Tm %s Tj" % (tx + 20, ty + 220 - 40 * i, _pdf_string(line)))
+    text_ops.append(b"ET")
+    ops.append(b" ".join(text_ops))
+
+    # Room labels
+    label_ops = [b"BT /F1 9 Tf"]
+    for i in range(min(rooms, 60)):
+        x = rng.randrange(100, width - 900)
+        y = rng.randrange(220, height - 100)
+        label_ops.append(b"1 0 0 1 %d %d Tm %s Tj" % (x, y, _pdf_string(f"ROOM {101 + i}")))
+    label_ops.append(b"ET")
+    ops.append(b" ".join(label_ops))
+
+    return b"\n".join(ops)
+
+
+def build_pdf(contents: list[bytes], size: tuple[int, int] = SHEET_SIZE, compress: bool = True) -> bytes:
+    """Assemble a PDF from per-page content streams (Helvetica as /F1)."""
+    objects: list[bytes] = []
+
+    def add(obj: bytes) -> int:
+        objects.append(obj)
+        return len(objects)
+
+    font = add(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+    content_ids = []
+    for content in contents:
+        if compress:
+            data = zlib.compress(content)
+            content_ids.append(add(
+                b"<< /Length %d /Filter /FlateDecode >>\nstream\n" % len(data) + data + b"\nendstream"
+            ))
+        else:
+            content_ids.append(add(b"<< /Length %d >>\nstream\n" % len(content) + content + b"\nendstream"))
+
+    pages_id = len(objects) + len(contents) + 1
+    kids = [
+        add(
+            b"<< /Type /Page /Parent %d 0 R /MediaBox [0 0 %d %d] "
+            b"/Resources << /Font << /F1 %d 0 R >> >> /Contents %d 0 R >>"
+            % (pages_id, size[0], size[1], font, content_id)
+        )
+        for content_id in content_ids
+    ]
+    add(
+        b"<< /Type /Pages /Kids [" + b" ".join(b"%d 0 R" % k for k in kids)
+        + b"] /Count %d >>" % len(kids)
+    )
+    catalog = add(b"<< /Type /Catalog /Pages %d 0 R >>" % pages_id)
+
+    out = bytearray(b"%PDF-1.7\n")
+    offsets = []
+    for number, obj in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n" % number + obj + b"\nendobj\n"
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    out += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    out += b"trailer\n<< /Size %d /Root %d 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (
+        len(objects) + 1, catalog, xref
+    )
+    return bytes(out)
+
+
+def floor_plan_pdf(
+    pages: int = 1,
+    segments: int = 2000,
+    rooms: int = 40,
+    size: tuple[int, int] = SHEET_SIZE,
+    **kwargs,
+) -> bytes:
+    """A multi-sheet vector floor plan set."""
+    return build_pdf([
+        floor_plan_content(sheet, segments=segments, rooms=rooms, size=size, **kwargs)
+        for sheet in range(1, pages + 1)
+    ], size=size)
+
+
+def scanned_plan_png(width: int = 7200, height: int = 4800, seed: int = 0) -> bytes:
+    """A large grayscale 'scan' of a floor plan (requires Pillow)."""
+    from PIL import Image, ImageDraw
+
+    rng = random.Random(seed)
+    image = Image.new("L", (width, height), 255)
+    draw = ImageDraw.Draw(image)
+    for _ in range(3000):
+        x = rng.randrange(0, width - 600)
+        y = rng.randrange(0, height - 600)
+        if rng.random() < 0.5:
+            draw.line((x, y, x + rng.randrange(50, 600), y), fill=0, width=3)
+        else:
+            draw.line((x, y, x, y + rng.randrange(50, 600)), fill=0, width=3)
+    # Scanner noise
+    for _ in range(20000):
+        image.putpixel((rng.randrange(width), rng.randrange(height)), rng.randrange(160, 255))
+
+    buffer = io.BytesIO()
+    image.save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+def scanned_plan_pdf(
+    width: int = 7200,
+    height: int = 4800,
+    seed: int = 0,
+    quality: int = 75,
+    dpi: int = 200,
+) -> bytes:
+    """The same scan wrapped in a single-page PDF as a JPEG, like a scanner would produce."""
+    from PIL import Image
+
+    image = Image.open(io.BytesIO(scanned_plan_png(width, height, seed)))
+    buffer = io.BytesIO()
+    image.save(buffer, format="JPEG", quality=quality)
+    jpeg = buffer.getvalue()
+
+    # Place the scan on a sheet at the scan resolution
+    sheet = (round(width * 72 / dpi), round(height * 72 / dpi))
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"<< /Type /Pages /Kids [3 0 R] /Count 1 >>",
+        b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 %d %d] "
+        b"/Resources << /XObject << /Im1 4 0 R >> >> /Contents 5 0 R >>" % sheet,
+        b"<< /Type /XObject /Subtype /Image /Width %d /Height %d /ColorSpace /DeviceGray "
+        b"/BitsPerComponent 8 /Filter /DCTDecode /Length %d >>\nstream\n" % (width, height, len(jpeg))
+        + jpeg + b"\nendstream",
+    ]
+    content = b"q %d 0 0 %d 0 0 cm /Im1 Do Q" % sheet
+    objects.append(b"<< /Length %d >>\nstream\n" % len(content) + content + b"\nendstream")
+
+    out = bytearray(b"%PDF-1.7\n")
+    offsets = []
+    for number, obj in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n" % number + obj + b"\nendobj\n"
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    out += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    return bytes(out)
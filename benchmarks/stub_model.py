@@ -0,0 +1,90 @@
+"""Stand-in models for running the API offline.
+
+The stub answers like the real model would, with a fixed latency before
+its first token, then output at a fixed token rate. Output size is set by
+the number of takeoff items. Both agents get a stub, and it is wrapped in
+ScheduledModel so the scheduler and the model metrics see its requests
+like real ones.
+"""
+
+import asyncio
+import json
+from dataclasses import dataclass
+
+from pydantic_ai.messages import ModelResponse, ToolCallPart
+from pydantic_ai.models.function import AgentInfo, DeltaToolCall, FunctionModel
+
+from python_api.agents import ScheduledModel, get_scale_detector_agent, get_takeoff_agent
+
+# Rough characters per output token, for pacing streamed output
+CHARS_PER_TOKEN = 4
+
+
+@dataclass
+class StubConfig:
+    """How the stub model behaves."""
+    latency: float = 0.5
+    tokens_per_sec: float = 500.0
+    items: int = 20
+    chunk_tokens: int = 8
+
+
+def takeoff_output(items: int, summary: bool = False) -> dict:
+    """A takeoff output with `items` items, as the model would write it.
+
+    With summary, the model also writes the totals by category and by item
+    type, as it had to before the server computed them.
+    """
+    rows = [
+        {
+            "name": f"Interior partition type {i % 12}",
+            "category": ["linear", "area", "count"][i % 3],
+            "quantity": round(12.5 + i * 0.37, 2),
+            "unit": ["LF", "SF", "ea"][i % 3],
+            "location": f"Room {100 + i}",
+            "confidence": 0.85,
+        }
+        for i in range(items)
+    ]
+    output = {"items": rows, "notes": ["Stubbed takeoff"]}
+    if summary:
+        totals: dict[str, float] = {}
+        for row in rows:
+            for key in (f"total_{row['category']}_{row['unit'].lower()}", f"{row['name']} ({row['unit']})"):
+                totals[key] = round(totals.get(key, 0.0) + row["quantity"], 2)
+        output["summary"] = totals
+    return output
+
+
+def scale_output() -> dict:
+    """A scale detection result, as the model would write it."""
+    return {
+        "detected": True,
+        "scale_info": {"scale_string": "1/4\" = 1'-0\"", "confidence": 0.9, "source": "title_block"},
+        "reasoning": "Scale notation in the title block",
+    }
+
+
+def stub_model(config: StubConfig, output: dict) -> FunctionModel:
+    """A model that answers with `output` through its output tool."""
+    args = json.dumps(output)
+    chunk = config.chunk_tokens * CHARS_PER_TOKEN
+
+    async def respond(messages, info: AgentInfo) -> ModelResponse:
+        await asyncio.sleep(config.latency + len(args) / CHARS_PER_TOKEN / config.tokens_per_sec)
+        return ModelResponse(parts=[ToolCallPart(info.output_tools[0].name, args)])
+
+    async def stream(messages, info: AgentInfo):
+        await asyncio.sleep(config.latency)
+        name = info.output_tools[0].name
+        for start in range(0, len(args), chunk):
+            yield {0: DeltaToolCall(name=name if start == 0 else None, json_args=args[start:start + chunk])}
+            await asyncio.sleep(config.chunk_tokens / config.tokens_per_sec)
+
+    return FunctionModel(respond, stream_function=stream)
+
+
+def install(config: StubConfig) -> None:
+    """Point both agents at stub models."""
+    get_takeoff_agent().model = ScheduledModel(stub_model(config, takeoff_output(config.items)))
+    get_scale_detector_agent().model = ScheduledModel(stub_model(config, scale_output()))
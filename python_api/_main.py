@@ -6,7 +6,9 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from dotenv import load_dotenv
 
-from python_api.routers import takeoffs_router
+from python_api.agents import shutdown_models
+from python_api.routers import metrics_router, takeoffs_router
+from python_api.services import FileService, JobService, ReplayService
 
 # Configure logging
 logging.basicConfig(
@@ -29,10 +31,20 @@ async def lifespan(app: FastAPI):
     if not os.getenv("GOOGLE_API_KEY"):
         logger.warning("No AI API key found. Set GOOGLE_API_KEY")
 
+    # Pooled client for blueprint downloads
+    await FileService.startup()
+
+    # Fail background jobs orphaned by a previous process
+    await JobService.startup()
+
     yield
 
     # Shutdown
     logger.info("Shutting down Layerwise API...")
+    await JobService.shutdown()
+    await ReplayService.shutdown()
+    await shutdown_models()
+    await FileService.shutdown()
 
 
 app = FastAPI(
@@ -61,6 +73,8 @@ app.add_middleware(
 # Also mount at root for local development (/takeoff/*)
 app.include_router(takeoffs_router, prefix="/python")
 app.include_router(takeoffs_router)  # Local dev fallback
+app.include_router(metrics_router, prefix="/python")
+app.include_router(metrics_router)
 
 
 @app.get("/")
@@ -1,9 +1,51 @@
-from .takeoff_agent import takeoff_agent, TakeoffDeps
-from .scale_detector import scale_detector_agent, detect_scale
+from .takeoff_agent import (
+    get_takeoff_agent,
+    tool_call_counts,
+    TakeoffDeps,
+    TAKEOFF_AGENT_VERSION,
+)
+from .scale_detector import (
+    get_scale_detector_agent,
+    detect_scale,
+    detect_scale_from_text,
+    ScaleDetectionResult,
+)
+from .hedging import Hedger
+from .scheduler import ModelScheduler, model_scheduler, model_priority
+
+
+def __getattr__(name: str):
+    # The provider module imports pydantic_ai and the OpenAI SDK; load it on first access
+    if name in ("ScheduledModel", "get_model", "get_provider"):
+        from . import provider
+        return getattr(provider, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+async def shutdown_models() -> None:
+    """Close the shared model client, if an agent was ever built."""
+    import sys
+
+    provider = sys.modules.get(f"{__name__}.provider")
+    if provider is not None:
+        await provider.shutdown()
+
 
 __all__ = [
-    "takeoff_agent",
+    "get_takeoff_agent",
+    "tool_call_counts",
     "TakeoffDeps",
-    "scale_detector_agent",
+    "TAKEOFF_AGENT_VERSION",
+    "get_scale_detector_agent",
     "detect_scale",
+    "detect_scale_from_text",
+    "ScaleDetectionResult",
+    "Hedger",
+    "ModelScheduler",
+    "ScheduledModel",
+    "get_model",
+    "get_provider",
+    "shutdown_models",
+    "model_scheduler",
+    "model_priority",
 ]
@@ -0,0 +1,118 @@
+import asyncio
+import logging
+import os
+import time
+from collections import deque
+from typing import Awaitable, Callable, TypedDict, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# A duplicate request is sent once the first has run longer than this percentile of recent latency
+HEDGE_PERCENTILE = float(os.getenv("HEDGE_PERCENTILE", 0.95))
+
+# Duplicates allowed per request, per route (0 disables hedging)
+HEDGE_BUDGET = float(os.getenv("HEDGE_BUDGET", 0.05))
+
+# Latency samples needed before hedging starts, and how many are kept
+HEDGE_MIN_SAMPLES = int(os.getenv("HEDGE_MIN_SAMPLES", 20))
+HEDGE_WINDOW = 200
+
+
+class HedgeStats(TypedDict):
+    """Type definition for hedging statistics of one route."""
+    requests: int
+    fired: int
+    won: int
+    over_budget: int
+    delay: float | None
+    budget: float
+
+
+class Hedger:
+    """Hedge slow calls on one route with a duplicate request.
+
+    When a call hasn't finished within HEDGE_PERCENTILE of its recent
+    latency, the same call is started again; the first to succeed wins
+    and the other is cancelled. Duplicates are limited to `budget` per
+    request so a slow upstream doesn't get twice the load.
+    """
+
+    _routes: dict[str, "Hedger"] = {}
+
+    def __init__(self, route: str, budget: float = HEDGE_BUDGET, percentile: float = HEDGE_PERCENTILE):
+        self.route = route
+        self.budget = budget
+        self.percentile = percentile
+        self.latencies: deque[float] = deque(maxlen=HEDGE_WINDOW)
+        self._counts = {"requests": 0, "fired": 0, "won": 0, "over_budget": 0}
+
+    @classmethod
+    def for_route(cls, route: str) -> "Hedger":
+        """Get the hedger for a route, creating it on first use."""
+        if route not in cls._routes:
+            cls._routes[route] = cls(route)
+        return cls._routes[route]
+
+    @classmethod
+    def all_stats(cls) -> dict[str, HedgeStats]:
+        """Get hedging counters for every route."""
+        return {route: hedger.stats() for route, hedger in cls._routes.items()}
+
+    def delay(self) -> float | None:
+        """How long to wait before hedging, or None until there are enough samples."""
+        if len(self.latencies) < HEDGE_MIN_SAMPLES:
+            return None
+        ordered = sorted(self.latencies)
+        return ordered[int(self.percentile * (len(ordered) - 1))]
+
+    async def run(self, fn: Callable[[], Awaitable[T]]) -> T:
+        """Run fn, starting a second copy if the first is slow.
+
+        Args:
+            fn: Starts one attempt; called again for the hedge
+        """
+        self._counts["requests"] += 1
+        started = time.monotonic()
+        primary = asyncio.ensure_future(fn())
+        tasks = [primary]
+        try:
+            delay = self.delay() if self.budget > 0 else None
+            if delay is not None:
+                done, _ = await asyncio.wait(tasks, timeout=delay)
+                if not done:
+                    if self._counts["fired"] + 1 <= self.budget * self._counts["requests"]:
+                        self._counts["fired"] += 1
+                        logger.info(f"Hedging {self.route} after {delay:.2f}s")
+                        tasks.append(asyncio.ensure_future(fn()))
+                    else:
+                        self._counts["over_budget"] += 1
+
+            # First success wins; an error (or a cancelled attempt) only counts
+            # once nothing else is running
+            pending = set(tasks)
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if not task.cancelled() and task.exception() is None:
+                        if task is not primary:
+                            self._counts["won"] += 1
+                        self.latencies.append(time.monotonic() - started)
+                        return task.result()
+            # Every attempt failed: raise the first real error over a cancellation
+            failed = [task for task in tasks if not task.cancelled()]
+            return (failed[0] if failed else primary).result()
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+
+    def stats(self) -> HedgeStats:
+        """Get request, hedge and win counters and the current hedge delay."""
+        delay = self.delay()
+        return {
+            **self._counts,
+            "delay": round(delay, 3) if delay is not None else None,
+            "budget": self.budget,
+        }
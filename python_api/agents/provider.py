@@ -0,0 +1,213 @@
+import asyncio
+import functools
+import itertools
+import logging
+import os
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator
+
+import httpx
+from openai import AsyncOpenAI
+from pydantic_ai.exceptions import ModelHTTPError
+from pydantic_ai.messages import (
+    BinaryContent,
+    FileUrl,
+    ModelMessage,
+    ModelRequest,
+    ModelResponse,
+    RetryPromptPart,
+    TextPart,
+    ToolCallPart,
+    ToolReturnPart,
+)
+from pydantic_ai.models import ModelRequestParameters, StreamedResponse
+from pydantic_ai.models.openai import OpenAIChatModel
+from pydantic_ai.models.wrapper import WrapperModel
+from pydantic_ai.providers.openai import OpenAIProvider
+from pydantic_ai.settings import ModelSettings
+from pydantic_ai.usage import RequestUsage
+
+from python_api.services.metrics import (
+    current_timer,
+    model_request_seconds,
+    model_requests_total,
+    model_tokens_total,
+    record_upstream_bytes,
+)
+
+from .scheduler import MODEL_MAX_CONCURRENCY, ModelScheduler, model_scheduler
+
+logger = logging.getLogger(__name__)
+
+# Gemini's OpenAI-compatible endpoint (lighter SDK than google-genai)
+GEMINI_BASE_URL = os.getenv(
+    "GEMINI_BASE_URL", "https://generativelanguage.googleapis.com/v1beta/openai/"
+)
+
+# Model responses can take minutes for large sheets
+MODEL_READ_TIMEOUT = float(os.getenv("MODEL_READ_TIMEOUT", 300))
+
+
+class ScheduledModel(WrapperModel):
+    """Model that sends each request through the shared scheduler, retrying 429s.
+
+    Every attempt is recorded in the model metrics (with an estimate of
+    the bytes it sends), and token usage and time to first token go to the
+    current request's stage timer.
+    """
+
+    def __init__(self, wrapped, scheduler: ModelScheduler = model_scheduler):
+        super().__init__(wrapped)
+        self.scheduler = scheduler
+
+    async def request(self, messages: list[ModelMessage], *args: Any, **kwargs: Any) -> ModelResponse:
+        size = request_bytes(messages)
+        for attempt in itertools.count():
+            started = time.perf_counter()
+            record_upstream_bytes("model_request", size)
+            try:
+                async with self.scheduler.slot():
+                    response = await self.wrapped.request(messages, *args, **kwargs)
+                self._record(started, "ok", response.usage)
+                return response
+            except ModelHTTPError as e:
+                self._record(started, _outcome(e))
+                delay = self.scheduler.retry_delay(e, attempt)
+                if delay is None:
+                    raise
+            logger.info(f"Model request throttled; retrying in {delay:.1f}s")
+            await asyncio.sleep(delay)
+
+    @asynccontextmanager
+    async def request_stream(
+        self,
+        messages: list[ModelMessage],
+        model_settings: ModelSettings | None,
+        model_request_parameters: ModelRequestParameters,
+        run_context: Any = None,
+    ) -> AsyncIterator[StreamedResponse]:
+        requested = time.perf_counter()
+        size = request_bytes(messages)
+        for attempt in itertools.count():
+            started = time.perf_counter()
+            record_upstream_bytes("model_request", size)
+            response = None
+            try:
+                async with self.scheduler.slot() as slot:
+                    async with self.wrapped.request_stream(
+                        messages, model_settings, model_request_parameters, run_context
+                    ) as response:
+                        # Opening the stream waits for the first chunk
+                        slot.responded()
+                        timer = current_timer.get()
+                        if timer is not None:
+                            timer.record_once("model_ttft", time.perf_counter() - requested)
+                        yield response
+                self._record(started, "ok", response.usage())
+                return
+            except ModelHTTPError as e:
+                self._record(started, _outcome(e), response.usage() if response else None)
+                # Only retry before anything has been streamed
+                delay = None if response else self.scheduler.retry_delay(e, attempt)
+                if delay is None:
+                    raise
+            logger.info(f"Model stream throttled; retrying in {delay:.1f}s")
+            await asyncio.sleep(delay)
+
+    def _record(self, started: float, outcome: str, usage: RequestUsage | None = None) -> None:
+        """Record one attempt's latency, outcome and token usage."""
+        name = self.model_name
+        model_request_seconds.observe(time.perf_counter() - started, name)
+        model_requests_total.inc(name, outcome)
+        if usage is None:
+            return
+        model_tokens_total.inc(name, "input", amount=usage.input_tokens)
+        model_tokens_total.inc(name, "output", amount=usage.output_tokens)
+        timer = current_timer.get()
+        if timer is not None:
+            timer.add_usage(usage.input_tokens, usage.output_tokens)
+
+
+def request_bytes(messages: list[ModelMessage]) -> int:
+    """Estimate the bytes a request sends: its message content, without JSON framing or tool schemas.
+
+    Inline files count at their base64 size (without encoding them) and
+    file references at the length of their URL.
+    """
+    def content_bytes(content: Any) -> int:
+        if isinstance(content, str):
+            return len(content.encode())
+        if isinstance(content, BinaryContent):
+            return len(f"data:{content.media_type};base64,") + 4 * -(-len(content.data) // 3)
+        if isinstance(content, FileUrl):
+            return len(content.url)
+        if isinstance(content, (list, tuple)):
+            return sum(content_bytes(item) for item in content)
+        return 0
+
+    # Only the latest request's instructions are sent
+    requests = [message for message in messages if isinstance(message, ModelRequest)]
+    total = content_bytes(next((r.instructions for r in reversed(requests) if r.instructions), ""))
+    for message in messages:
+        if isinstance(message, ModelRequest):
+            for part in message.parts:
+                if isinstance(part, ToolReturnPart):
+                    total += content_bytes(part.model_response_str())
+                elif isinstance(part, RetryPromptPart):
+                    total += content_bytes(part.model_response())
+                else:
+                    total += content_bytes(getattr(part, "content", None))
+        else:
+            for part in message.parts:
+                if isinstance(part, TextPart):
+                    total += content_bytes(part.content)
+                elif isinstance(part, ToolCallPart):
+                    total += content_bytes(part.args_as_json_str())
+    return total
+
+
+def _outcome(error: ModelHTTPError) -> str:
+    """Metric label for a failed attempt."""
+    return "throttled" if error.status_code == 429 else f"error_{error.status_code}"
+
+
+@functools.cache
+def get_provider() -> OpenAIProvider:
+    """The provider every agent shares, created on first use.
+
+    One pooled HTTP client sized to the scheduler's maximum concurrency.
+    The SDK's own retries are off so 429s reach the scheduler, which
+    backs off and retries them.
+    """
+    api_key = os.environ.get("GOOGLE_API_KEY")
+    if not api_key:
+        raise RuntimeError("GOOGLE_API_KEY is not set")
+
+    client = AsyncOpenAI(
+        base_url=GEMINI_BASE_URL,
+        api_key=api_key,
+        max_retries=0,
+        http_client=httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=int(MODEL_MAX_CONCURRENCY) * 2,
+                max_keepalive_connections=int(MODEL_MAX_CONCURRENCY),
+            ),
+            timeout=httpx.Timeout(MODEL_READ_TIMEOUT, connect=10.0),
+        ),
+    )
+    return OpenAIProvider(openai_client=client)
+
+
+@functools.cache
+def get_model(name: str) -> ScheduledModel:
+    """A scheduled model on the shared provider (one instance per model name)."""
+    return ScheduledModel(OpenAIChatModel(name, provider=get_provider()))
+
+
+async def shutdown() -> None:
+    """Close the shared client if it was ever created."""
+    if get_provider.cache_info().currsize:
+        await get_provider().client.close()
+        get_provider.cache_clear()
+        get_model.cache_clear()
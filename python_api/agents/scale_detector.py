@@ -1,11 +1,24 @@
+import asyncio
+import functools
+import logging
 import os
 from dataclasses import dataclass
+from typing import TYPE_CHECKING
 
 from pydantic import BaseModel, Field
-from pydantic_ai import Agent
-from pydantic_ai.models.openai import OpenAIModel
 
 from python_api.models import ScaleInfo
+from .hedging import Hedger
+
+if TYPE_CHECKING:
+    from pydantic_ai import Agent
+    from python_api.services import FileData, PreparedDocument
+
+logger = logging.getLogger(__name__)
+
+# Answers from cropped regions below this confidence fall back to the whole page;
+# the detector is told to report 0.8+ only for a clearly read notation
+REGION_MIN_CONFIDENCE = float(os.getenv("SCALE_REGION_MIN_CONFIDENCE", 0.8))
 
 
 class ScaleDetectionResult(BaseModel):
@@ -18,21 +31,12 @@ class ScaleDetectionResult(BaseModel):
 @dataclass
 class ScaleDetectorDeps:
     """Dependencies for scale detection."""
-    file_data: bytes
+    file_data: "FileData"
 
 
-# Use Gemini via OpenAI-compatible endpoint (lighter SDK)
-gemini_model = OpenAIModel(
-    "gemini-2.0-flash",
-    base_url="https://generativelanguage.googleapis.com/v1beta/openai/",
-    api_key=os.environ.get("GOOGLE_API_KEY"),
-)
+SCALE_MODEL_NAME = "gemini-2.0-flash"
 
-scale_detector_agent = Agent(
-    gemini_model,
-    deps_type=ScaleDetectorDeps,
-    output_type=ScaleDetectionResult,
-    instructions="""You are an expert at reading architectural drawings and identifying scale notations.
+SCALE_INSTRUCTIONS = """You are an expert at reading architectural drawings and identifying scale notations.
 
 Your task is to find and interpret the scale of a blueprint.
 
@@ -75,24 +79,149 @@ Your task is to find and interpret the scale of a blueprint.
 - If uncertain, confidence should be low (0.2-0.4)
 
 Always explain your reasoning.
-""",
-)
+"""
 
 
-async def detect_scale(file_data: bytes) -> ScaleDetectionResult:
-    """Detect the scale from a blueprint (PDF or image)."""
-    from pydantic_ai.messages import BinaryContent
-    from python_api.services import FileService
+@functools.cache
+def get_scale_detector_agent() -> "Agent[ScaleDetectorDeps, ScaleDetectionResult]":
+    """The scale detection agent, built on first use (see get_takeoff_agent)."""
+    from pydantic_ai import Agent
 
-    deps = ScaleDetectorDeps(file_data=file_data)
-    mime_type = FileService.get_mime_type(file_data)
+    from .provider import get_model
 
-    result = await scale_detector_agent.run(
-        [
-            "Analyze this architectural drawing and identify the scale.",
-            BinaryContent(data=file_data, media_type=mime_type)
-        ],
-        deps=deps
+    return Agent(
+        # Shared client; requests share one adaptive concurrency limit across agents
+        get_model(SCALE_MODEL_NAME),
+        deps_type=ScaleDetectorDeps,
+        output_type=ScaleDetectionResult,
+        instructions=SCALE_INSTRUCTIONS,
     )
 
-    return result.output
+
+async def detect_scale_from_text(file_data: "FileData") -> ScaleDetectionResult | None:
+    """Detect the scale locally from the PDF text layer.
+
+    Returns None when no notation parses or sheets disagree.
+    """
+    from python_api.services import ScaleParser
+
+    text_scale = await asyncio.to_thread(ScaleParser.detect_from_pdf, file_data)
+    if not text_scale:
+        return None
+
+    return ScaleDetectionResult(
+        detected=True,
+        scale_info=text_scale.scale_info,
+        reasoning=text_scale.reasoning,
+    )
+
+
+async def _run_detector(
+    prompt: str,
+    documents: list["PreparedDocument"],
+    file_data: "FileData",
+    hedge_route: str | None = None,
+) -> ScaleDetectionResult:
+    """Run the detector on prepared documents and fill in pixels_per_foot.
+
+    With a hedge route, a slow call is raced against a duplicate (see
+    Hedger); both send the same content, encoded once.
+    """
+    from python_api.services import ScaleParser
+
+    content = [document.content() for document in documents]
+
+    def run():
+        return get_scale_detector_agent().run(
+            [prompt, *content],
+            deps=ScaleDetectorDeps(file_data=file_data),
+        )
+
+    if hedge_route:
+        result = await Hedger.for_route(hedge_route).run(run)
+    else:
+        result = await run()
+
+    # Fill in pixels_per_foot when the model returned a notation we can parse
+    output = result.output
+    if output.scale_info and output.scale_info.pixels_per_foot is None:
+        parsed = ScaleParser.parse_text(output.scale_info.scale_string)
+        if parsed:
+            output.scale_info.pixels_per_foot = parsed[0].pixels_per_foot
+
+    return output
+
+
+async def detect_scale(
+    file_data: "FileData | PreparedDocument",
+    use_text_layer: bool = True,
+    render_profile: str | None = None,
+    use_regions: bool = True,
+    hedge_route: str | None = "detect-scale",
+) -> ScaleDetectionResult:
+    """Detect the scale from a blueprint (PDF or image).
+
+    Vector PDFs are first parsed locally from their text layer; the LLM is
+    only called when no notation parses or when sheets disagree. The LLM
+    first sees crops of the title block and of any scale text on the first
+    sheet, and only gets the whole page when that answer isn't confident.
+
+    Args:
+        file_data: Raw PDF or image bytes, or the document prepared from
+            them (the whole-page call then shares its upload with the takeoff)
+        use_text_layer: Try the local text-layer parser before the LLM
+        render_profile: Send the model the first page rasterized with this
+            profile instead of the original file
+        use_regions: Try cropped regions of interest before the whole page
+        hedge_route: Route whose latency history and hedge budget the model
+            calls use (None never hedges)
+    """
+    from python_api.services import PreparedDocument, RasterService, RegionService
+
+    document = PreparedDocument.of(file_data)
+    file_data = document.data
+
+    if use_text_layer:
+        text_result = await detect_scale_from_text(file_data)
+        if text_result:
+            return text_result
+
+    if use_regions:
+        crops = await asyncio.to_thread(RegionService.scale_regions, file_data)
+        if crops:
+            result = await _run_detector(
+                "These images are crops of an architectural drawing: the title block "
+                "and any areas with scale notes. Identify the scale of the drawing.",
+                [PreparedDocument(crop.image_data, "image/png") for crop in crops],
+                file_data,
+                hedge_route,
+            )
+            if (
+                result.detected and result.scale_info
+                and result.scale_info.confidence >= REGION_MIN_CONFIDENCE
+            ):
+                return result
+            logger.info("Scale not confidently found in cropped regions; retrying on the whole page")
+
+    profile = RasterService.get_profile(render_profile)
+    if profile is not None:
+        # Title blocks repeat on every sheet, so the first page is enough
+        if document.mime_type == "application/pdf":
+            pages = await asyncio.to_thread(
+                RasterService.render_pdf_pages, file_data, profile, None, 1
+            )
+        else:
+            pages = [await asyncio.to_thread(RasterService.downsample_image, file_data, profile)]
+        if pages:
+            rendered, rendered_type = RasterService.page_payload(pages[0], file_data)
+            # Vector sheets are usually smaller than any rendering of them
+            if len(rendered) < len(file_data):
+                document = PreparedDocument(rendered, rendered_type)
+
+    await document.upload()
+    return await _run_detector(
+        "Analyze this architectural drawing and identify the scale.",
+        [document],
+        file_data,
+        hedge_route,
+    )
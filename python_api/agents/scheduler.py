@@ -0,0 +1,249 @@
+import asyncio
+import heapq
+import itertools
+import logging
+import os
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from email.utils import parsedate_to_datetime
+from typing import AsyncIterator, Literal, TypedDict
+
+logger = logging.getLogger(__name__)
+
+# Concurrent upstream model requests: starting point and bounds of the adaptive limit
+MODEL_CONCURRENCY = float(os.getenv("MODEL_CONCURRENCY", 8))
+MODEL_MIN_CONCURRENCY = float(os.getenv("MODEL_MIN_CONCURRENCY", 1))
+MODEL_MAX_CONCURRENCY = float(os.getenv("MODEL_MAX_CONCURRENCY", 32))
+
+# Multiplier applied to the limit on a 429/5xx or a slow response
+MODEL_BACKOFF = float(os.getenv("MODEL_BACKOFF", 0.7))
+
+# A response slower than this multiple of the typical latency counts as congestion
+MODEL_LATENCY_TOLERANCE = float(os.getenv("MODEL_LATENCY_TOLERANCE", 2.5))
+
+# Retries of 429/503 responses, waiting for Retry-After (or exponential backoff) up to a cap
+MODEL_MAX_RETRIES = int(os.getenv("MODEL_MAX_RETRIES", 3))
+MODEL_MAX_RETRY_DELAY = float(os.getenv("MODEL_MAX_RETRY_DELAY", 30))
+
+Priority = Literal["interactive", "batch", "background"]
+
+# Lower runs first; ties run in arrival order
+PRIORITIES: dict[str, int] = {"interactive": 0, "batch": 1, "background": 2}
+
+# Priority class of the model requests made in the current context
+model_priority: ContextVar[Priority] = ContextVar("model_priority", default="interactive")
+
+RETRYABLE_STATUS = (429, 503)
+
+
+class QueueStats(TypedDict):
+    """Type definition for queue-time statistics of one priority class."""
+    waiting: int
+    admitted: int
+    wait_avg: float
+    wait_p95: float
+    wait_max: float
+
+
+class SchedulerStats(TypedDict):
+    """Type definition for model scheduler statistics."""
+    limit: float
+    in_flight: int
+    latency_avg: float | None
+    successes: int
+    throttled: int
+    server_errors: int
+    slow: int
+    retries: int
+    queues: dict[str, QueueStats]
+
+
+class ModelScheduler:
+    """Admission control for upstream model requests.
+
+    Requests take a slot before they go out. The number of slots adapts
+    AIMD-style: each success below the latency tolerance adds 1/limit
+    (about one slot per round of requests); a 429, a 5xx or a response
+    much slower than usual multiplies the limit by MODEL_BACKOFF, at most
+    once per typical latency so a burst of failures from one round only
+    counts once. Waiting requests are admitted by priority class, then in
+    arrival order.
+    """
+
+    def __init__(
+        self,
+        limit: float = MODEL_CONCURRENCY,
+        min_limit: float = MODEL_MIN_CONCURRENCY,
+        max_limit: float = MODEL_MAX_CONCURRENCY,
+    ):
+        self.limit = limit
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.in_flight = 0
+        self.latency: float | None = None
+        self._waiters: list[tuple[int, int, asyncio.Future]] = []
+        self._order = itertools.count()
+        self._decreased_at = 0.0
+        self._counts = {"successes": 0, "throttled": 0, "server_errors": 0, "slow": 0, "retries": 0}
+        self._waits: dict[str, deque[float]] = {name: deque(maxlen=512) for name in PRIORITIES}
+        self._admitted = dict.fromkeys(PRIORITIES, 0)
+        self._wait_max = dict.fromkeys(PRIORITIES, 0.0)
+
+    async def acquire(self, priority: Priority | None = None) -> None:
+        """Wait for a slot, behind any waiting request of the same or higher priority."""
+        priority = priority or model_priority.get()
+        started = time.monotonic()
+        if not self._waiters and self.in_flight < int(self.limit):
+            self.in_flight += 1
+        else:
+            future = asyncio.get_running_loop().create_future()
+            entry = (PRIORITIES[priority], next(self._order), future)
+            heapq.heappush(self._waiters, entry)
+            try:
+                await future
+            except asyncio.CancelledError:
+                if future.done() and not future.cancelled():
+                    # Admitted just as the caller went away; hand the slot on
+                    self.release()
+                else:
+                    self._waiters.remove(entry)
+                    heapq.heapify(self._waiters)
+                raise
+
+        wait = time.monotonic() - started
+        self._waits[priority].append(wait)
+        self._admitted[priority] += 1
+        self._wait_max[priority] = max(self._wait_max[priority], wait)
+
+    def release(self) -> None:
+        """Free a slot and admit waiting requests the limit now allows."""
+        self.in_flight -= 1
+        self._admit()
+
+    def record(self, latency: float, error: BaseException | None = None) -> None:
+        """Adjust the limit for the outcome of one request."""
+        status = _status_code(error) if error is not None else None
+        if status == 429:
+            self._counts["throttled"] += 1
+            self._decrease()
+        elif status is not None and status >= 500:
+            self._counts["server_errors"] += 1
+            self._decrease()
+        elif error is None:
+            self._counts["successes"] += 1
+            if self.latency is not None and latency > max(self.latency * MODEL_LATENCY_TOLERANCE, 1.0):
+                self._counts["slow"] += 1
+                self._decrease()
+            else:
+                self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+            self.latency = latency if self.latency is None else 0.9 * self.latency + 0.1 * latency
+        self._admit()
+
+    def retry_delay(self, error: BaseException, attempt: int) -> float | None:
+        """Seconds to wait before retrying a failed request, or None to give up."""
+        if _status_code(error) not in RETRYABLE_STATUS:
+            return None
+        if attempt >= MODEL_MAX_RETRIES:
+            return None
+        delay = _retry_after(error)
+        if delay is None:
+            delay = 2 ** attempt
+        self._counts["retries"] += 1
+        return min(delay, MODEL_MAX_RETRY_DELAY)
+
+    @asynccontextmanager
+    async def slot(self, priority: Priority | None = None) -> AsyncIterator["_Slot"]:
+        """Hold a slot for one request and record how it went."""
+        await self.acquire(priority)
+        slot = _Slot()
+        try:
+            yield slot
+        except BaseException as e:
+            if not isinstance(e, asyncio.CancelledError):
+                self.record(slot.elapsed(), e)
+            raise
+        else:
+            self.record(slot.elapsed())
+        finally:
+            self.release()
+
+    def stats(self) -> SchedulerStats:
+        """Get the current limit, outcome counters and queue times per priority class."""
+        waiting = dict.fromkeys(PRIORITIES, 0)
+        for rank, _, _ in self._waiters:
+            waiting[next(name for name, r in PRIORITIES.items() if r == rank)] += 1
+
+        queues = {}
+        for name, waits in self._waits.items():
+            ordered = sorted(waits)
+            queues[name] = {
+                "waiting": waiting[name],
+                "admitted": self._admitted[name],
+                "wait_avg": round(sum(ordered) / len(ordered), 4) if ordered else 0.0,
+                "wait_p95": round(ordered[int(0.95 * (len(ordered) - 1))], 4) if ordered else 0.0,
+                "wait_max": round(self._wait_max[name], 4),
+            }
+        return {
+            "limit": round(self.limit, 2),
+            "in_flight": self.in_flight,
+            "latency_avg": round(self.latency, 3) if self.latency is not None else None,
+            **self._counts,
+            "queues": queues,
+        }
+
+    def _decrease(self) -> None:
+        now = time.monotonic()
+        if now - self._decreased_at < (self.latency or 1.0):
+            return
+        self._decreased_at = now
+        self.limit = max(self.min_limit, self.limit * MODEL_BACKOFF)
+        logger.info(f"Model concurrency limit lowered to {self.limit:.1f}")
+
+    def _admit(self) -> None:
+        while self._waiters and self.in_flight < int(self.limit):
+            _, _, future = heapq.heappop(self._waiters)
+            if not future.done():
+                self.in_flight += 1
+                future.set_result(None)
+
+
+class _Slot:
+    """Timing of one request; streams stop the clock once the response starts."""
+
+    def __init__(self):
+        self.started = time.monotonic()
+        self.responded_at: float | None = None
+
+    def responded(self) -> None:
+        self.responded_at = time.monotonic()
+
+    def elapsed(self) -> float:
+        return (self.responded_at or time.monotonic()) - self.started
+
+
+def _status_code(error: BaseException) -> int | None:
+    """HTTP status of a provider error (pydantic_ai's ModelHTTPError and the SDK's errors carry one)."""
+    status = getattr(error, "status_code", None)
+    return status if isinstance(status, int) else None
+
+
+def _retry_after(error: BaseException) -> float | None:
+    """Read Retry-After (seconds or an HTTP date) from the provider's response."""
+    response = getattr(error, "response", None) or getattr(error.__cause__, "response", None)
+    value = response.headers.get("retry-after") if response is not None else None
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+# Shared by every agent so they compete for the same upstream capacity
+model_scheduler = ModelScheduler()
@@ -1,33 +1,49 @@
+import asyncio
+import functools
+import hashlib
+import json
+import logging
 import os
 from dataclasses import dataclass
+from typing import TYPE_CHECKING
 
-from pydantic_ai import Agent, RunContext
-from pydantic_ai.models.openai import OpenAIModel
+from python_api.models import TakeoffOutput, TakeoffItem, MeasurementCategory, ScaleInfo
 
-from python_api.models import TakeoffResult, TakeoffItem, MeasurementCategory
+if TYPE_CHECKING:
+    from pydantic_ai import Agent
+    from python_api.services import FileData
+    from .scale_detector import ScaleDetectionResult
+
+logger = logging.getLogger(__name__)
+
+# How long get_scale waits on a pending scale detection before giving up
+SCALE_WAIT_TIMEOUT = float(os.getenv("SCALE_DETECTION_TIMEOUT", 20))
+
+NO_SCALE_MESSAGE = (
+    "No scale provided. Estimate dimensions based on standard construction "
+    "elements (doors are typically 3' wide, 6'8\" tall)."
+)
 
 
 @dataclass
 class TakeoffDeps:
     """Dependencies for the takeoff agent."""
     project_id: str
-    blueprint_data: bytes  # Raw PDF or image bytes
+    blueprint_data: "FileData"  # Raw PDF or image bytes (or a memory map of them)
     scale: str | None = None
     focus_areas: list[str] | None = None
+    # Scale detection running alongside the takeoff; awaited only if the model asks
+    scale_task: "asyncio.Future[ScaleDetectionResult] | None" = None
+    scale_timeout: float = SCALE_WAIT_TIMEOUT
+    # Original PDF to measure vector paths from (the model may be sent a rendered image)
+    vector_data: "FileData | None" = None
+    # Vector measurements, computed once per run (see measure_vectors)
+    vector_items: list[TakeoffItem] | None = None
 
 
-# Use Gemini via OpenAI-compatible endpoint (lighter SDK)
-gemini_model = OpenAIModel(
-    "gemini-2.0-flash",
-    base_url="https://generativelanguage.googleapis.com/v1beta/openai/",
-    api_key=os.environ.get("GOOGLE_API_KEY"),
-)
+TAKEOFF_MODEL_NAME = "gemini-2.0-flash"
 
-takeoff_agent = Agent(
-    gemini_model,
-    deps_type=TakeoffDeps,
-    output_type=TakeoffResult,
-    instructions="""You are an expert construction estimator analyzing architectural blueprints.
+TAKEOFF_INSTRUCTIONS = """You are an expert construction estimator analyzing architectural blueprints.
 
 Your task is to perform a quantity takeoff - extracting all measurable items from the blueprint.
 
@@ -54,6 +70,23 @@ Your task is to perform a quantity takeoff - extracting all measurable items fro
 5. Note the location of items when identifiable
 6. Provide confidence scores based on clarity of the drawing
 
+## Calculations
+
+The calculation tools take arrays: collect the dimensions of every room, wall
+run or pour first, then make one call per tool for all of them. Results come
+back in the same order as the inputs.
+
+## Vector Measurements
+
+For CAD-exported PDFs, call get_vector_measurements before measuring anything.
+It lists groups of the drawing's linework by line weight and color, each with a
+group id. Their LINEAR and AREA quantities are measured exactly and added to the
+takeoff for you. Work out what each group represents (exterior walls,
+partitions, slab or room outlines) and name it in vector_labels by its group id;
+mark annotation, dimensioning and hatching groups with skip. Groups you don't
+name are left out of the takeoff. Don't list the measured groups as items
+yourself. Spend your effort on labeling and counting.
+
 ## Scale Usage
 
 If a scale is provided, use it for all linear, area, and volume calculations.
@@ -67,39 +100,237 @@ Common scales:
 - Be accurate - use the scale correctly
 - Be organized - group by category and type
 - Be honest - use lower confidence for unclear items
-""",
-)
+- List items only - totals and unit conversions are computed from your items,
+  so don't add them up yourself
+"""
+
+# Identifies the model, prompt and output schema; changes invalidate cached results
+TAKEOFF_AGENT_VERSION = hashlib.sha256(
+    "\n".join([
+        TAKEOFF_MODEL_NAME,
+        TAKEOFF_INSTRUCTIONS,
+        json.dumps(TakeoffOutput.model_json_schema(), sort_keys=True),
+    ]).encode()
+).hexdigest()[:16]
+
+
+async def resolve_scale(deps: TakeoffDeps) -> str:
+    """The scale to report to the model, waiting on a pending detection if needed.
+
+    A detected scale is stored on deps.scale.
+    """
+    if deps.scale:
+        return f"Use scale: {deps.scale}"
+
+    if deps.scale_task is not None:
+        try:
+            # Shield so a timeout here doesn't cancel detection for the /stream scale event
+            result = await asyncio.wait_for(
+                asyncio.shield(deps.scale_task), timeout=deps.scale_timeout
+            )
+        except asyncio.TimeoutError:
+            logger.warning("Scale detection timed out; continuing without a scale")
+            return f"Scale detection timed out. {NO_SCALE_MESSAGE}"
+        except Exception as e:
+            logger.warning(f"Scale detection failed; continuing without a scale: {e}")
+            return f"Scale detection failed. {NO_SCALE_MESSAGE}"
+
+        if result.detected and result.scale_info:
+            deps.scale = result.scale_info.scale_string
+            return f"Use scale: {deps.scale}"
+
+    return NO_SCALE_MESSAGE
+
+
+async def measure_vectors(deps: TakeoffDeps) -> list[TakeoffItem]:
+    """Measure the vector linework of a run's PDF, once.
+
+    Called by get_vector_measurements, so it only runs (and only waits for
+    a pending scale, like get_scale) when the model asks. The items are
+    kept on deps.vector_items; the server adds the groups the model labeled
+    to the result. Empty for images, scans and runs without a scale.
+    """
+    from python_api.services import GeometryService
+    from python_api.services.metrics import timed
+
+    if deps.vector_items is not None:
+        return deps.vector_items
+    if deps.vector_data is None or deps.vector_data[:4] != b"%PDF":
+        deps.vector_items = []
+        return deps.vector_items
+
+    await resolve_scale(deps)
+    if not deps.scale:
+        return []
+
+    with timed("geometry"):
+        deps.vector_items = await asyncio.to_thread(
+            GeometryService.measure, deps.vector_data, ScaleInfo(scale_string=deps.scale)
+        )
+    return deps.vector_items
+
+
+def vector_groups(items: list[TakeoffItem]) -> list[dict]:
+    """Describe measured vector items for the model to label, without their quantities."""
+    from python_api.services import GeometryService
+
+    groups = []
+    for index, item in enumerate(items):
+        group = {
+            "group_id": GeometryService.group_id(index),
+            "category": item.category.value,
+            "linework": item.name,
+        }
+        if item.location:
+            group["location"] = item.location
+        groups.append(group)
+    return groups
+
+
+def run_instructions(deps: TakeoffDeps) -> str:
+    """Per-run context: the scale and focus areas, known before the model is called.
+
+    Re-evaluated before every model request, so a scale detection that
+    finishes mid-run reaches the model without a get_scale call.
+    """
+    if not deps.scale and deps.scale_task is not None and deps.scale_task.done():
+        if not deps.scale_task.cancelled() and deps.scale_task.exception() is None:
+            result = deps.scale_task.result()
+            if result.detected and result.scale_info:
+                deps.scale = result.scale_info.scale_string
+
+    if deps.scale:
+        scale = f"Scale: {deps.scale}. Use it for all measurements."
+    elif deps.scale_task is not None and not deps.scale_task.done():
+        scale = "Scale detection is still running. Call get_scale once, when you first need a measurement."
+    else:
+        scale = NO_SCALE_MESSAGE
+
+    if deps.focus_areas:
+        focus = f"Focus on these elements: {', '.join(deps.focus_areas)}"
+    else:
+        focus = "Analyze all visible construction elements."
+    return f"## This Blueprint\n\n- {scale}\n- {focus}"
+
+
+def _check_lengths(**columns: list[float]) -> None:
+    from pydantic_ai import ModelRetry
+
+    if len({len(values) for values in columns.values()}) > 1:
+        sizes = ", ".join(f"{name}={len(values)}" for name, values in columns.items())
+        raise ModelRetry(f"Arrays must be the same length (got {sizes})")
+
+
+def calculate_areas(lengths: list[float], widths: list[float]) -> list[float]:
+    """Calculate the areas of many rectangles in one call.
+
+    Args:
+        lengths: Length of each rectangle
+        widths: Width of each rectangle, in the same order
+    """
+    import numpy as np
+
+    _check_lengths(lengths=lengths, widths=widths)
+    return np.round(np.multiply(lengths, widths, dtype=float), 2).tolist()
+
+
+def calculate_linear_totals(segment_groups: list[list[float]]) -> list[float]:
+    """Calculate total lengths of many runs in one call.
+
+    Args:
+        segment_groups: Segment lengths of each run (one list per run)
+    """
+    import numpy as np
+
+    sizes = [len(group) for group in segment_groups]
+    segments = np.fromiter((s for group in segment_groups for s in group), dtype=float, count=sum(sizes))
+    owner = np.repeat(np.arange(len(sizes)), sizes)
+    return np.round(np.bincount(owner, weights=segments, minlength=len(sizes)), 2).tolist()
+
+
+def calculate_volumes(lengths: list[float], widths: list[float], depths: list[float]) -> list[float]:
+    """Calculate the volumes of many rectangular solids in one call.
+
+    Args:
+        lengths: Length of each solid
+        widths: Width of each solid, in the same order
+        depths: Depth or height of each solid, in the same order
+    """
+    import numpy as np
+
+    _check_lengths(lengths=lengths, widths=widths, depths=depths)
+    volumes = np.multiply(lengths, widths, dtype=float) * np.asarray(depths, dtype=float)
+    return np.round(volumes, 2).tolist()
+
+
+def tool_call_counts(messages: list) -> dict[str, int]:
+    """Calls to each of the takeoff agent's function tools (not its output tool) in a run."""
+    from pydantic_ai.messages import ModelResponse, ToolCallPart
+
+    names = {name for toolset in get_takeoff_agent().toolsets for name in getattr(toolset, "tools", {})}
+    counts: dict[str, int] = {}
+    for message in messages:
+        if isinstance(message, ModelResponse):
+            for part in message.parts:
+                if isinstance(part, ToolCallPart) and part.tool_name in names:
+                    counts[part.tool_name] = counts.get(part.tool_name, 0) + 1
+    return counts
+
+
+@functools.cache
+def get_takeoff_agent() -> "Agent[TakeoffDeps, TakeoffOutput]":
+    """The takeoff agent, built on first use.
 
+    pydantic_ai and the model client are imported here rather than at
+    module level, so importing the API (and serving /api/health) doesn't
+    pay for them on a cold start.
+    """
+    from pydantic_ai import Agent, RunContext
+    from pydantic_ai.tools import ToolDefinition
 
-@takeoff_agent.tool
-async def get_scale(ctx: RunContext[TakeoffDeps]) -> str:
-    """Get the scale to use for measurements."""
-    if ctx.deps.scale:
-        return f"Use scale: {ctx.deps.scale}"
-    return "No scale provided. Estimate dimensions based on standard construction elements (doors are typically 3' wide, 6'8\" tall)."
+    from .provider import get_model
 
+    agent = Agent(
+        # Shared client; requests share one adaptive concurrency limit across agents
+        get_model(TAKEOFF_MODEL_NAME),
+        deps_type=TakeoffDeps,
+        output_type=TakeoffOutput,
+        instructions=TAKEOFF_INSTRUCTIONS,
+    )
 
-@takeoff_agent.tool
-async def get_focus_areas(ctx: RunContext[TakeoffDeps]) -> str:
-    """Get any specific areas to focus on."""
-    if ctx.deps.focus_areas:
-        return f"Focus on these elements: {', '.join(ctx.deps.focus_areas)}"
-    return "Analyze all visible construction elements."
+    @agent.instructions
+    def this_blueprint(ctx: RunContext[TakeoffDeps]) -> str:
+        return run_instructions(ctx.deps)
 
+    async def while_detecting(ctx: RunContext[TakeoffDeps], tool: ToolDefinition) -> ToolDefinition | None:
+        # Offered only while detection is pending; otherwise the scale is in the instructions
+        pending = not ctx.deps.scale and ctx.deps.scale_task is not None and not ctx.deps.scale_task.done()
+        return tool if pending else None
 
-@takeoff_agent.tool_plain
-def calculate_area(length: float, width: float) -> float:
-    """Calculate area from length and width."""
-    return round(length * width, 2)
+    @agent.tool(prepare=while_detecting)
+    async def get_scale(ctx: RunContext[TakeoffDeps]) -> str:
+        """Wait for scale detection and get the scale to use for measurements."""
+        return await resolve_scale(ctx.deps)
 
+    @agent.tool
+    async def get_vector_measurements(ctx: RunContext[TakeoffDeps]) -> list[dict] | str:
+        """List the groups of linework measured from the drawing's vector paths.
 
-@takeoff_agent.tool_plain
-def calculate_linear_total(segments: list[float]) -> float:
-    """Calculate total linear measurement from segments."""
-    return round(sum(segments), 2)
+        Each group is the stroked lines (LINEAR) or closed outlines (AREA)
+        of one line weight and color. Name each group in vector_labels by
+        its group_id; the measured quantities are added to the takeoff.
+        """
+        if ctx.deps.vector_data is None:
+            return "No vector drawing available. Measure from the drawing."
+        items = await measure_vectors(ctx.deps)
+        if items:
+            return vector_groups(items)
+        if ctx.deps.vector_items is None:
+            return f"{NO_SCALE_MESSAGE} Vector measurements need a scale."
+        return "No measurable vector linework (scanned or raster drawing). Measure from the drawing."
 
+    agent.tool_plain(calculate_areas)
+    agent.tool_plain(calculate_linear_totals)
+    agent.tool_plain(calculate_volumes)
+    return agent
 
-@takeoff_agent.tool_plain
-def calculate_volume(length: float, width: float, depth: float) -> float:
-    """Calculate volume from dimensions."""
-    return round(length * width * depth, 2)
@@ -1,17 +1,28 @@
 from .takeoff import (
     TakeoffItem,
+    TakeoffOutput,
     TakeoffResult,
+    VectorLabel,
     TakeoffRequest,
+    BatchTakeoffRequest,
     MeasurementCategory,
+    RenderProfileName,
 )
 from .blueprint import BlueprintMeta, BlueprintPage, ScaleInfo
+from .job import JobStatus, TakeoffJob
 
 __all__ = [
     "TakeoffItem",
+    "TakeoffOutput",
     "TakeoffResult",
+    "VectorLabel",
     "TakeoffRequest",
+    "BatchTakeoffRequest",
     "MeasurementCategory",
+    "RenderProfileName",
     "BlueprintMeta",
     "BlueprintPage",
     "ScaleInfo",
+    "JobStatus",
+    "TakeoffJob",
 ]
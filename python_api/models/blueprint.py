@@ -67,6 +67,8 @@ class BlueprintPage(BaseModel):
 
     page_number: int = Field(ge=1, description="Page number (1-indexed)")
     image_data: bytes | None = Field(default=None, description="Raw image bytes")
+    media_type: str | None = Field(default=None, description="MIME type of image_data")
+    pdf_data: bytes | None = Field(default=None, description="Single-page PDF bytes")
     image_url: str | None = Field(default=None, description="URL to page image")
     width_px: int = Field(description="Width in pixels")
     height_px: int = Field(description="Height in pixels")
@@ -0,0 +1,41 @@
+from typing import Literal
+
+from pydantic import BaseModel, Field
+
+from .takeoff import TakeoffItem, TakeoffResult
+
+JobStatus = Literal["queued", "running", "succeeded", "failed"]
+
+
+class TakeoffJob(BaseModel):
+    """State of a background takeoff job."""
+
+    id: str = Field(description="Job identifier")
+    status: JobStatus = Field(description="queued, running, succeeded or failed")
+    blueprint_url: str = Field(description="Blueprint being analyzed")
+    progress: int = Field(default=0, ge=0, le=100, description="Progress percentage")
+    message: str = Field(default="", description="Latest progress message")
+    item_count: int = Field(default=0, description="Items found so far")
+    items: list[TakeoffItem] | None = Field(
+        default=None,
+        description="Items found so far (while the job is running)"
+    )
+    result: TakeoffResult | None = Field(default=None, description="Final result once succeeded")
+    error: str | None = Field(default=None, description="Error message if the job failed")
+    error_code: str | None = Field(default=None, description="Error code if the job failed")
+    created_at: float = Field(description="Creation time (Unix seconds)")
+    updated_at: float = Field(description="Last update time (Unix seconds)")
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "id": "3f2b8c1e9a7d4e5f8b6c2a1d0e9f8a7b",
+                "status": "running",
+                "blueprint_url": "https://blob.vercel-storage.com/blueprints/floor-plan.pdf",
+                "progress": 55,
+                "message": "Analyzed page 3 (3 of 6)",
+                "item_count": 42,
+                "created_at": 1760000000.0,
+                "updated_at": 1760000042.5
+            }
+        }
@@ -1,6 +1,11 @@
 from enum import Enum
+from typing import Literal
+
 from pydantic import BaseModel, Field
 
+# Rasterization profiles for model payloads (see services/raster_service.py)
+RenderProfileName = Literal["fast", "balanced", "accurate"]
+
 
 class MeasurementCategory(str, Enum):
     """Types of measurements in construction takeoff."""
@@ -39,13 +44,75 @@ class TakeoffItem(BaseModel):
         }
 
 
+class VectorLabel(BaseModel):
+    """The model's name for a group of measured vector linework."""
+
+    group_id: str = Field(description="Group id from get_vector_measurements (e.g. 'V1')")
+    name: str = Field(description="What the group is (e.g. 'Exterior Wall', 'Slab on Grade')")
+    skip: bool = Field(
+        default=False,
+        description="True for annotation, dimensioning or hatching, which isn't taken off"
+    )
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "group_id": "V1",
+                "name": "Exterior Wall",
+                "skip": False
+            }
+        }
+
+
+class TakeoffOutput(BaseModel):
+    """What the takeoff model writes; totals and units are settled by the server.
+
+    Measured vector groups are only named here; their quantities are added
+    to the result by the server.
+    """
+
+    items: list[TakeoffItem] = Field(default_factory=list, description="All extracted items")
+    vector_labels: list[VectorLabel] = Field(
+        default_factory=list,
+        description="Names for the vector groups from get_vector_measurements, by group id"
+    )
+    notes: list[str] = Field(
+        default_factory=list,
+        description="General notes and observations"
+    )
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "items": [
+                    {
+                        "name": "Interior Door",
+                        "category": "count",
+                        "quantity": 12,
+                        "unit": "ea",
+                        "confidence": 0.95
+                    }
+                ],
+                "vector_labels": [
+                    {"group_id": "V1", "name": "Exterior Wall"},
+                    {"group_id": "V2", "name": "Dimension Lines", "skip": True}
+                ],
+                "notes": ["Scale verified from title block"]
+            }
+        }
+
+
 class TakeoffResult(BaseModel):
     """Complete takeoff result from blueprint analysis."""
 
     items: list[TakeoffItem] = Field(default_factory=list, description="All extracted items")
     summary: dict[str, float] = Field(
         default_factory=dict,
-        description="Summary totals by category"
+        description="Totals by category and unit (e.g. 'linear_lf'), computed from the items"
+    )
+    type_totals: dict[str, float] = Field(
+        default_factory=dict,
+        description="Totals by item name and unit (e.g. 'Interior Door (ea)'), computed from the items"
     )
     notes: list[str] = Field(
         default_factory=list,
@@ -67,9 +134,13 @@ class TakeoffResult(BaseModel):
                     }
                 ],
                 "summary": {
-                    "total_doors": 14,
-                    "total_windows": 8,
-                    "total_wall_lf": 850
+                    "count_ea": 22,
+                    "linear_lf": 850
+                },
+                "type_totals": {
+                    "Interior Door (ea)": 14,
+                    "Window (ea)": 8,
+                    "Interior Wall (LF)": 850
                 },
                 "notes": ["Scale verified from title block"],
                 "scale_used": "1/4\" = 1'-0\"",
@@ -94,6 +165,10 @@ class TakeoffRequest(BaseModel):
         default=None,
         description="Specific areas to focus on (e.g., ['doors', 'windows', 'electrical'])"
     )
+    render_profile: RenderProfileName | None = Field(
+        default=None,
+        description="Rasterize pages before analysis: 'fast', 'balanced' or 'accurate' (default sends the original file)"
+    )
 
     class Config:
         json_schema_extra = {
@@ -101,6 +176,38 @@ class TakeoffRequest(BaseModel):
                 "blueprint_url": "https://blob.vercel-storage.com/blueprints/floor-plan.pdf",
                 "scale": None,
                 "auto_detect_scale": True,
-                "focus_areas": None
+                "focus_areas": None,
+                "render_profile": "balanced"
+            }
+        }
+
+
+class BatchTakeoffRequest(BaseModel):
+    """Request to run takeoffs on many blueprints."""
+
+    requests: list[TakeoffRequest] = Field(
+        min_length=1,
+        description="Takeoff requests, one per blueprint"
+    )
+    concurrency: int | None = Field(
+        default=None,
+        ge=1,
+        description="Blueprints analyzed at the same time (defaults to the server setting)"
+    )
+    item_timeout: float | None = Field(
+        default=None,
+        gt=0,
+        description="Seconds allowed per blueprint before it is reported as timed out"
+    )
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "requests": [
+                    {"blueprint_url": "https://blob.vercel-storage.com/blueprints/A-101.pdf"},
+                    {"blueprint_url": "https://blob.vercel-storage.com/blueprints/A-102.pdf"}
+                ],
+                "concurrency": 4,
+                "item_timeout": 120
             }
         }
@@ -1,3 +1,4 @@
 from .takeoffs import router as takeoffs_router
+from .metrics import router as metrics_router
 
-__all__ = ["takeoffs_router"]
+__all__ = ["takeoffs_router", "metrics_router"]
@@ -0,0 +1,27 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from python_api.agents import model_scheduler
+from python_api.services import metrics
+
+router = APIRouter(tags=["metrics"])
+
+# Prometheus text exposition format
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+metrics.gauge(
+    "model_concurrency_limit",
+    "Current adaptive limit on concurrent model requests",
+    lambda: model_scheduler.limit,
+)
+metrics.gauge(
+    "model_in_flight",
+    "Model requests currently holding a scheduler slot",
+    lambda: model_scheduler.in_flight,
+)
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def prometheus_metrics() -> PlainTextResponse:
+    """Stage timings, request and model counters and token usage for Prometheus."""
+    return PlainTextResponse(metrics.render(), media_type=CONTENT_TYPE)
@@ -1,176 +1,812 @@
+import asyncio
+import hashlib
+import json
 import logging
+import os
+import time
+from collections import Counter
+from typing import AsyncIterator, Callable, Iterator
+from urllib.parse import urlparse
 
 import httpx
-from fastapi import APIRouter, HTTPException, Query
+from fastapi import APIRouter, Header, HTTPException, Query, Response
+from pydantic import BaseModel
 from sse_starlette.sse import EventSourceResponse
-from pydantic_ai.messages import BinaryContent
 
-from python_api.models import TakeoffRequest, TakeoffResult
-from python_api.agents import takeoff_agent, TakeoffDeps, detect_scale
-from python_api.services import FileService, StreamService
+from python_api.models import (
+    BatchTakeoffRequest,
+    BlueprintMeta,
+    BlueprintPage,
+    RenderProfileName,
+    TakeoffItem,
+    TakeoffJob,
+    TakeoffRequest,
+    TakeoffResult,
+)
+from python_api.agents import (
+    TAKEOFF_AGENT_VERSION,
+    Hedger,
+    ScaleDetectionResult,
+    detect_scale,
+    detect_scale_from_text,
+    model_priority,
+    model_scheduler,
+)
+from python_api.services import (
+    BatchService,
+    ColumnarService,
+    FileService,
+    FileTooLargeError,
+    JobService,
+    PreparedDocument,
+    RasterService,
+    ReplayService,
+    SingleFlight,
+    StageTimer,
+    StreamService,
+    TakeoffService,
+    blob_cache,
+    current_timer,
+    job_store,
+    takeoff_cache,
+)
+from python_api.services.metrics import timed
+from python_api.services.columnar_service import JSON_MEDIA_TYPE, MSGPACK_MEDIA_TYPE
+from python_api.services.batch_service import (
+    BATCH_CONCURRENCY,
+    BATCH_ITEM_TIMEOUT,
+    BATCH_MAX_CONCURRENCY,
+    BATCH_MAX_ITEMS,
+)
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/takeoff", tags=["takeoff"])
 
+# Concurrent identical analyses and scale detections share one run
+analysis_flights: SingleFlight[TakeoffResult] = SingleFlight("analysis")
+scale_flights: SingleFlight[ScaleDetectionResult] = SingleFlight("scale detection")
 
-@router.post("/analyze")
-async def analyze_blueprint(request: TakeoffRequest) -> TakeoffResult:
-    """Analyze a blueprint and return takeoff results.
+# How often job event streams check the job store for changes
+JOB_POLL_INTERVAL = float(os.getenv("TAKEOFF_JOB_POLL_INTERVAL", 0.5))
 
-    This is the non-streaming version that returns the complete result.
+# Media types a takeoff result can be returned as, chosen by the Accept header
+RESULT_CONTENT = {JSON_MEDIA_TYPE: {}, MSGPACK_MEDIA_TYPE: {}}
+
+# Stored job columns returned as they are
+JOB_FIELDS = (
+    "id", "status", "blueprint_url", "progress", "message", "item_count",
+    "error", "error_code", "created_at", "updated_at",
+)
+
+
+def _result_events(
+    result: TakeoffResult, streamed: list[TakeoffItem] | None = None
+) -> Iterator[str]:
+    """Yield the item and completion SSE events for a takeoff result.
+
+    Args:
+        result: Final takeoff result
+        streamed: Items already sent as they were found; when these don't
+            match the result, the complete event carries the full item list
+            for the client to replace its own
+    """
+    yield StreamService.progress_event(90, 100, "Finalizing results...")
+
+    # Stream individual items
+    if streamed is None:
+        for item in result.items:
+            yield StreamService.format_sse("item", item)
+        streamed = result.items
+
+    yield StreamService.progress_event(100, 100, "Complete")
+
+    # Send complete event with summary
+    complete = {
+        "total_items": len(result.items),
+        "summary": result.summary,
+        "type_totals": result.type_totals,
+        "notes": result.notes,
+        "scale_used": result.scale_used,
+    }
+    if not TakeoffService.reconcile(streamed, result):
+        logger.warning(
+            f"Streamed items ({len(streamed)}) don't match the result ({len(result.items)}); "
+            "sending the full list"
+        )
+        complete["items"] = [item.model_dump(mode="json") for item in result.items]
+    yield StreamService.complete_event(complete)
+
+
+async def _resolve_scale(
+    request: TakeoffRequest, document: PreparedDocument
+) -> tuple[str | None, ScaleDetectionResult | None, asyncio.Task | None]:
+    """Resolve the scale without blocking the takeoff on an LLM call.
+
+    Returns the scale (if known now), the local text-layer detection result
+    (if any) and a pending LLM detection task when the text layer had no
+    usable notation.
+    """
+    if request.scale or not request.auto_detect_scale:
+        return request.scale, None, None
+
+    with timed("detect"):
+        text_result = await detect_scale_from_text(document.data)
+    if text_result and text_result.scale_info:
+        return text_result.scale_info.scale_string, text_result, None
+
+    # Keyed by content so requests for the same sheet share one detection
+    digest = await asyncio.to_thread(document.digest)
+    scale_task = asyncio.create_task(scale_flights.run(
+        f"{digest}:{request.render_profile}",
+        lambda: detect_scale(
+            document,
+            use_text_layer=False,
+            render_profile=request.render_profile,
+            hedge_route="takeoff-scale",
+        ),
+    ))
+
+    # LLM detection runs alongside the model; it counts once it's finished
+    timer = current_timer.get()
+    if timer is not None:
+        started = time.perf_counter()
+
+        def on_detected(task: asyncio.Task) -> None:
+            if not task.cancelled():
+                timer.record("detect", time.perf_counter() - started)
+
+        scale_task.add_done_callback(on_detected)
+    return None, None, scale_task
+
+
+def _render_profile_name(request: TakeoffRequest) -> str | None:
+    """Name of the render profile a request resolves to (None sends the original file)."""
+    profile = RasterService.get_profile(request.render_profile)
+    return profile.name if profile else None
+
+
+def _blueprint_meta(request: TakeoffRequest, pages: list[BlueprintPage]) -> BlueprintMeta:
+    """Describe the document as prepared for the model (dimensions of the first page)."""
+    first = pages[0] if pages else None
+    return BlueprintMeta(
+        url=request.blueprint_url,
+        filename=os.path.basename(urlparse(request.blueprint_url).path) or "blueprint",
+        page_count=max(1, len(pages)),
+        width_px=first.width_px if first else None,
+        height_px=first.height_px if first else None,
+    )
+
+
+def _scale_event(scale_result: ScaleDetectionResult) -> str:
+    """Create the scale SSE event for a detection result."""
+    if scale_result.detected and scale_result.scale_info:
+        return StreamService.format_sse("scale", {
+            "detected": True,
+            "scale": scale_result.scale_info.scale_string,
+            "confidence": scale_result.scale_info.confidence,
+            "reasoning": scale_result.reasoning,
+        })
+    return StreamService.format_sse("scale", {
+        "detected": False,
+        "reasoning": scale_result.reasoning,
+    })
+
+
+def _scale_task_event(task: asyncio.Task) -> str | None:
+    """Create the scale SSE event once a detection task finishes."""
+    if task.cancelled():
+        return None
+    if task.exception() is not None:
+        return StreamService.format_sse("scale", {
+            "detected": False,
+            "reasoning": f"Scale detection failed: {task.exception()}",
+        })
+    return _scale_event(task.result())
+
+
+def _request_key(request: BaseModel) -> str:
+    """Key identical requests (URL and every option) for coalescing."""
+    return hashlib.sha256(
+        f"{type(request).__name__}:{request.model_dump_json()}".encode()
+    ).hexdigest()
+
+
+async def _analyze(request: TakeoffRequest) -> TakeoffResult:
+    """Fetch a blueprint and run its takeoff, serving repeats from the cache.
+
+    Identical concurrent requests share one download and model run.
     """
+    return await analysis_flights.run(_request_key(request), lambda: _run_analysis(request))
+
+
+async def _run_analysis(request: TakeoffRequest) -> TakeoffResult:
+    scale_task = None
     try:
         # Fetch the blueprint file
-        file_bytes = await FileService.fetch_file(request.blueprint_url)
-        mime_type = FileService.get_mime_type(file_bytes)
-
-        # Determine scale
-        scale = request.scale
-        if not scale and request.auto_detect_scale:
-            scale_result = await detect_scale(file_bytes)
-            if scale_result.detected and scale_result.scale_info:
-                scale = scale_result.scale_info.scale_string
-
-        # Create dependencies
-        deps = TakeoffDeps(
-            project_id="temp",
-            blueprint_data=file_bytes,
-            scale=scale,
-            focus_areas=request.focus_areas,
+        with timed("fetch"):
+            file_bytes = await FileService.fetch_file(request.blueprint_url)
+        # Sniffed, hashed, encoded and uploaded once for detection and takeoff
+        document = PreparedDocument(file_bytes)
+
+        # Determine scale; LLM detection overlaps with the takeoff run
+        scale, _, scale_task = await _resolve_scale(request, document)
+
+        # Serve repeat analyses of the same sheet from the cache
+        cache_key = takeoff_cache.make_key(
+            document.data,
+            scale or ("auto" if scale_task else None),
+            request.focus_areas,
+            TAKEOFF_AGENT_VERSION,
+            _render_profile_name(request),
+            digest=await asyncio.to_thread(document.digest),
         )
+        cached = await takeoff_cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+        # Run the agent (per page for multi-page PDFs)
+        result, complete = await TakeoffService.run(
+            document, scale, request.focus_areas, scale_task, request.render_profile
+        )
+        if complete:
+            await takeoff_cache.set(cache_key, result)
+
+        return result
+
+    finally:
+        # The model never asked for the scale; don't pay for the rest of detection
+        if scale_task and not scale_task.done():
+            scale_task.cancel()
+
 
-        # Build the message with file (Gemini handles PDF/images directly)
-        messages = [
-            "Analyze this blueprint and perform a complete quantity takeoff.",
-            BinaryContent(data=file_bytes, media_type=mime_type),
-        ]
+def _resumable(
+    request: TakeoffRequest | BatchTakeoffRequest,
+    last_event_id: str | None,
+    generate: Callable[[], AsyncIterator[str]],
+) -> EventSourceResponse:
+    """Serve an event stream that survives client reconnects.
 
-        # Run the agent
-        result = await takeoff_agent.run(messages, deps=deps)
+    A request carrying the Last-Event-ID of a live or recently finished
+    stream for the same body is attached to that stream and sent only the
+    events after the id. Without one, a request identical to a stream still
+    running receives that stream's events from the start; anything else
+    starts a new stream.
+    """
+    key = _request_key(request)
+    resumed = ReplayService.resume(last_event_id, key)
+    if resumed:
+        session, after = resumed
+        logger.info(f"Resuming stream {session.id} after event {after}")
+    else:
+        # Identical requests already streaming share that stream's events
+        session = ReplayService.join(key) or ReplayService.start(key, generate())
+        after = 0
+    return EventSourceResponse(StreamService.coalesce(ReplayService.subscribe(session, after)))
+
+
+def _error_code(error: BaseException) -> str:
+    """Map a pipeline error to the code reported in SSE error payloads."""
+    if isinstance(error, FileTooLargeError):
+        return "FILE_TOO_LARGE"
+    if isinstance(error, httpx.HTTPError):
+        return "FETCH_FAILED"
+    if isinstance(error, TimeoutError):
+        return "TIMEOUT"
+    return "ERROR"
+
+
+@router.post(
+    "/analyze",
+    response_class=Response,
+    responses={200: {"model": TakeoffResult, "content": RESULT_CONTENT}},
+)
+async def analyze_blueprint(
+    request: TakeoffRequest,
+    accept: str | None = Header(None),
+) -> Response:
+    """Analyze a blueprint and return takeoff results.
 
-        return result.output
+    This is the non-streaming version that returns the complete result.
+    Time spent in each stage (fetch, sniff, detect, model, serialize) is
+    reported in the Server-Timing header.
+
+    JSON by default; with Accept: application/msgpack the items are sent
+    as columns (see ColumnarService), which is much smaller for large sets.
+    """
+    timer = StageTimer("analyze")
+    current_timer.set(timer)
+    try:
+        result = await _analyze(request)
+        media_type = ColumnarService.negotiate(accept)
+        with timer.stage("serialize"):
+            if media_type == MSGPACK_MEDIA_TYPE:
+                body = ColumnarService.encode_result(result)
+            else:
+                body = result.model_dump_json()
+        timer.finish()
+        return Response(
+            content=body,
+            media_type=media_type,
+            headers={"Server-Timing": timer.server_timing(), "Vary": "Accept"},
+        )
 
+    except FileTooLargeError as e:
+        timer.finish(_error_code(e).lower())
+        raise HTTPException(status_code=413, detail=str(e))
     except httpx.HTTPError as e:
+        timer.finish(_error_code(e).lower())
         logger.error(f"HTTP error fetching blueprint: {e}")
         raise HTTPException(status_code=400, detail="Failed to fetch blueprint")
     except Exception as e:
+        timer.finish(_error_code(e).lower())
         logger.exception("Analysis failed")
         raise HTTPException(status_code=500, detail="Analysis failed. Please try again.")
 
 
 @router.post("/stream")
-async def stream_takeoff(request: TakeoffRequest):
+async def stream_takeoff(
+    request: TakeoffRequest,
+    last_event_id: str | None = Header(None),
+):
     """Stream takeoff analysis results via Server-Sent Events.
 
     Events:
     - progress: Analysis progress updates
-    - item: Individual takeoff items as they're identified
+    - item: Individual takeoff items, each sent once as soon as the model completes it
     - scale: Detected scale information
-    - complete: Final summary when analysis is done
+    - meta: Page count and page size as sent to the model
+    - page: A page of a multi-page PDF finished (its items follow)
+    - complete: Final summary when analysis is done (with the full item list
+      if it differs from the streamed items)
+    - timing: Milliseconds spent in each stage (fetch, sniff, detect,
+      model_ttft, model, serialize), the total and token usage
     - error: Error information if something fails
+
+    Every event has an id. The analysis isn't tied to the connection: POST
+    the same body with a Last-Event-ID header to pick up where a dropped
+    stream left off (see _resumable).
     """
 
     async def generate():
+        timer = StageTimer("stream")
+        current_timer.set(timer)
+        outcome = "ok"
+        scale_task = None
+        model_task = None
         try:
             # Send initial progress
             yield StreamService.progress_event(0, 100, "Fetching blueprint...")
 
             # Fetch the blueprint file
-            file_bytes = await FileService.fetch_file(request.blueprint_url)
-            file_info = FileService.get_file_info(file_bytes)
-            mime_type = FileService.get_mime_type(file_bytes)
+            with timer.stage("fetch"):
+                file_bytes = await FileService.fetch_file(request.blueprint_url)
+            with timer.stage("sniff"):
+                document = PreparedDocument(file_bytes)
 
             yield StreamService.progress_event(10, 100, "Blueprint loaded")
             yield StreamService.format_sse("info", {
-                "type": file_info["file_type"],
-                "size": file_info["size"],
+                "type": document.file_type,
+                "size": document.size,
             })
 
-            # Scale detection
-            scale = request.scale
-            if not scale and request.auto_detect_scale:
+            # Scale detection; LLM detection overlaps with the takeoff run
+            if not request.scale and request.auto_detect_scale:
                 yield StreamService.progress_event(20, 100, "Detecting scale...")
-                scale_result = await detect_scale(file_bytes)
-
-                if scale_result.detected and scale_result.scale_info:
-                    scale = scale_result.scale_info.scale_string
-                    yield StreamService.format_sse("scale", {
-                        "detected": True,
-                        "scale": scale,
-                        "confidence": scale_result.scale_info.confidence,
-                        "reasoning": scale_result.reasoning,
-                    })
-                else:
-                    yield StreamService.format_sse("scale", {
-                        "detected": False,
-                        "reasoning": scale_result.reasoning,
-                    })
+            scale, text_result, scale_task = await _resolve_scale(request, document)
+            if text_result:
+                yield _scale_event(text_result)
+
+            # Replay cached results without calling the model
+            cache_key = takeoff_cache.make_key(
+                document.data,
+                scale or ("auto" if scale_task else None),
+                request.focus_areas,
+                TAKEOFF_AGENT_VERSION,
+                _render_profile_name(request),
+                digest=await asyncio.to_thread(document.digest),
+            )
+            cached = await takeoff_cache.get(cache_key)
+            if cached is not None:
+                for event in _result_events(cached):
+                    yield event
+                yield StreamService.format_sse("timing", timer.as_dict())
+                return
 
             yield StreamService.progress_event(30, 100, "Analyzing blueprint...")
 
-            # Create dependencies
-            deps = TakeoffDeps(
-                project_id="temp",
-                blueprint_data=file_bytes,
-                scale=scale,
-                focus_areas=request.focus_areas,
+            # Multi-page PDFs are analyzed per page; everything else in one call.
+            # With a render profile, pages are rasterized before they're sent.
+            pages = await TakeoffService.prepare_pages(document, request.render_profile)
+            yield StreamService.format_sse(
+                "meta", _blueprint_meta(request, pages).model_dump(exclude_none=True)
             )
 
-            # Build message with file (Gemini handles PDF/images directly)
-            messages = [
-                "Analyze this blueprint and perform a complete quantity takeoff.",
-                BinaryContent(data=file_bytes, media_type=mime_type),
-            ]
+            # Model events and the scale event share one queue; None ends the stream
+            queue: asyncio.Queue[str | None] = asyncio.Queue()
+
+            if scale_task:
+                def on_scale_done(task: asyncio.Task) -> None:
+                    event = _scale_task_event(task)
+                    if event:
+                        queue.put_nowait(event)
+
+                scale_task.add_done_callback(on_scale_done)
+
+            async def run_whole_file() -> None:
+                queue.put_nowait(StreamService.progress_event(50, 100, "AI analyzing..."))
+
+                # Items are sent as soon as the model closes them
+                streamed: list[TakeoffItem] = []
+                async for output in TakeoffService.stream_file(
+                    TakeoffService.file_document(document, pages),
+                    scale, request.focus_areas, scale_task, vector_data=document.data,
+                ):
+                    if isinstance(output, TakeoffItem):
+                        streamed.append(output)
+                        queue.put_nowait(StreamService.format_sse("item", output))
+                    else:
+                        result = output
+
+                await takeoff_cache.set(cache_key, result)
+                for event in _result_events(result, streamed):
+                    queue.put_nowait(event)
+
+            async def run_pages() -> None:
+                page_results = []
+                streamed: list[TakeoffItem] = []
+                async for page_number, page_result in TakeoffService.iter_pages(
+                    pages, scale, request.focus_areas, scale_task
+                ):
+                    page_results.append((page_number, page_result))
+                    done = len(page_results)
+                    queue.put_nowait(StreamService.progress_event(
+                        30 + round(60 * done / len(pages)), 100,
+                        f"Analyzed page {page_number} ({done} of {len(pages)})",
+                    ))
+
+                    if isinstance(page_result, Exception):
+                        queue.put_nowait(StreamService.format_sse("page", {
+                            "page": page_number,
+                            "total_pages": len(pages),
+                            "error": str(page_result),
+                        }))
+                        continue
+
+                    queue.put_nowait(StreamService.format_sse("page", {
+                        "page": page_number,
+                        "total_pages": len(pages),
+                        "items": len(page_result.items),
+                    }))
+                    for item in page_result.items:
+                        streamed.append(item)
+                        queue.put_nowait(StreamService.format_sse("item", item))
+
+                result = TakeoffService.merge_results(page_results, len(pages))
+                if not any(isinstance(r, Exception) for _, r in page_results):
+                    await takeoff_cache.set(cache_key, result)
+
+                for event in _result_events(result, streamed):
+                    queue.put_nowait(event)
+
+            async def run_model() -> None:
+                try:
+                    if len(pages) > 1:
+                        await run_pages()
+                    else:
+                        await run_whole_file()
+                finally:
+                    queue.put_nowait(None)
+
+            model_task = asyncio.create_task(run_model())
+            while (event := await queue.get()) is not None:
+                yield event
+
+            # Surface model errors
+            await model_task
+            yield StreamService.format_sse("timing", timer.as_dict())
 
-            # Run the agent with streaming
-            async with takeoff_agent.run_stream(messages, deps=deps) as response:
-                yield StreamService.progress_event(50, 100, "AI analyzing...")
+        except Exception as e:
+            outcome = _error_code(e).lower()
+            yield StreamService.error_event(str(e), code=_error_code(e))
+        finally:
+            for task in (model_task, scale_task):
+                if task and not task.done():
+                    task.cancel()
+            timer.finish(outcome)
 
-                # Stream partial results
-                async for chunk in response.stream():
-                    if chunk:
-                        yield StreamService.format_sse("chunk", {"text": chunk})
+    return _resumable(request, last_event_id, generate)
 
-                # Get final result
-                result = await response.get_output()
 
-                yield StreamService.progress_event(90, 100, "Finalizing results...")
+@router.post("/batch")
+async def batch_takeoff(
+    request: BatchTakeoffRequest,
+    last_event_id: str | None = Header(None),
+):
+    """Run takeoffs on many blueprints, streaming each result as it completes.
 
-                # Stream individual items
-                for item in result.items:
-                    yield StreamService.format_sse("item", item.model_dump())
+    Blueprints run through a bounded worker pool; a failure or timeout on
+    one doesn't hold up the others. Results arrive in completion order and
+    carry the index of their request.
+
+    Events:
+    - progress: Blueprints finished so far
+    - started: A blueprint began processing
+    - result: A blueprint's takeoff result
+    - failed: A blueprint failed or timed out (code, message)
+    - complete: Counts of succeeded and failed blueprints
 
-                yield StreamService.progress_event(100, 100, "Complete")
+    Like /stream, a dropped client can resume with Last-Event-ID.
+    """
+    if len(request.requests) > BATCH_MAX_ITEMS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Batch has {len(request.requests)} blueprints; the limit is {BATCH_MAX_ITEMS}",
+        )
+
+    concurrency = min(request.concurrency or BATCH_CONCURRENCY, BATCH_MAX_CONCURRENCY)
+    timeout = request.item_timeout or BATCH_ITEM_TIMEOUT
+    total = len(request.requests)
 
-                # Send complete event with summary
-                yield StreamService.complete_event({
-                    "total_items": len(result.items),
-                    "summary": result.summary,
-                    "notes": result.notes,
-                    "scale_used": result.scale_used,
+    async def generate():
+        # Model requests from the batch queue behind interactive ones
+        model_priority.set("batch")
+        finished = 0
+        failed = 0
+        yield StreamService.progress_event(0, total, f"Starting {total} blueprints...")
+
+        async for update in BatchService.run(request.requests, _analyze, concurrency, timeout):
+            item = request.requests[update.index]
+            if update.status == "started":
+                yield StreamService.format_sse("started", {
+                    "index": update.index,
+                    "blueprint_url": item.blueprint_url,
+                })
+                continue
+
+            finished += 1
+            if update.status == "succeeded":
+                yield StreamService.format_sse("result", {
+                    "index": update.index,
+                    "blueprint_url": item.blueprint_url,
+                    "elapsed": round(update.elapsed, 3),
+                    "result": update.result.model_dump(mode="json"),
                 })
+            else:
+                failed += 1
+                error = update.error
+                yield StreamService.format_sse("failed", {
+                    "index": update.index,
+                    "blueprint_url": item.blueprint_url,
+                    "elapsed": round(update.elapsed, 3),
+                    "code": _error_code(error),
+                    "message": str(error) or f"Timed out after {timeout:g}s",
+                })
+            yield StreamService.progress_event(
+                finished, total, f"Finished {finished} of {total} blueprints"
+            )
 
-        except Exception as e:
-            yield StreamService.error_event(str(e))
+        yield StreamService.complete_event({
+            "total": total,
+            "succeeded": total - failed,
+            "failed": failed,
+        })
+
+    return _resumable(request, last_event_id, generate)
+
+
+async def _run_job(job_id: str) -> None:
+    """Run a stored job's takeoff, recording progress, partial items and the result."""
+    request = await job_store.get_request(job_id)
+    if request is None:
+        return
+
+    # Jobs run behind interactive and batch requests
+    model_priority.set("background")
+    scale_task = None
+    try:
+        await job_store.update(job_id, status="running", progress=5, message="Fetching blueprint...")
+        document = PreparedDocument(await FileService.fetch_file(request.blueprint_url))
+
+        await job_store.update(job_id, progress=15, message="Detecting scale...")
+        scale, _, scale_task = await _resolve_scale(request, document)
+
+        cache_key = takeoff_cache.make_key(
+            document.data,
+            scale or ("auto" if scale_task else None),
+            request.focus_areas,
+            TAKEOFF_AGENT_VERSION,
+            _render_profile_name(request),
+            digest=await asyncio.to_thread(document.digest),
+        )
+        cached = await takeoff_cache.get(cache_key)
+        if cached is not None:
+            await job_store.succeed(job_id, cached)
+            return
+
+        await job_store.update(job_id, progress=30, message="Analyzing blueprint...")
+        pages = await TakeoffService.prepare_pages(document, request.render_profile)
+
+        if len(pages) > 1:
+            page_results = []
+            async for page_number, page_result in TakeoffService.iter_pages(
+                pages, scale, request.focus_areas, scale_task
+            ):
+                page_results.append((page_number, page_result))
+                if not isinstance(page_result, Exception):
+                    await job_store.add_items(job_id, page_result.items)
+                done = len(page_results)
+                await job_store.update(
+                    job_id,
+                    progress=30 + round(60 * done / len(pages)),
+                    message=f"Analyzed page {page_number} ({done} of {len(pages)})",
+                )
+            result = TakeoffService.merge_results(page_results, len(pages))
+            complete = not any(isinstance(r, Exception) for _, r in page_results)
+        else:
+            async for output in TakeoffService.stream_file(
+                TakeoffService.file_document(document, pages),
+                scale, request.focus_areas, scale_task, vector_data=document.data,
+            ):
+                if isinstance(output, TakeoffItem):
+                    await job_store.add_items(job_id, [output])
+                else:
+                    result = output
+            complete = True
+
+        if complete:
+            await takeoff_cache.set(cache_key, result)
+        await job_store.succeed(job_id, result)
+
+    except Exception as e:
+        logger.warning(f"Takeoff job {job_id} failed: {e}")
+        await job_store.fail(job_id, str(e), _error_code(e))
+    finally:
+        if scale_task and not scale_task.done():
+            scale_task.cancel()
+
+
+def _job_json(row: dict, items: list[str] | None = None) -> str:
+    """Serialize a stored job, splicing in its stored result and item JSON as-is."""
+    fields = {key: row[key] for key in JOB_FIELDS}
+    result = row["result"] or "null"
+    items_json = "[" + ",".join(items) + "]" if items is not None else "null"
+    return json.dumps(fields)[:-1] + f', "result": {result}, "items": {items_json}}}'
+
+
+def _job_columns(row: dict, items: list[str] | None = None) -> bytes:
+    """Pack a stored job with its result and items as columns, without building item models."""
+    fields = {key: row[key] for key in JOB_FIELDS}
+    fields["result"] = ColumnarService.stored_result_columns(row["result"]) if row["result"] else None
+    fields["items"] = ColumnarService.stored_item_columns(items) if items is not None else None
+    return ColumnarService.pack(fields)
+
+
+@router.post("/jobs", status_code=202)
+async def create_takeoff_job(request: TakeoffRequest) -> TakeoffJob:
+    """Start a takeoff in the background and return its job id right away.
+
+    Poll GET /takeoff/jobs/{id} or follow GET /takeoff/jobs/{id}/events
+    for progress, partial items and the final result.
+    """
+    row = await job_store.create(request)
+    JobService.submit(row["id"], _run_job)
+    return TakeoffJob(**row)
+
+
+@router.get(
+    "/jobs/{job_id}",
+    response_class=Response,
+    responses={
+        200: {"model": TakeoffJob, "content": RESULT_CONTENT},
+        404: {"description": "Unknown job"},
+    },
+)
+async def get_takeoff_job(job_id: str, accept: str | None = Header(None)) -> Response:
+    """Get a job's status, items found so far, and its result once finished.
+
+    Finished results are returned from the store as stored, without
+    re-validating or re-running anything. With Accept: application/msgpack
+    the result's items (and the items found so far) are sent as columns.
+    """
+    row = await job_store.get(job_id)
+    if row is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    items = None
+    if row["status"] == "running":
+        items = [item for _, item in await job_store.items(job_id)]
+
+    media_type = ColumnarService.negotiate(accept)
+    if media_type == MSGPACK_MEDIA_TYPE:
+        content = await asyncio.to_thread(_job_columns, row, items)
+    else:
+        content = _job_json(row, items)
+    return Response(content=content, media_type=media_type, headers={"Vary": "Accept"})
+
+
+@router.get("/jobs/{job_id}/events")
+async def stream_takeoff_job(job_id: str):
+    """Stream a job's progress, items and result via Server-Sent Events.
+
+    Can be opened at any point in the job's life, including after it has
+    finished; items already found are sent first.
+
+    Events:
+    - progress: Job progress updates
+    - item: Takeoff items, each sent once
+    - complete: Final summary when the job succeeded
+    - error: The job failed (or doesn't exist)
+    """
+    if await job_store.get(job_id) is None:
+        raise HTTPException(status_code=404, detail="Job not found")
 
-    return EventSourceResponse(generate())
+    async def generate():
+        last_seq = 0
+        last_progress = None
+        streamed: list[TakeoffItem] = []
+
+        while True:
+            row = await job_store.get(job_id)
+            if row is None:
+                yield StreamService.error_event("Job not found", code="NOT_FOUND")
+                return
+
+            progress = (row["progress"], row["message"])
+            if progress != last_progress and row["status"] in ("queued", "running"):
+                yield StreamService.progress_event(row["progress"], 100, row["message"] or "Queued")
+                last_progress = progress
+
+            for seq, item_json in await job_store.items(job_id, last_seq):
+                last_seq = seq
+                streamed.append(TakeoffItem.model_validate_json(item_json))
+                yield StreamService.format_sse("item", item_json)
+
+            if row["status"] == "succeeded":
+                result = TakeoffResult.model_validate_json(row["result"])
+                # Send the items that finished after the last poll
+                sent = Counter(item.model_dump_json() for item in streamed)
+                for item in result.items:
+                    key = item.model_dump_json()
+                    if sent[key]:
+                        sent[key] -= 1
+                        continue
+                    streamed.append(item)
+                    yield StreamService.format_sse("item", item)
+                for event in _result_events(result, streamed):
+                    yield event
+                return
+
+            if row["status"] == "failed":
+                yield StreamService.error_event(row["error"] or "Job failed", code=row["error_code"] or "ERROR")
+                return
+
+            await asyncio.sleep(JOB_POLL_INTERVAL)
+
+    return EventSourceResponse(StreamService.coalesce(generate()))
 
 
 @router.post("/detect-scale")
 async def detect_blueprint_scale(
-    blueprint_url: str = Query(..., description="URL of the blueprint PDF or image")
+    blueprint_url: str = Query(..., description="URL of the blueprint PDF or image"),
+    render_profile: RenderProfileName | None = Query(
+        None, description="Rasterize the first page with this profile before sending it"
+    ),
 ) -> dict:
     """Detect the scale from a blueprint.
 
     Returns scale information if detected.
     """
-    try:
+    async def run() -> ScaleDetectionResult:
         # Fetch the blueprint file
         file_bytes = await FileService.fetch_file(blueprint_url)
 
         # Detect scale (Gemini handles PDF/images directly)
-        result = await detect_scale(file_bytes)
+        return await detect_scale(file_bytes, render_profile=render_profile)
+
+    try:
+        # Concurrent requests for the same blueprint share one download and detection
+        result = await scale_flights.run(f"url:{blueprint_url}:{render_profile}", run)
 
         return {
             "detected": result.detected,
@@ -178,9 +814,31 @@ async def detect_blueprint_scale(
             "reasoning": result.reasoning,
         }
 
+    except FileTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
     except httpx.HTTPError as e:
         logger.error(f"HTTP error fetching blueprint for scale detection: {e}")
         raise HTTPException(status_code=400, detail="Failed to fetch blueprint")
     except Exception as e:
         logger.exception("Scale detection failed")
         raise HTTPException(status_code=500, detail="Scale detection failed. Please try again.")
+
+
+@router.get("/cache/stats")
+async def takeoff_cache_stats() -> dict:
+    """Get result, blob and stream replay cache sizes, hit/miss and eviction counters."""
+    return {
+        "results": takeoff_cache.stats(),
+        "blobs": blob_cache.stats() if blob_cache else None,
+        "replay": ReplayService.stats(),
+        "in_flight": {
+            "analysis": analysis_flights.stats(),
+            "scale": scale_flights.stats(),
+        },
+    }
+
+
+@router.get("/scheduler/stats")
+async def model_scheduler_stats() -> dict:
+    """Get the adaptive model concurrency limit, queue times and per-route hedge counters."""
+    return {**model_scheduler.stats(), "hedges": Hedger.all_stats()}
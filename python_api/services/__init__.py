@@ -1,7 +1,55 @@
-from .pdf_service import FileService
+from .pdf_service import FileService, FileData, FileTooLargeError
 from .stream_service import StreamService
+from .replay_service import ReplayService, StreamSession
+from .single_flight import SingleFlight
+from .metrics import MetricsRegistry, StageTimer, current_timer, metrics
+from .cache_service import TakeoffCache, takeoff_cache
+from .blob_cache import BlobCache, blob_cache
+from .raster_service import RasterService, RenderProfile, RENDER_PROFILES
+from .region_service import RegionService, RegionCrop
+from .summary_service import SummaryService
+from .columnar_service import ColumnarService
+from .document_service import PreparedDocument, FileStore
+from .takeoff_service import TakeoffService
+from .batch_service import BatchService, BatchUpdate
+from .job_store import JobStore, job_store
+from .job_service import JobService
+from .scale_parser import ScaleParser, ScaleMatch
+from .geometry_service import GeometryService, PathGeometry
 
 __all__ = [
     "FileService",
+    "FileData",
+    "FileTooLargeError",
     "StreamService",
+    "ReplayService",
+    "StreamSession",
+    "SingleFlight",
+    "MetricsRegistry",
+    "StageTimer",
+    "current_timer",
+    "metrics",
+    "TakeoffCache",
+    "takeoff_cache",
+    "BlobCache",
+    "blob_cache",
+    "RasterService",
+    "RenderProfile",
+    "RENDER_PROFILES",
+    "RegionService",
+    "RegionCrop",
+    "SummaryService",
+    "ColumnarService",
+    "PreparedDocument",
+    "FileStore",
+    "TakeoffService",
+    "BatchService",
+    "BatchUpdate",
+    "JobStore",
+    "job_store",
+    "JobService",
+    "ScaleParser",
+    "ScaleMatch",
+    "GeometryService",
+    "PathGeometry",
 ]
@@ -0,0 +1,102 @@
+import asyncio
+import logging
+import os
+import time
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Awaitable, Callable, Literal, TypeVar
+
+logger = logging.getLogger(__name__)
+
+# Blueprints analyzed at the same time per batch (each may fan out per page)
+BATCH_CONCURRENCY = int(os.getenv("TAKEOFF_BATCH_CONCURRENCY", 4))
+BATCH_MAX_CONCURRENCY = int(os.getenv("TAKEOFF_BATCH_MAX_CONCURRENCY", 16))
+
+# Seconds allowed per blueprint
+BATCH_ITEM_TIMEOUT = float(os.getenv("TAKEOFF_BATCH_ITEM_TIMEOUT", 300))
+
+# Largest batch accepted in one request
+BATCH_MAX_ITEMS = int(os.getenv("TAKEOFF_BATCH_MAX_ITEMS", 100))
+
+T = TypeVar("T")
+
+
+@dataclass
+class BatchUpdate:
+    """A change in the state of one batch item."""
+    index: int
+    status: Literal["started", "succeeded", "failed"]
+    result: Any = None
+    error: BaseException | None = None
+    elapsed: float = 0.0
+
+
+class BatchService:
+    """Service for running many independent jobs through a bounded worker pool."""
+
+    @staticmethod
+    async def run(
+        items: list[T],
+        handler: Callable[[T], Awaitable[Any]],
+        concurrency: int = BATCH_CONCURRENCY,
+        timeout: float | None = BATCH_ITEM_TIMEOUT,
+    ) -> AsyncIterator[BatchUpdate]:
+        """Run handler on every item and yield updates as they happen.
+
+        A fixed pool of workers takes items in input order; results are
+        yielded in completion order. A failing or timed-out item yields a
+        'failed' update with its exception and the workers move on.
+        Closing the iterator cancels everything still running.
+
+        Args:
+            items: Inputs for the handler
+            handler: Coroutine function run once per item
+            concurrency: Number of workers
+            timeout: Seconds allowed per item (None for no limit)
+        """
+        pending: asyncio.Queue[int] = asyncio.Queue()
+        for index in range(len(items)):
+            pending.put_nowait(index)
+        updates: asyncio.Queue[BatchUpdate | None] = asyncio.Queue()
+
+        async def worker() -> None:
+            while True:
+                try:
+                    index = pending.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+
+                updates.put_nowait(BatchUpdate(index=index, status="started"))
+                start = time.perf_counter()
+                try:
+                    result = await asyncio.wait_for(handler(items[index]), timeout)
+                    updates.put_nowait(BatchUpdate(
+                        index=index,
+                        status="succeeded",
+                        result=result,
+                        elapsed=time.perf_counter() - start,
+                    ))
+                except Exception as e:
+                    logger.warning(f"Batch item {index} failed: {e!r}")
+                    updates.put_nowait(BatchUpdate(
+                        index=index,
+                        status="failed",
+                        error=e,
+                        elapsed=time.perf_counter() - start,
+                    ))
+
+        workers = [
+            asyncio.create_task(worker())
+            for _ in range(max(1, min(concurrency, len(items))))
+        ]
+
+        async def close_when_done() -> None:
+            await asyncio.gather(*workers, return_exceptions=True)
+            updates.put_nowait(None)
+
+        closer = asyncio.create_task(close_when_done())
+        try:
+            while (update := await updates.get()) is not None:
+                yield update
+        finally:
+            for task in (*workers, closer):
+                task.cancel()
@@ -0,0 +1,239 @@
+import hashlib
+import json
+import logging
+import mmap
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import TypedDict
+
+logger = logging.getLogger(__name__)
+
+
+class BlobCacheStats(TypedDict):
+    """Type definition for blob cache statistics."""
+    entries: int
+    bytes: int
+    max_bytes: int
+    hits: int
+    misses: int
+    revalidated_changed: int
+    stores: int
+    evictions: int
+
+
+@dataclass
+class BlobEntry:
+    """A cached blueprint download and its HTTP validators."""
+    url: str
+    key: str
+    size: int
+    etag: str | None = None
+    last_modified: str | None = None
+
+
+class BlobCache:
+    """On-disk cache of blueprint downloads keyed by URL.
+
+    Entries store the bytes together with their ETag/Last-Modified so later
+    fetches can revalidate with a conditional GET and read from disk on a
+    304. Total size is bounded with least-recently-used eviction.
+    Concurrent fetches of one URL are coalesced by FileService.fetch_file,
+    so an entry is only ever written by one download at a time.
+    """
+
+    def __init__(self, directory: str, max_bytes: int = 256 * 1024 * 1024):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+
+        self._entries: OrderedDict[str, BlobEntry] = OrderedDict()
+        self._total_bytes = 0
+        self._loaded = False
+        self._lock = threading.Lock()
+        self._stats = {
+            "hits": 0,
+            "misses": 0,
+            "revalidated_changed": 0,
+            "stores": 0,
+            "evictions": 0,
+        }
+
+    @classmethod
+    def from_env(cls) -> "BlobCache | None":
+        """Create a cache from BLOB_CACHE_* environment variables (None if disabled)."""
+        if os.getenv("BLOB_CACHE_ENABLED", "true").lower() != "true":
+            return None
+
+        return cls(
+            directory=os.getenv(
+                "BLOB_CACHE_DIR", os.path.join(tempfile.gettempdir(), "layerwise-blob-cache")
+            ),
+            max_bytes=int(float(os.getenv("BLOB_CACHE_MAX_MB", 256)) * 1024 * 1024),
+        )
+
+    def lookup(self, url: str) -> BlobEntry | None:
+        """Get the cached entry for a URL, if any."""
+        self._ensure_loaded()
+        with self._lock:
+            entry = self._entries.get(url)
+            if entry is None:
+                self._stats["misses"] += 1
+            return entry
+
+    @staticmethod
+    def conditional_headers(entry: BlobEntry) -> dict[str, str]:
+        """Build revalidation headers for a cached entry."""
+        headers = {}
+        if entry.etag:
+            headers["If-None-Match"] = entry.etag
+        if entry.last_modified:
+            headers["If-Modified-Since"] = entry.last_modified
+        return headers
+
+    def read(self, entry: BlobEntry, spool_threshold: int) -> bytes | mmap.mmap | None:
+        """Read a cached entry after a 304.
+
+        Small files are returned as bytes and large ones as a read-only
+        memory map. Returns None if the file was evicted in the meantime.
+        """
+        path = self._data_path(entry.key)
+        try:
+            with open(path, "rb") as f:
+                if entry.size > spool_threshold:
+                    data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                else:
+                    data = f.read()
+        except (FileNotFoundError, ValueError):
+            self._forget(entry.url)
+            return None
+
+        now = time.time()
+        os.utime(path, (now, now))
+        with self._lock:
+            self._stats["hits"] += 1
+            if entry.url in self._entries:
+                self._entries.move_to_end(entry.url)
+        return data
+
+    def store(
+        self,
+        url: str,
+        data: bytes | mmap.mmap,
+        etag: str | None,
+        last_modified: str | None,
+        replaced: bool = False,
+    ) -> None:
+        """Write a fresh download to disk and evict old entries over the size limit.
+
+        Args:
+            url: Blueprint URL
+            data: Downloaded contents
+            etag: ETag response header
+            last_modified: Last-Modified response header
+            replaced: Whether this replaces an entry that failed revalidation
+        """
+        size = len(data)
+        if size > self.max_bytes or not (etag or last_modified):
+            return
+
+        self._ensure_loaded()
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+        entry = BlobEntry(
+            url=url,
+            key=hashlib.sha256(url.encode()).hexdigest(),
+            size=size,
+            etag=etag,
+            last_modified=last_modified,
+        )
+        data_path = self._data_path(entry.key)
+        tmp_path = data_path.with_suffix(".tmp")
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, data_path)
+        self._meta_path(entry.key).write_text(json.dumps(asdict(entry)))
+
+        with self._lock:
+            previous = self._entries.pop(url, None)
+            if previous is not None:
+                self._total_bytes -= previous.size
+            self._entries[url] = entry
+            self._total_bytes += size
+            self._stats["stores"] += 1
+            if replaced:
+                self._stats["revalidated_changed"] += 1
+            evicted = self._evict_locked()
+
+        for old in evicted:
+            self._delete_files(old.key)
+
+    def stats(self) -> BlobCacheStats:
+        """Get cache size and hit/miss counters."""
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._total_bytes,
+                "max_bytes": self.max_bytes,
+                **self._stats,
+            }
+
+    def _data_path(self, key: str) -> Path:
+        return self.directory / f"{key}.blob"
+
+    def _meta_path(self, key: str) -> Path:
+        return self.directory / f"{key}.json"
+
+    def _delete_files(self, key: str) -> None:
+        self._data_path(key).unlink(missing_ok=True)
+        self._meta_path(key).unlink(missing_ok=True)
+
+    def _forget(self, url: str) -> None:
+        with self._lock:
+            entry = self._entries.pop(url, None)
+            if entry is not None:
+                self._total_bytes -= entry.size
+
+    def _evict_locked(self) -> list[BlobEntry]:
+        evicted = []
+        while self._entries and self._total_bytes > self.max_bytes:
+            _, entry = self._entries.popitem(last=False)
+            self._total_bytes -= entry.size
+            self._stats["evictions"] += 1
+            evicted.append(entry)
+        return evicted
+
+    def _ensure_loaded(self) -> None:
+        """Rebuild the index from entries left on disk by a previous process."""
+        with self._lock:
+            if self._loaded:
+                return
+            self._loaded = True
+
+            if not self.directory.is_dir():
+                return
+
+            found = []
+            for meta_path in self.directory.glob("*.json"):
+                try:
+                    entry = BlobEntry(**json.loads(meta_path.read_text()))
+                    atime = self._data_path(entry.key).stat().st_atime
+                except (OSError, ValueError, TypeError):
+                    meta_path.unlink(missing_ok=True)
+                    continue
+                found.append((atime, entry))
+
+            for _, entry in sorted(found, key=lambda pair: pair[0]):
+                self._entries[entry.url] = entry
+                self._total_bytes += entry.size
+            evicted = self._evict_locked()
+
+        for old in evicted:
+            self._delete_files(old.key)
+
+
+# Shared cache for blueprint downloads (None when BLOB_CACHE_ENABLED=false)
+blob_cache = BlobCache.from_env()
@@ -0,0 +1,282 @@
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import TypedDict
+
+from python_api.models import TakeoffResult
+from .pdf_service import FileData
+
+logger = logging.getLogger(__name__)
+
+
+class CacheStats(TypedDict):
+    """Type definition for cache statistics."""
+    memory_entries: int
+    memory_bytes: int
+    disk_entries: int
+    disk_bytes: int
+    hits: int
+    memory_hits: int
+    disk_hits: int
+    misses: int
+    memory_evictions: int
+    disk_evictions: int
+    expirations: int
+
+
+class TakeoffCache:
+    """Content-addressed cache of takeoff results.
+
+    Results are keyed by a hash of the blueprint bytes together with every
+    input that changes the model output (scale, focus areas, agent version).
+    Entries live in a bounded in-memory LRU tier and, when a directory is
+    configured, in an on-disk tier that survives process restarts.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 128,
+        max_memory_bytes: int = 64 * 1024 * 1024,
+        ttl_seconds: float = 24 * 60 * 60,
+        disk_dir: str | None = None,
+        max_disk_bytes: int = 512 * 1024 * 1024,
+    ):
+        self.max_entries = max_entries
+        self.max_memory_bytes = max_memory_bytes
+        self.ttl_seconds = ttl_seconds
+        self.disk_dir = Path(disk_dir) if disk_dir else None
+        self.max_disk_bytes = max_disk_bytes
+
+        # key -> (stored_at, serialized result)
+        self._memory: OrderedDict[str, tuple[float, bytes]] = OrderedDict()
+        self._memory_bytes = 0
+        self._lock = threading.Lock()
+        self._stats = {
+            "hits": 0,
+            "memory_hits": 0,
+            "disk_hits": 0,
+            "misses": 0,
+            "memory_evictions": 0,
+            "disk_evictions": 0,
+            "expirations": 0,
+        }
+
+        if self.disk_dir:
+            self.disk_dir.mkdir(parents=True, exist_ok=True)
+
+    @classmethod
+    def from_env(cls) -> "TakeoffCache":
+        """Create a cache configured from TAKEOFF_CACHE_* environment variables."""
+        return cls(
+            max_entries=int(os.getenv("TAKEOFF_CACHE_MAX_ENTRIES", 128)),
+            max_memory_bytes=int(float(os.getenv("TAKEOFF_CACHE_MAX_MEMORY_MB", 64)) * 1024 * 1024),
+            ttl_seconds=float(os.getenv("TAKEOFF_CACHE_TTL_SECONDS", 24 * 60 * 60)),
+            disk_dir=os.getenv("TAKEOFF_CACHE_DIR") or None,
+            max_disk_bytes=int(float(os.getenv("TAKEOFF_CACHE_MAX_DISK_MB", 512)) * 1024 * 1024),
+        )
+
+    @staticmethod
+    def make_key(
+        file_data: FileData,
+        scale: str | None,
+        focus_areas: list[str] | None,
+        version: str,
+        render_profile: str | None = None,
+        digest: str | None = None,
+    ) -> str:
+        """Build a cache key from the blueprint content and analysis options.
+
+        Args:
+            file_data: Raw blueprint bytes
+            scale: Resolved scale string (None if no scale is used)
+            focus_areas: Requested focus areas (order-insensitive)
+            version: Agent/prompt version identifier
+            render_profile: Rasterization profile the model saw (None for the original file)
+            digest: SHA-256 of file_data when already computed (see PreparedDocument)
+
+        Returns:
+            Hex digest identifying this takeoff
+        """
+        digest = digest or hashlib.sha256(file_data).hexdigest()
+        options = json.dumps(
+            {
+                "scale": scale,
+                "focus_areas": sorted(focus_areas) if focus_areas else None,
+                "version": version,
+                "render_profile": render_profile,
+            },
+            sort_keys=True,
+        )
+        return hashlib.sha256(f"{digest}:{options}".encode()).hexdigest()
+
+    async def get(self, key: str) -> TakeoffResult | None:
+        """Look up a cached result, checking memory first and then disk."""
+        payload = self._memory_get(key)
+        if payload is not None:
+            self._record_hit("memory_hits")
+            return TakeoffResult.model_validate_json(payload)
+
+        if self.disk_dir:
+            payload = await asyncio.to_thread(self._disk_get, key)
+            if payload is not None:
+                self._memory_set(key, payload)
+                self._record_hit("disk_hits")
+                return TakeoffResult.model_validate_json(payload)
+
+        with self._lock:
+            self._stats["misses"] += 1
+        return None
+
+    async def set(self, key: str, result: TakeoffResult) -> None:
+        """Store a result in both cache tiers."""
+        payload = result.model_dump_json().encode()
+        self._memory_set(key, payload)
+
+        if self.disk_dir:
+            try:
+                await asyncio.to_thread(self._disk_set, key, payload)
+            except OSError as e:
+                logger.warning(f"Failed to write takeoff cache entry to disk: {e}")
+
+    def clear(self) -> None:
+        """Remove all entries from both tiers."""
+        with self._lock:
+            self._memory.clear()
+            self._memory_bytes = 0
+
+        if self.disk_dir:
+            for path in self.disk_dir.glob("*.json"):
+                path.unlink(missing_ok=True)
+
+    def stats(self) -> CacheStats:
+        """Get current cache size and hit/miss/eviction counters."""
+        disk_entries = 0
+        disk_bytes = 0
+        if self.disk_dir:
+            for path in self.disk_dir.glob("*.json"):
+                try:
+                    disk_bytes += path.stat().st_size
+                    disk_entries += 1
+                except FileNotFoundError:
+                    continue
+
+        with self._lock:
+            return {
+                "memory_entries": len(self._memory),
+                "memory_bytes": self._memory_bytes,
+                "disk_entries": disk_entries,
+                "disk_bytes": disk_bytes,
+                **self._stats,
+            }
+
+    def _record_hit(self, tier: str) -> None:
+        with self._lock:
+            self._stats["hits"] += 1
+            self._stats[tier] += 1
+
+    def _is_expired(self, stored_at: float) -> bool:
+        return self.ttl_seconds > 0 and time.time() - stored_at > self.ttl_seconds
+
+    def _memory_get(self, key: str) -> bytes | None:
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is None:
+                return None
+
+            stored_at, payload = entry
+            if self._is_expired(stored_at):
+                del self._memory[key]
+                self._memory_bytes -= len(payload)
+                self._stats["expirations"] += 1
+                return None
+
+            self._memory.move_to_end(key)
+            return payload
+
+    def _memory_set(self, key: str, payload: bytes) -> None:
+        if len(payload) > self.max_memory_bytes:
+            return
+
+        with self._lock:
+            previous = self._memory.pop(key, None)
+            if previous is not None:
+                self._memory_bytes -= len(previous[1])
+
+            self._memory[key] = (time.time(), payload)
+            self._memory_bytes += len(payload)
+
+            while self._memory and (
+                len(self._memory) > self.max_entries
+                or self._memory_bytes > self.max_memory_bytes
+            ):
+                _, (_, evicted) = self._memory.popitem(last=False)
+                self._memory_bytes -= len(evicted)
+                self._stats["memory_evictions"] += 1
+
+    def _disk_path(self, key: str) -> Path:
+        return self.disk_dir / f"{key}.json"
+
+    def _disk_get(self, key: str) -> bytes | None:
+        path = self._disk_path(key)
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            return None
+
+        if self._is_expired(stat.st_mtime):
+            path.unlink(missing_ok=True)
+            with self._lock:
+                self._stats["expirations"] += 1
+            return None
+
+        try:
+            payload = path.read_bytes()
+        except FileNotFoundError:
+            return None
+
+        # Touch access time so disk eviction is least-recently-used
+        os.utime(path, (time.time(), stat.st_mtime))
+        return payload
+
+    def _disk_set(self, key: str, payload: bytes) -> None:
+        if len(payload) > self.max_disk_bytes:
+            return
+
+        path = self._disk_path(key)
+        tmp_path = path.with_suffix(".tmp")
+        tmp_path.write_bytes(payload)
+        os.replace(tmp_path, path)
+        self._disk_evict()
+
+    def _disk_evict(self) -> None:
+        entries = []
+        total = 0
+        for path in self.disk_dir.glob("*.json"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_atime, stat.st_size, path))
+            total += stat.st_size
+
+        if total <= self.max_disk_bytes:
+            return
+
+        entries.sort()
+        for _, size, path in entries:
+            if total <= self.max_disk_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+            with self._lock:
+                self._stats["disk_evictions"] += 1
+
+
+# Shared cache instance for the takeoff routes
+takeoff_cache = TakeoffCache.from_env()
@@ -0,0 +1,155 @@
+import json
+from enum import Enum
+from operator import attrgetter, itemgetter
+from typing import Any, Sequence
+
+from python_api.models import TakeoffResult
+
+try:
+    import msgpack
+except ImportError:  # optional; responses are always JSON without it
+    msgpack = None
+
+try:
+    import orjson
+except ImportError:  # optional; stdlib json is used without it
+    orjson = None
+
+JSON_MEDIA_TYPE = "application/json"
+MSGPACK_MEDIA_TYPE = "application/msgpack"
+MSGPACK_MEDIA_TYPES = (MSGPACK_MEDIA_TYPE, "application/x-msgpack", "application/vnd.msgpack")
+
+# Identifies the column layout for clients
+COLUMNAR_FORMAT = "takeoff-columns/1"
+
+# Columns stored as a dictionary of distinct values plus an integer code per item
+DICTIONARY_COLUMNS = ("name", "category", "unit", "location")
+# Columns stored as packed little-endian float64
+NUMBER_COLUMNS = ("quantity", "confidence")
+# Columns stored as a plain array (nullable strings, mostly distinct)
+PLAIN_COLUMNS = ("notes",)
+
+ITEM_COLUMNS = (*DICTIONARY_COLUMNS, *NUMBER_COLUMNS, *PLAIN_COLUMNS)
+
+RESULT_FIELDS = ("summary", "type_totals", "notes", "scale_used", "page_count")
+
+
+def _loads(payload: str | bytes) -> Any:
+    return orjson.loads(payload) if orjson is not None else json.loads(payload)
+
+
+def _code_dtype(size: int) -> str:
+    return "<u1" if size <= 0xFF else "<u2" if size <= 0xFFFF else "<u4"
+
+
+class ColumnarService:
+    """Service for the compact columnar encoding of takeoff results.
+
+    Items are sent column by column instead of as one object each:
+    repeated strings (name, category, unit, location) as a dictionary of
+    distinct values plus a packed integer code per item, numbers as packed
+    float64 arrays. Columns are read straight off the items (model
+    attributes or parsed JSON), so no per-item object is built, and the
+    whole response is packed with msgpack.
+    """
+
+    @staticmethod
+    def negotiate(accept: str | None) -> str:
+        """Pick the response media type for an Accept header.
+
+        msgpack is chosen when it's asked for with at least the quality of
+        JSON; anything else, including no header, gets JSON.
+        """
+        if not accept or msgpack is None:
+            return JSON_MEDIA_TYPE
+
+        msgpack_quality = json_quality = 0.0
+        for entry in accept.split(","):
+            media_type, *params = (part.strip() for part in entry.split(";"))
+            quality = 1.0
+            for param in params:
+                if param.startswith("q="):
+                    try:
+                        quality = float(param[2:])
+                    except ValueError:
+                        quality = 0.0
+            if media_type.lower() in MSGPACK_MEDIA_TYPES:
+                msgpack_quality = max(msgpack_quality, quality)
+            elif media_type.lower() in (JSON_MEDIA_TYPE, "application/*", "*/*"):
+                json_quality = max(json_quality, quality)
+        if msgpack_quality > 0 and msgpack_quality >= json_quality:
+            return MSGPACK_MEDIA_TYPE
+        return JSON_MEDIA_TYPE
+
+    @staticmethod
+    def item_columns(items: Sequence) -> dict:
+        """Encode items as columns.
+
+        Args:
+            items: TakeoffItem models, or item dicts parsed from stored JSON
+        """
+        import numpy as np
+
+        get = itemgetter if items and isinstance(items[0], dict) else attrgetter
+        columns: dict[str, Any] = {}
+        for name in DICTIONARY_COLUMNS:
+            index: dict[Any, int] = {}
+            codes = [index.setdefault(value, len(index)) for value in map(get(name), items)]
+            columns[name] = {
+                "dictionary": [v.value if isinstance(v, Enum) else v for v in index],
+                "dtype": _code_dtype(len(index)),
+                "codes": np.array(codes, dtype=_code_dtype(len(index))).tobytes(),
+            }
+        for name in NUMBER_COLUMNS:
+            values = np.fromiter(map(get(name), items), dtype="<f8", count=len(items))
+            columns[name] = {"dtype": "<f8", "data": values.tobytes()}
+        for name in PLAIN_COLUMNS:
+            columns[name] = list(map(get(name), items))
+        return {"format": COLUMNAR_FORMAT, "length": len(items), "columns": columns}
+
+    @staticmethod
+    def result_columns(result: TakeoffResult | dict) -> dict:
+        """A takeoff result with its items as columns, ready to pack."""
+        if isinstance(result, dict):
+            fields = {name: result.get(name) for name in RESULT_FIELDS}
+            items = result.get("items") or []
+        else:
+            fields = {name: getattr(result, name) for name in RESULT_FIELDS}
+            items = result.items
+        return {**fields, "items": ColumnarService.item_columns(items)}
+
+    @staticmethod
+    def stored_result_columns(payload: str | bytes) -> dict:
+        """Columns of a result stored as JSON, without validating it into models."""
+        return ColumnarService.result_columns(_loads(payload))
+
+    @staticmethod
+    def stored_item_columns(items: list[str]) -> dict:
+        """Columns of items stored as one JSON document each."""
+        return ColumnarService.item_columns(_loads("[" + ",".join(items) + "]"))
+
+    @staticmethod
+    def pack(data: Any) -> bytes:
+        """Pack a response body with msgpack."""
+        return msgpack.packb(data, use_bin_type=True)
+
+    @staticmethod
+    def encode_result(result: TakeoffResult) -> bytes:
+        return ColumnarService.pack(ColumnarService.result_columns(result))
+
+    @staticmethod
+    def decode_items(columns: dict) -> list[dict]:
+        """Turn item columns back into item dicts (for Python clients and checks)."""
+        import numpy as np
+
+        data = columns["columns"]
+        decoded: dict[str, list] = {}
+        for name in DICTIONARY_COLUMNS:
+            column = data[name]
+            codes = np.frombuffer(column["codes"], dtype=column["dtype"])
+            decoded[name] = [column["dictionary"][code] for code in codes.tolist()]
+        for name in NUMBER_COLUMNS:
+            decoded[name] = np.frombuffer(data[name]["data"], dtype=data[name]["dtype"]).tolist()
+        for name in PLAIN_COLUMNS:
+            decoded[name] = data[name]
+        return [dict(zip(ITEM_COLUMNS, row)) for row in zip(*(decoded[name] for name in ITEM_COLUMNS))]
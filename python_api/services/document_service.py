@@ -0,0 +1,162 @@
+import asyncio
+import functools
+import hashlib
+import logging
+from abc import ABC, abstractmethod
+
+from .metrics import record_upstream_bytes, timed
+from .pdf_service import FileData, FileInfo, FileService
+
+logger = logging.getLogger(__name__)
+
+FILE_TYPES = {"application/pdf": "pdf", "image/png": "png", "image/jpeg": "jpeg"}
+
+
+@functools.cache
+def _encoded_content_type() -> type:
+    """BinaryContent that base64-encodes its data once, however often it's sent.
+
+    Built on first use so importing the services doesn't load pydantic_ai.
+    """
+    from pydantic_ai.messages import BinaryContent
+
+    class EncodedContent(BinaryContent):
+        @functools.cached_property
+        def data_uri(self) -> str:
+            # The OpenAI mapping reads this for every request that carries the
+            # content: hedges, retries and each tool turn of a run
+            return super().data_uri
+
+    return EncodedContent
+
+
+class FileStore(ABC):
+    """A file store that documents are uploaded to once and referred to by handle.
+
+    The model path only accepts inline data today (Gemini's OpenAI-compatible
+    chat endpoint), so no store is configured in production; a provider
+    store whose handles the model can resolve plugs in here. Implementations
+    record the bytes they send with record_upstream_bytes.
+    """
+
+    @abstractmethod
+    async def upload(self, data: FileData, media_type: str, digest: str) -> str:
+        """Upload a document and return its handle."""
+
+    @abstractmethod
+    def reference(self, handle: str, media_type: str):
+        """Message content referring to an uploaded document."""
+
+
+class LocalFileStore(FileStore):
+    """In-process stand-in for a provider file store, for tests and benchmarks only.
+
+    Documents are kept in memory by content digest and referred to as
+    local-file://<digest>, which only a stub model can read back (with
+    get()); a real model can't resolve these handles. The same content is
+    only stored once.
+    """
+
+    SCHEME = "local-file://"
+
+    def __init__(self):
+        self._files: dict[str, bytes] = {}
+        self.uploads = 0
+
+    async def upload(self, data: FileData, media_type: str, digest: str) -> str:
+        if digest not in self._files:
+            self._files[digest] = bytes(data)
+            self.uploads += 1
+            record_upstream_bytes("file_upload", len(data))
+        return f"{self.SCHEME}{digest}"
+
+    def reference(self, handle: str, media_type: str):
+        from pydantic_ai.messages import DocumentUrl, ImageUrl
+
+        if media_type.startswith("image/"):
+            return ImageUrl(url=handle, media_type=media_type)
+        return DocumentUrl(url=handle, media_type=media_type)
+
+    def get(self, handle: str) -> bytes:
+        """Read an uploaded document back by its handle."""
+        return self._files[handle.removeprefix(self.SCHEME)]
+
+
+class PreparedDocument:
+    """A blueprint payload prepared once for every model call that sends it.
+
+    The MIME type is sniffed once and the content digest is computed once.
+    Calls share one content object whose base64 encoding is cached, so a
+    scale detection, its hedge, the takeoff and each of its tool turns
+    encode the file a single time. With a file store set, the bytes are
+    uploaded once instead and later calls send the handle.
+    """
+
+    # Store documents are uploaded to; None (production) sends them inline
+    store: FileStore | None = None
+
+    def __init__(self, data: FileData, mime_type: str | None = None):
+        self.data = data
+        self.mime_type = mime_type or FileService.get_mime_type(data)
+        self.handle: str | None = None
+        self._digest: str | None = None
+        self._content = None
+        self._store: FileStore | None = None
+        self._upload: asyncio.Future | None = None
+
+    @classmethod
+    def of(cls, document: "FileData | PreparedDocument", mime_type: str | None = None) -> "PreparedDocument":
+        """Prepare raw bytes, or pass an already prepared document through."""
+        if isinstance(document, PreparedDocument):
+            return document
+        return cls(document, mime_type)
+
+    @property
+    def file_type(self) -> str:
+        return FILE_TYPES.get(self.mime_type, "unknown")
+
+    @property
+    def size(self) -> int:
+        return len(self.data)
+
+    @property
+    def info(self) -> FileInfo:
+        return {"file_type": self.file_type, "size": self.size}
+
+    def digest(self) -> str:
+        """SHA-256 of the content (computed on first call; run large files in a thread)."""
+        if self._digest is None:
+            self._digest = hashlib.sha256(self.data).hexdigest()
+        return self._digest
+
+    async def upload(self) -> None:
+        """Upload to the file store, once however many calls ask.
+
+        Concurrent callers wait on the same upload. Failures are logged and
+        the document is sent inline instead.
+        """
+        store = PreparedDocument.store
+        if store is None or self.handle is not None:
+            return
+        if self._upload is None:
+            self._upload = asyncio.ensure_future(self._upload_to(store))
+        # A cancelled caller doesn't cancel the upload others are waiting on
+        await asyncio.shield(self._upload)
+
+    async def _upload_to(self, store: FileStore) -> None:
+        try:
+            with timed("upload"):
+                digest = await asyncio.to_thread(self.digest)
+                self.handle = await store.upload(self.data, self.mime_type, digest)
+                self._store = store
+        except Exception as e:
+            logger.warning(f"File upload failed; sending the document inline: {e}")
+
+    def content(self):
+        """Message content for the document: its handle once uploaded, else the inline bytes."""
+        if self.handle is not None:
+            return self._store.reference(self.handle, self.mime_type)
+        if self._content is None:
+            self._content = _encoded_content_type()(data=self.data, media_type=self.mime_type)
+        return self._content
+
@@ -0,0 +1,503 @@
+import io
+import logging
+import mmap
+import re
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING
+
+from python_api.models import MeasurementCategory, ScaleInfo, TakeoffItem
+from .pdf_service import FileData
+from .scale_parser import ScaleParser
+
+if TYPE_CHECKING:
+    import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Only measure the first pages of very large sets
+MAX_PAGES = 50
+
+# Form XObjects nested deeper than this are skipped
+MAX_FORM_DEPTH = 4
+
+# Groups below these totals are symbols and hatching, not takeoff quantities
+MIN_LINEAR_FEET = 1.0
+MIN_AREA_SQFT = 1.0
+
+# Strings, comments and inline images carry digits that aren't path operands; each
+# pattern only runs when its opening character is present
+_STRING = re.compile(rb"\((?:[^\\)]|\\.)*\)")
+_HEX_STRING = re.compile(rb"<[0-9A-Fa-f\s]*>")
+_INLINE_IMAGE = re.compile(rb"\bBI\b.*?\bEI\b", re.DOTALL)
+_COMMENT = re.compile(rb"%[^\r\n]*")
+
+# Whitespace and delimiters separate tokens
+_SEPARATORS = b" \t\r\n\f\x00[]<>{}()"
+_NUMBER_START = b"0123456789+-."
+
+
+def _op(name: bytes) -> int:
+    """Integer code of an operator (the first three bytes, little-endian)."""
+    return int.from_bytes(name[:3].ljust(3, b"\0"), "little")
+
+
+STROKE_OPS = [_op(o) for o in (b"S", b"s", b"B", b"B*", b"b", b"b*")]
+FILL_OPS = [_op(o) for o in (b"f", b"F", b"f*", b"B", b"B*", b"b", b"b*")]
+# Painting ops that close the current subpath first
+CLOSE_PAINT_OPS = [_op(o) for o in (b"s", b"b", b"b*")]
+PAINT_OPS = sorted(set(STROKE_OPS + FILL_OPS + [_op(b"n")]))
+STATE_OPS = [_op(o) for o in (b"q", b"Q", b"cm", b"w", b"RG", b"G", b"K", b"SC", b"SCN", b"Do")]
+COLOR_ARITY = {_op(b"RG"): 3, _op(b"G"): 1, _op(b"K"): 4}
+
+# Vertex kinds in a flattened path
+MOVE, LINE, CLOSE = 0, 1, 2
+
+Matrix = tuple[float, float, float, float, float, float]
+IDENTITY: Matrix = (1.0, 0.0, 0.0, 1.0, 0.0, 0.0)
+
+
+def _multiply(m: Matrix, n: Matrix) -> Matrix:
+    """m then n, as PDF concatenates a cm matrix onto the CTM."""
+    a, b, c, d, e, f = m
+    a2, b2, c2, d2, e2, f2 = n
+    return (
+        a * a2 + b * c2, a * b2 + b * d2,
+        c * a2 + d * c2, c * b2 + d * d2,
+        e * a2 + f * c2 + e2, e * b2 + f * d2 + f2,
+    )
+
+
+@dataclass(frozen=True)
+class StrokeStyle:
+    """Line width (in page units, after the CTM) and stroke color of a path."""
+    width: float
+    color: tuple[float, ...] = (0.0,)
+
+    def describe(self) -> str:
+        if not any(self.color):
+            shade = "black"
+        elif len(self.color) == 1:
+            shade = "white" if self.color[0] == 1 else f"gray {self.color[0]:g}"
+        else:
+            shade = "rgb(" + ", ".join(f"{c:g}" for c in self.color) + ")"
+        return f"{self.width:g} pt, {shade}"
+
+
+@dataclass
+class PathGeometry:
+    """Stroked segment lengths and closed polygon areas of one content stream, in page units.
+
+    Every measurement carries the index of its stroke style in `styles`.
+    """
+    lengths: "np.ndarray"
+    length_styles: "np.ndarray"
+    areas: "np.ndarray"
+    area_styles: "np.ndarray"
+    styles: list[StrokeStyle] = field(default_factory=list)
+
+
+@dataclass
+class _State:
+    ctm: Matrix = IDENTITY
+    width: float = 1.0
+    color: tuple[float, ...] = (0.0,)
+
+
+@dataclass
+class _Tokens:
+    """A content stream split into number operands and operator codes."""
+    content: bytes
+    numbers: "np.ndarray"
+    ops: "np.ndarray"  # operator codes, in order
+    op_numbers: "np.ndarray"  # numbers seen before each operator
+    op_tokens: "np.ndarray"  # token index of each operator
+    starts: "np.ndarray"  # byte span of every token
+    ends: "np.ndarray"
+
+    def token(self, index: int) -> bytes:
+        return self.content[self.starts[index]:self.ends[index]]
+
+
+def _tokenize(content: bytes) -> _Tokens:
+    """Split a content stream into tokens with array operations over its bytes.
+
+    Numbers are parsed without creating a Python object per token: each
+    digit contributes digit * 10^place to its token's value, summed with
+    bincount.
+    """
+    import numpy as np
+
+    if b"BI" in content:
+        content = _INLINE_IMAGE.sub(b" ", content)
+    if b"(" in content:
+        content = _STRING.sub(b" ", content)
+    if b"<" in content:
+        content = _HEX_STRING.sub(b" ", content)
+    if b"%" in content:
+        content = _COMMENT.sub(b" ", content)
+
+    separator = np.zeros(256, dtype=bool)
+    separator[list(_SEPARATORS)] = True
+    number_start = np.zeros(256, dtype=bool)
+    number_start[list(_NUMBER_START)] = True
+
+    data = np.frombuffer(content, dtype=np.uint8)
+    gap = separator[data]
+    starts = np.flatnonzero(~gap & np.r_[True, gap[:-1]])
+    ends = np.flatnonzero(~gap & np.r_[gap[1:], True]) + 1
+    first = data[starts]
+    is_number = number_start[first]
+    is_op = ~is_number & (first != ord("/"))
+
+    # Bytes of every number token, labelled with the number they belong to
+    number_starts, number_ends = starts[is_number], ends[is_number]
+    sizes = number_ends - number_starts
+    owner = np.repeat(np.arange(len(sizes), dtype=np.int32), sizes)
+    index = np.arange(sizes.sum(), dtype=np.int64)
+    index += np.repeat(number_starts - np.r_[0, np.cumsum(sizes)[:-1]], sizes)
+    chars = data[index]
+    point = number_ends.copy()
+    dots = np.flatnonzero(chars == ord("."))
+    point[owner[dots]] = index[dots]
+    # Digits left of the point count from 0, right of it from -1
+    place = point[owner] - index
+    place -= place > 0
+    value = chars - np.uint8(ord("0"))
+    powers = np.r_[10.0 ** np.arange(0, -21, -1)[::-1], 10.0 ** np.arange(1, 21), 0.0]
+    # Signs and the point itself land on the zero weight
+    place = np.where(value <= 9, np.clip(place, -20, 20) + 20, len(powers) - 1)
+    numbers = np.bincount(owner, weights=value * powers[place], minlength=len(sizes))
+    numbers[data[number_starts] == ord("-")] *= -1
+
+    # Operators up to three bytes long get a code; longer ones never match
+    op_starts, op_sizes = starts[is_op], ends[is_op] - starts[is_op]
+    padded = np.r_[data, 0, 0]
+    codes = padded[op_starts].astype(np.int64)
+    codes += np.where(op_sizes > 1, padded[op_starts + 1], 0).astype(np.int64) << 8
+    codes += np.where(op_sizes > 2, padded[op_starts + 2], 0).astype(np.int64) << 16
+    codes[op_sizes > 3] = -1
+
+    op_tokens = np.flatnonzero(is_op)
+    return _Tokens(
+        content=content,
+        numbers=numbers,
+        ops=codes,
+        op_numbers=np.cumsum(is_number)[op_tokens],
+        op_tokens=op_tokens,
+        starts=starts,
+        ends=ends,
+    )
+
+
+class GeometryService:
+    """Service for measuring lengths and areas straight from PDF vector paths.
+
+    Content streams are tokenized with array operations over their bytes
+    and the path operators are turned into vertex arrays, so segment lengths and
+    shoelace areas are computed in bulk with NumPy rather than per
+    operator. Graphics state (q/Q, cm, line width, stroke color and form
+    XObjects) changes rarely and is tracked in a short loop over just
+    those operators.
+    """
+
+    @staticmethod
+    def pixels_per_foot(scale: ScaleInfo) -> float | None:
+        """Page units per real foot for a scale.
+
+        The notation is parsed first: a model-detected scale may carry a
+        pixels_per_foot measured on an image rather than in PDF units.
+        """
+        matches = ScaleParser.parse_text(scale.scale_string)
+        return matches[0].pixels_per_foot if matches else scale.pixels_per_foot
+
+    @staticmethod
+    def extract_stream(
+        content: bytes,
+        state: _State | None = None,
+        resources=None,
+        depth: int = 0,
+    ) -> list[PathGeometry]:
+        """Flatten one content stream (and the forms it draws) into measurements."""
+        import numpy as np
+
+        state = state or _State()
+        tokens = _tokenize(content)
+        numbers, ops, op_numbers = tokens.numbers, tokens.ops, tokens.op_numbers
+        if not len(ops):
+            return []
+
+        def operands(mask: "np.ndarray", count: int) -> "np.ndarray":
+            ends = op_numbers[mask]
+            if not len(numbers):
+                return np.zeros((len(ends), count))
+            return numbers[np.maximum(ends[:, None] - count + np.arange(count), 0)]
+
+        # Graphics state at each state change (few per page), walked in order
+        change_at = [-1]
+        changes = [(state.ctm, StrokeStyle(state.width, state.color))]
+        nested: list[PathGeometry] = []
+        stack: list[_State] = []
+        current = _State(state.ctm, state.width, state.color)
+        for position in np.flatnonzero(np.isin(ops, STATE_OPS)):
+            op = int(ops[position])
+            end = int(op_numbers[position])
+            if op == _op(b"q"):
+                stack.append(_State(current.ctm, current.width, current.color))
+                continue
+            if op == _op(b"Q"):
+                if stack:
+                    current = stack.pop()
+            elif op == _op(b"cm") and end >= 6:
+                current.ctm = _multiply(tuple(float(v) for v in numbers[end - 6:end]), current.ctm)
+            elif op == _op(b"w") and end >= 1:
+                current.width = float(numbers[end - 1])
+            elif op == _op(b"Do"):
+                token = tokens.op_tokens[position]
+                name = tokens.token(token - 1) if token else b""
+                if name.startswith(b"/") and depth < MAX_FORM_DEPTH:
+                    nested += GeometryService._draw_form(name, resources, current, depth)
+                continue
+            else:
+                # Stroke color; SC/SCN take the operands since the previous operator
+                previous = int(op_numbers[position - 1]) if position else 0
+                arity = COLOR_ARITY.get(op, min(4, end - previous))
+                if arity and end - previous >= arity:
+                    current.color = tuple(round(float(c), 3) for c in numbers[end - arity:end])
+            change_at.append(position)
+            changes.append((current.ctm, StrokeStyle(current.width, current.color)))
+
+        # Flatten path construction to vertices: re becomes m l l l h, curves become chords
+        positions, xs, ys, kinds, orders = [], [], [], [], []
+
+        def add(mask: "np.ndarray", points: "np.ndarray", kind: int, order: int = 0) -> None:
+            positions.append(np.flatnonzero(mask))
+            xs.append(points[:, 0])
+            ys.append(points[:, 1])
+            kinds.append(np.full(mask.sum(), kind, dtype=np.int8))
+            orders.append(np.full(mask.sum(), order, dtype=np.int8))
+
+        for op, count, kind in ((b"m", 2, MOVE), (b"l", 2, LINE), (b"c", 6, LINE), (b"v", 4, LINE), (b"y", 4, LINE)):
+            mask = ops == _op(op)
+            add(mask, operands(mask, count)[:, -2:], kind)
+        rect_mask = ops == _op(b"re")
+        rects = operands(rect_mask, 4)
+        x, y, w, h = rects.T
+        for order, (px, py, kind) in enumerate((
+            (x, y, MOVE), (x + w, y, LINE), (x + w, y + h, LINE), (x, y + h, LINE), (x, y, CLOSE),
+        )):
+            add(rect_mask, np.column_stack([px, py]), kind, order)
+        close_mask = (ops == _op(b"h")) | np.isin(ops, CLOSE_PAINT_OPS)
+        add(close_mask, np.zeros((close_mask.sum(), 2)), CLOSE)
+
+        position = np.concatenate(positions)
+        if not len(position):
+            return nested
+        order = np.lexsort((np.concatenate(orders), position))
+        position = position[order]
+        x = np.concatenate(xs)[order]
+        y = np.concatenate(ys)[order]
+        kind = np.concatenate(kinds)[order]
+
+        # The painting operator that ends each vertex's path; unpainted (n) paths are clips
+        paint_positions = np.flatnonzero(np.isin(ops, PAINT_OPS))
+        if not len(paint_positions):
+            return nested
+        paint_after = np.searchsorted(paint_positions, position, side="left")
+        painted = paint_after < len(paint_positions)
+        paint_position = np.where(
+            painted, paint_positions[np.minimum(paint_after, len(paint_positions) - 1)], position
+        )
+        paint_op = np.where(painted, ops[paint_position], _op(b"n"))
+        stroked = np.isin(paint_op, STROKE_OPS)
+        filled = np.isin(paint_op, FILL_OPS)
+
+        # Coordinates use the CTM where the path is built; the stroke style is the one it's painted with
+        change_at = np.array(change_at)
+        state_index = np.searchsorted(change_at, position, side="right") - 1
+        paint_state = np.searchsorted(change_at, paint_position, side="right") - 1
+        matrices = np.array([ctm for ctm, _ in changes])[state_index]
+        a, b, c, d, e, f = matrices.T
+        x, y = x * a + y * c + e, x * b + y * d + f
+
+        # Subpaths start at each move; a close returns to the start
+        subpath = np.cumsum(kind == MOVE) - 1
+        valid = subpath >= 0
+        starts = np.flatnonzero(kind == MOVE)
+        closing = (kind == CLOSE) & valid
+        x[closing] = x[starts[subpath[closing]]]
+        y[closing] = y[starts[subpath[closing]]]
+
+        # Segments end at every line or close that continues the same subpath
+        ends = np.flatnonzero((kind != MOVE) & valid)
+        ends = ends[ends > 0]
+        ends = ends[subpath[ends - 1] == subpath[ends]]
+        ends = ends[stroked[ends]]
+        lengths = np.hypot(x[ends] - x[ends - 1], y[ends] - y[ends - 1])
+
+        # Closed subpaths (explicitly, or by being filled) are polygons; clips aren't painted
+        is_closed = np.zeros(len(starts), dtype=bool)
+        is_closed[subpath[closing]] = True
+        is_closed |= filled[starts]
+        is_closed &= stroked[starts] | filled[starts]
+        vertex = (kind != CLOSE) & valid & is_closed[np.maximum(subpath, 0)]
+        vx, vy, vsub = x[vertex], y[vertex], subpath[vertex]
+        areas = np.empty(0)
+        area_subpaths = np.empty(0, dtype=np.int64)
+        if len(vx):
+            # Shoelace per subpath: each vertex pairs with the next, the last with the first
+            bounds = np.flatnonzero(np.r_[True, vsub[1:] != vsub[:-1]])
+            next_index = np.arange(1, len(vx) + 1)
+            next_index[np.r_[bounds[1:], len(vx)] - 1] = bounds
+            cross = vx * vy[next_index] - vx[next_index] * vy
+            sizes = np.diff(np.r_[bounds, len(vx)])
+            areas = np.abs(np.add.reduceat(cross, bounds)) / 2
+            area_subpaths = vsub[bounds]
+            keep = sizes >= 3
+            areas, area_subpaths = areas[keep], area_subpaths[keep]
+
+        # Widths are reported after the CTM's scale
+        styles: list[StrokeStyle] = []
+        style_ids: dict[StrokeStyle, int] = {}
+        change_style = []
+        for ctm, style in changes:
+            scaled = StrokeStyle(round(style.width * abs(ctm[0] * ctm[3] - ctm[1] * ctm[2]) ** 0.5, 2), style.color)
+            change_style.append(style_ids.setdefault(scaled, len(style_ids)))
+            if len(styles) < len(style_ids):
+                styles.append(scaled)
+        change_style = np.array(change_style)
+
+        return [PathGeometry(
+            lengths=lengths,
+            length_styles=change_style[paint_state[ends]],
+            areas=areas,
+            area_styles=change_style[paint_state[starts[area_subpaths]]],
+            styles=styles,
+        )] + nested
+
+    @staticmethod
+    def _draw_form(name: bytes, resources, state: _State, depth: int) -> list[PathGeometry]:
+        """Measure a form XObject drawn with Do."""
+        try:
+            xobjects = resources["/XObject"] if resources is not None and "/XObject" in resources else None
+            form = xobjects[name.decode("latin-1")].get_object() if xobjects is not None else None
+            if form is None or form.get("/Subtype") != "/Form":
+                return []
+            matrix = tuple(float(v) for v in form.get("/Matrix", IDENTITY))
+            return GeometryService.extract_stream(
+                form.get_data(),
+                _State(_multiply(matrix, state.ctm), state.width, state.color),
+                form.get("/Resources", resources),
+                depth + 1,
+            )
+        except (KeyError, ValueError, TypeError) as e:
+            logger.debug(f"Skipping form {name!r}: {e}")
+            return []
+
+    @staticmethod
+    def extract_pages(data: FileData, max_pages: int = MAX_PAGES) -> list[list[PathGeometry]]:
+        """Extract the vector geometry of each PDF page.
+
+        Returns an empty list when the file isn't a readable PDF.
+        """
+        from pypdf import PdfReader
+        from pypdf.errors import PdfReadError
+
+        if data[:4] != b"%PDF":
+            return []
+        try:
+            # A memory map is already a seekable stream; avoid copying it
+            reader = PdfReader(data if isinstance(data, mmap.mmap) else io.BytesIO(data))
+            pages = []
+            for page_number, page in enumerate(reader.pages[:max_pages], start=1):
+                try:
+                    contents = page.get_contents()
+                    resources = page.get("/Resources")
+                    pages.append(
+                        GeometryService.extract_stream(contents.get_data(), resources=resources)
+                        if contents is not None else []
+                    )
+                except Exception as e:
+                    # A malformed content stream only costs its own page's measurements
+                    logger.warning(f"Could not measure vector paths on page {page_number}: {e!r}")
+                    pages.append([])
+            return pages
+        except (PdfReadError, ValueError, KeyError) as e:
+            logger.info(f"Could not read PDF vector paths: {e}")
+            return []
+
+    @staticmethod
+    def group_id(index: int) -> str:
+        """Id of the measured item at index, by which the model names it."""
+        return f"V{index + 1}"
+
+    @staticmethod
+    def measure(data: FileData, scale: ScaleInfo) -> list[TakeoffItem]:
+        """Measure stroked linework and closed outlines of a vector PDF.
+
+        Measurements are grouped per page and stroke style (CAD layers
+        usually differ in line weight or color): one LINEAR item with the
+        total stroked length and one AREA item with the total area of
+        closed outlines. Naming what each group is is left to the model,
+        by group id (see group_id).
+        Items are located by page only when the PDF has several pages.
+
+        Args:
+            data: PDF bytes
+            scale: Drawing scale; quantities are in feet and square feet
+
+        Returns:
+            Measured items, or an empty list for scans and unparseable scales
+        """
+        import numpy as np
+
+        pixels_per_foot = GeometryService.pixels_per_foot(scale)
+        if not pixels_per_foot:
+            return []
+
+        pages = GeometryService.extract_pages(data)
+        items = []
+        for page_number, geometries in enumerate(pages, start=1):
+            location = f"Page {page_number}" if len(pages) > 1 else None
+            linear: dict[StrokeStyle, list] = {}
+            area: dict[StrokeStyle, list] = {}
+            for geometry in geometries:
+                for style_id, style in enumerate(geometry.styles):
+                    lengths = geometry.lengths[geometry.length_styles == style_id]
+                    areas = geometry.areas[geometry.area_styles == style_id]
+                    if len(lengths):
+                        linear.setdefault(style, []).append(lengths)
+                    if len(areas):
+                        area.setdefault(style, []).append(areas)
+
+            for style, parts in linear.items():
+                lengths = np.concatenate(parts) / pixels_per_foot
+                total = float(lengths.sum())
+                if total < MIN_LINEAR_FEET:
+                    continue
+                items.append(TakeoffItem(
+                    name=f"Stroked linework ({style.describe()})",
+                    category=MeasurementCategory.LINEAR,
+                    quantity=round(total, 2),
+                    unit="LF",
+                    location=location,
+                    notes=f"{len(lengths)} segments measured from vector paths at {scale.scale_string}",
+                    confidence=0.95,
+                ))
+            for style, parts in area.items():
+                areas = np.concatenate(parts) / pixels_per_foot ** 2
+                areas = areas[areas >= MIN_AREA_SQFT]
+                if not len(areas):
+                    continue
+                items.append(TakeoffItem(
+                    name=f"Closed outlines ({style.describe()})",
+                    category=MeasurementCategory.AREA,
+                    quantity=round(float(areas.sum()), 2),
+                    unit="SF",
+                    location=location,
+                    notes=(
+                        f"{len(areas)} closed shapes measured from vector paths at "
+                        f"{scale.scale_string}; largest {areas.max():.1f} SF"
+                    ),
+                    confidence=0.95,
+                ))
+        return items
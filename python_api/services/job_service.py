@@ -0,0 +1,95 @@
+import asyncio
+import logging
+import os
+from typing import Awaitable, Callable
+
+from .job_store import job_store
+
+logger = logging.getLogger(__name__)
+
+# Jobs run at the same time in this process; the rest wait queued
+JOB_CONCURRENCY = int(os.getenv("TAKEOFF_JOB_CONCURRENCY", 2))
+
+# Live jobs are touched this often so other processes can tell them from dead ones
+JOB_HEARTBEAT_SECONDS = float(os.getenv("TAKEOFF_JOB_HEARTBEAT_SECONDS", 30))
+
+# Unfinished jobs not updated for this long are failed at startup
+JOB_STALE_SECONDS = float(os.getenv("TAKEOFF_JOB_STALE_SECONDS", 300))
+
+
+class JobService:
+    """Service for running takeoff jobs in the background of the API process."""
+
+    # Jobs owned by this process, by id
+    _tasks: dict[str, asyncio.Task] = {}
+    _semaphore: asyncio.Semaphore | None = None
+    _heartbeat: asyncio.Task | None = None
+
+    @staticmethod
+    async def startup() -> None:
+        """Fail jobs orphaned by a previous process.
+
+        Nothing runs here yet after a restart, so the heartbeat is started
+        by submit, with the first job this process owns.
+        """
+        interrupted = await job_store.fail_stale(
+            JOB_STALE_SECONDS, "The server restarted before the job finished"
+        )
+        if interrupted:
+            logger.warning(f"Marked {interrupted} interrupted takeoff job(s) as failed")
+
+    @staticmethod
+    async def shutdown() -> None:
+        """Cancel running jobs and record them as interrupted."""
+        tasks = list(JobService._tasks.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+        if JobService._heartbeat is not None:
+            JobService._heartbeat.cancel()
+            JobService._heartbeat = None
+
+    @staticmethod
+    def submit(job_id: str, run: Callable[[str], Awaitable[None]]) -> None:
+        """Run a job in the background, at most JOB_CONCURRENCY at a time.
+
+        Args:
+            job_id: Id of a job already stored as queued
+            run: Coroutine function that runs the job and records its outcome
+        """
+        if JobService._semaphore is None:
+            JobService._semaphore = asyncio.Semaphore(max(1, JOB_CONCURRENCY))
+        if JobService._heartbeat is None or JobService._heartbeat.done():
+            JobService._heartbeat = asyncio.create_task(JobService._beat())
+
+        async def wrapper() -> None:
+            try:
+                async with JobService._semaphore:
+                    await run(job_id)
+            except asyncio.CancelledError:
+                await asyncio.shield(job_store.fail(
+                    job_id, "The server shut down before the job finished", "INTERRUPTED"
+                ))
+                raise
+            except Exception as e:
+                logger.exception(f"Takeoff job {job_id} crashed")
+                await job_store.fail(job_id, str(e))
+            finally:
+                JobService._tasks.pop(job_id, None)
+
+        JobService._tasks[job_id] = asyncio.create_task(wrapper())
+
+    @staticmethod
+    def active() -> int:
+        """Number of jobs queued or running in this process."""
+        return len(JobService._tasks)
+
+    @staticmethod
+    async def _beat() -> None:
+        while JobService._tasks:
+            await asyncio.sleep(JOB_HEARTBEAT_SECONDS)
+            try:
+                await job_store.touch(list(JobService._tasks))
+            except Exception as e:
+                logger.warning(f"Job heartbeat failed: {e}")
@@ -0,0 +1,242 @@
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+import uuid
+from pathlib import Path
+
+from python_api.models import JobStatus, TakeoffItem, TakeoffRequest, TakeoffResult
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    request TEXT NOT NULL,
+    blueprint_url TEXT NOT NULL,
+    progress INTEGER NOT NULL DEFAULT 0,
+    message TEXT NOT NULL DEFAULT '',
+    item_count INTEGER NOT NULL DEFAULT 0,
+    result TEXT,
+    error TEXT,
+    error_code TEXT,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS jobs_updated_at ON jobs (updated_at);
+CREATE TABLE IF NOT EXISTS job_items (
+    job_id TEXT NOT NULL REFERENCES jobs (id) ON DELETE CASCADE,
+    seq INTEGER NOT NULL,
+    item TEXT NOT NULL,
+    PRIMARY KEY (job_id, seq)
+);
+"""
+
+JOB_COLUMNS = (
+    "id, status, blueprint_url, progress, message, item_count, "
+    "result, error, error_code, created_at, updated_at"
+)
+
+FINISHED: tuple[JobStatus, ...] = ("succeeded", "failed")
+
+
+class JobStore:
+    """SQLite store for background takeoff jobs.
+
+    Holds each job's status, progress, the items found so far and the final
+    result as JSON, so finished jobs are served straight from the database.
+    All calls run in a thread; one connection is shared behind a lock.
+    """
+
+    def __init__(self, path: str, ttl_seconds: float = 7 * 24 * 60 * 60):
+        self.path = Path(path)
+        self.ttl_seconds = ttl_seconds
+        self._conn: sqlite3.Connection | None = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> "JobStore":
+        """Create a store from TAKEOFF_JOB_* environment variables."""
+        return cls(
+            path=os.getenv(
+                "TAKEOFF_JOB_DB", os.path.join(tempfile.gettempdir(), "layerwise-jobs.sqlite3")
+            ),
+            ttl_seconds=float(os.getenv("TAKEOFF_JOB_TTL_SECONDS", 7 * 24 * 60 * 60)),
+        )
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA foreign_keys=ON")
+            conn.executescript(SCHEMA)
+            self._conn = conn
+        return self._conn
+
+    def _execute(self, sql: str, params: tuple = ()) -> list[sqlite3.Row]:
+        with self._lock:
+            return self._connect().execute(sql, params).fetchall()
+
+    async def create(self, request: TakeoffRequest) -> dict:
+        """Store a new queued job and return its row."""
+        now = time.time()
+        job_id = uuid.uuid4().hex
+
+        def insert() -> list[sqlite3.Row]:
+            with self._lock:
+                conn = self._connect()
+                conn.execute(
+                    "INSERT INTO jobs (id, status, request, blueprint_url, created_at, updated_at) "
+                    "VALUES (?, 'queued', ?, ?, ?, ?)",
+                    (job_id, request.model_dump_json(), request.blueprint_url, now, now),
+                )
+                # Finished jobs past their TTL are pruned as new ones arrive
+                conn.execute(
+                    "DELETE FROM jobs WHERE updated_at < ? AND status IN ('succeeded', 'failed')",
+                    (now - self.ttl_seconds,),
+                )
+                return conn.execute(f"SELECT {JOB_COLUMNS} FROM jobs WHERE id = ?", (job_id,)).fetchall()
+
+        return dict((await asyncio.to_thread(insert))[0])
+
+    async def get(self, job_id: str) -> dict | None:
+        """Get a job's row (result still serialized), or None if unknown."""
+        rows = await asyncio.to_thread(
+            self._execute, f"SELECT {JOB_COLUMNS} FROM jobs WHERE id = ?", (job_id,)
+        )
+        return dict(rows[0]) if rows else None
+
+    async def get_request(self, job_id: str) -> TakeoffRequest | None:
+        """Get the request a job was created with."""
+        rows = await asyncio.to_thread(
+            self._execute, "SELECT request FROM jobs WHERE id = ?", (job_id,)
+        )
+        return TakeoffRequest.model_validate_json(rows[0]["request"]) if rows else None
+
+    async def items(self, job_id: str, after: int = 0) -> list[tuple[int, str]]:
+        """Get (seq, serialized item) pairs stored after a sequence number."""
+        rows = await asyncio.to_thread(
+            self._execute,
+            "SELECT seq, item FROM job_items WHERE job_id = ? AND seq > ? ORDER BY seq",
+            (job_id, after),
+        )
+        return [(row["seq"], row["item"]) for row in rows]
+
+    async def update(
+        self,
+        job_id: str,
+        status: JobStatus | None = None,
+        progress: int | None = None,
+        message: str | None = None,
+    ) -> None:
+        """Record progress on a job."""
+        await asyncio.to_thread(
+            self._execute,
+            "UPDATE jobs SET status = COALESCE(?, status), progress = COALESCE(?, progress), "
+            "message = COALESCE(?, message), updated_at = ? WHERE id = ?",
+            (status, progress, message, time.time(), job_id),
+        )
+
+    async def add_items(self, job_id: str, items: list[TakeoffItem]) -> None:
+        """Append partial items found while the job runs."""
+        if not items:
+            return
+
+        def insert() -> None:
+            with self._lock:
+                conn = self._connect()
+                conn.execute("BEGIN")
+                try:
+                    (count,) = conn.execute(
+                        "SELECT item_count FROM jobs WHERE id = ?", (job_id,)
+                    ).fetchone()
+                    conn.executemany(
+                        "INSERT INTO job_items (job_id, seq, item) VALUES (?, ?, ?)",
+                        [(job_id, count + i + 1, item.model_dump_json()) for i, item in enumerate(items)],
+                    )
+                    conn.execute(
+                        "UPDATE jobs SET item_count = ?, updated_at = ? WHERE id = ?",
+                        (count + len(items), time.time(), job_id),
+                    )
+                    conn.execute("COMMIT")
+                except BaseException:
+                    conn.execute("ROLLBACK")
+                    raise
+
+        await asyncio.to_thread(insert)
+
+    async def succeed(self, job_id: str, result: TakeoffResult) -> None:
+        """Store the final result; partial items are dropped since the result has them all."""
+        def finish() -> None:
+            with self._lock:
+                conn = self._connect()
+                conn.execute("BEGIN")
+                try:
+                    conn.execute(
+                        "UPDATE jobs SET status = 'succeeded', progress = 100, message = 'Complete', "
+                        "result = ?, item_count = ?, updated_at = ? WHERE id = ?",
+                        (result.model_dump_json(), len(result.items), time.time(), job_id),
+                    )
+                    conn.execute("DELETE FROM job_items WHERE job_id = ?", (job_id,))
+                    conn.execute("COMMIT")
+                except BaseException:
+                    conn.execute("ROLLBACK")
+                    raise
+
+        await asyncio.to_thread(finish)
+
+    async def fail(self, job_id: str, error: str, code: str = "ERROR") -> None:
+        """Mark a job as failed."""
+        await asyncio.to_thread(
+            self._execute,
+            "UPDATE jobs SET status = 'failed', error = ?, error_code = ?, updated_at = ? WHERE id = ?",
+            (error, code, time.time(), job_id),
+        )
+
+    async def fail_stale(self, stale_seconds: float, error: str) -> int:
+        """Fail unfinished jobs that stopped making progress (their process died).
+
+        Jobs still updating, such as those run by another worker process
+        sharing the database, are left alone.
+        """
+        def interrupt() -> int:
+            with self._lock:
+                now = time.time()
+                cursor = self._connect().execute(
+                    "UPDATE jobs SET status = 'failed', error = ?, error_code = 'INTERRUPTED', "
+                    "updated_at = ? WHERE status IN ('queued', 'running') AND updated_at < ?",
+                    (error, now, now - stale_seconds),
+                )
+                return cursor.rowcount
+
+        return await asyncio.to_thread(interrupt)
+
+    async def touch(self, job_ids: list[str]) -> None:
+        """Mark jobs as alive without changing their progress."""
+        if not job_ids:
+            return
+        placeholders = ", ".join("?" for _ in job_ids)
+        await asyncio.to_thread(
+            self._execute,
+            f"UPDATE jobs SET updated_at = ? WHERE id IN ({placeholders}) "
+            "AND status IN ('queued', 'running')",
+            (time.time(), *job_ids),
+        )
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+# Shared job store for the API process
+job_store = JobStore.from_env()
@@ -0,0 +1,257 @@
+import bisect
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Iterator
+
+# Stage durations from milliseconds (sniffing) to minutes (model runs on large sets)
+SECONDS_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0,
+)
+
+# Small counts per run (tool calls, model requests)
+COUNT_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 34, 55)
+
+LabelValues = tuple[str, ...]
+
+
+def _format_labels(names: tuple[str, ...], values: LabelValues, extra: str = "") -> str:
+    pairs = [f'{name}="{value}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Counter:
+    """Monotonic counter with labels, rendered in the Prometheus text format."""
+
+    def __init__(self, name: str, help: str, labels: tuple[str, ...] = ()):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self._values: dict[LabelValues, float] = {}
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        for labels, value in sorted(self._values.items()):
+            lines.append(f"{self.name}{_format_labels(self.labels, labels)} {value:g}")
+        return lines
+
+
+class Histogram:
+    """Cumulative-bucket histogram with labels, rendered in the Prometheus text format."""
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labels: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = SECONDS_BUCKETS,
+    ):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self.buckets = buckets
+        # Per label set: bucket counts (last is +Inf), sum
+        self._values: dict[LabelValues, tuple[list[int], list[float]]] = {}
+
+    def observe(self, value: float, *labels: str) -> None:
+        counts, total = self._values.setdefault(labels, ([0] * (len(self.buckets) + 1), [0.0]))
+        counts[bisect.bisect_left(self.buckets, value)] += 1
+        total[0] += value
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for labels, (counts, total) in sorted(self._values.items()):
+            cumulative = 0
+            for bound, count in zip((*self.buckets, float("inf")), counts):
+                cumulative += count
+                le = 'le="+Inf"' if bound == float("inf") else f'le="{bound:g}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labels, labels, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labels, labels)} {total[0]:.6f}")
+            lines.append(f"{self.name}_count{_format_labels(self.labels, labels)} {cumulative}")
+        return lines
+
+
+class Gauge:
+    """Gauge read from a callback when metrics are rendered."""
+
+    def __init__(self, name: str, help: str, read: Callable[[], float]):
+        self.name = name
+        self.help = help
+        self.read = read
+
+    def render(self) -> list[str]:
+        return [
+            f"# HELP {self.name} {self.help}",
+            f"# TYPE {self.name} gauge",
+            f"{self.name} {self.read():g}",
+        ]
+
+
+class MetricsRegistry:
+    """The process's metrics, rendered for a Prometheus scrape."""
+
+    def __init__(self):
+        self._metrics: list[Counter | Histogram | Gauge] = []
+
+    def counter(self, name: str, help: str, labels: tuple[str, ...] = ()) -> Counter:
+        return self._add(Counter(name, help, labels))
+
+    def histogram(
+        self,
+        name: str,
+        help: str,
+        labels: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = SECONDS_BUCKETS,
+    ) -> Histogram:
+        return self._add(Histogram(name, help, labels, buckets))
+
+    def gauge(self, name: str, help: str, read: Callable[[], float]) -> Gauge:
+        return self._add(Gauge(name, help, read))
+
+    def render(self) -> str:
+        return "\n".join(line for metric in self._metrics for line in metric.render()) + "\n"
+
+    def _add(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+
+metrics = MetricsRegistry()
+
+stage_seconds = metrics.histogram(
+    "takeoff_stage_seconds", "Time spent in each pipeline stage", ("route", "stage")
+)
+requests_total = metrics.counter(
+    "takeoff_requests_total", "Takeoff requests by route and outcome", ("route", "outcome")
+)
+model_request_seconds = metrics.histogram(
+    "model_request_seconds", "Upstream model request latency", ("model",)
+)
+model_requests_total = metrics.counter(
+    "model_requests_total", "Upstream model requests by outcome", ("model", "outcome")
+)
+model_tokens_total = metrics.counter(
+    "model_tokens_total", "Tokens used by upstream model requests", ("model", "type")
+)
+tool_calls_total = metrics.counter(
+    "takeoff_tool_calls_total", "Takeoff agent tool calls by tool", ("tool",)
+)
+tool_calls_per_run = metrics.histogram(
+    "takeoff_tool_calls_per_run", "Tool calls made in one takeoff agent run", buckets=COUNT_BUCKETS
+)
+upstream_bytes_total = metrics.counter(
+    "model_upstream_bytes_total",
+    "Bytes sent to the model provider, in requests and file uploads",
+    ("kind",),
+)
+
+
+class StageTimer:
+    """Per-request stage timings and token usage.
+
+    Stages may be entered more than once (e.g. once per page); their
+    durations add up. The timer for the current request is found through
+    a contextvar, so services and the model wrapper can record into it
+    without having it passed down.
+    """
+
+    def __init__(self, route: str):
+        self.route = route
+        self.started = time.perf_counter()
+        self.stages: dict[str, float] = {}
+        self.tokens = {"input": 0, "output": 0}
+        self.model_requests = 0
+        self.tool_calls: dict[str, int] = {}
+        self.upstream_bytes: dict[str, int] = {}
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - started)
+
+    def record(self, name: str, seconds: float) -> None:
+        self.stages[name] = self.stages.get(name, 0.0) + seconds
+
+    def record_once(self, name: str, seconds: float) -> None:
+        """Record a stage only the first time (e.g. time to first token)."""
+        self.stages.setdefault(name, seconds)
+
+    def add_usage(self, input_tokens: int, output_tokens: int) -> None:
+        self.tokens["input"] += input_tokens
+        self.tokens["output"] += output_tokens
+        self.model_requests += 1
+
+    def add_tool_calls(self, counts: dict[str, int]) -> None:
+        for tool, count in counts.items():
+            self.tool_calls[tool] = self.tool_calls.get(tool, 0) + count
+
+    def add_upstream_bytes(self, kind: str, size: int) -> None:
+        self.upstream_bytes[kind] = self.upstream_bytes.get(kind, 0) + size
+
+    def total(self) -> float:
+        return time.perf_counter() - self.started
+
+    def finish(self, outcome: str = "ok") -> None:
+        """Observe every stage and the total into the histograms."""
+        for name, seconds in self.stages.items():
+            stage_seconds.observe(seconds, self.route, name)
+        stage_seconds.observe(self.total(), self.route, "total")
+        requests_total.inc(self.route, outcome)
+
+    def server_timing(self) -> str:
+        """Stages as a Server-Timing header value (milliseconds)."""
+        entries = [f"{name};dur={seconds * 1000:.1f}" for name, seconds in self.stages.items()]
+        entries.append(f"total;dur={self.total() * 1000:.1f}")
+        return ", ".join(entries)
+
+    def as_dict(self) -> dict:
+        """Stages in milliseconds, with token usage, tool calls and bytes sent upstream."""
+        return {
+            "stages_ms": {name: round(seconds * 1000, 1) for name, seconds in self.stages.items()},
+            "total_ms": round(self.total() * 1000, 1),
+            "tokens": dict(self.tokens),
+            "model_requests": self.model_requests,
+            "tool_calls": dict(self.tool_calls),
+            "upstream_bytes": dict(self.upstream_bytes),
+        }
+
+
+# Timer of the request being handled, if any
+current_timer: ContextVar[StageTimer | None] = ContextVar("current_timer", default=None)
+
+
+@contextmanager
+def timed(name: str) -> Iterator[None]:
+    """Time a stage of the current request (no-op outside a timed request)."""
+    timer = current_timer.get()
+    if timer is None:
+        yield
+        return
+    with timer.stage(name):
+        yield
+
+
+def record_tool_calls(counts: dict[str, int]) -> None:
+    """Record one agent run's tool calls in the metrics and the current request's timer."""
+    for tool, count in counts.items():
+        tool_calls_total.inc(tool, amount=count)
+    tool_calls_per_run.observe(sum(counts.values()))
+    timer = current_timer.get()
+    if timer is not None:
+        timer.add_tool_calls(counts)
+
+
+def record_upstream_bytes(kind: str, size: int) -> None:
+    """Record bytes sent to the model provider ("model_request" or "file_upload")."""
+    upstream_bytes_total.inc(kind, amount=size)
+    timer = current_timer.get()
+    if timer is not None:
+        timer.add_upstream_bytes(kind, size)
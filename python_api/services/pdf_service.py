@@ -1,7 +1,49 @@
+import asyncio
+import importlib.util
+import io
+import logging
+import mmap
+import os
+import tempfile
 from typing import TypedDict
 
 import httpx
 
+from python_api.models import BlueprintPage
+from .blob_cache import BlobCache, blob_cache
+from .single_flight import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+# Downloads larger than this are rejected
+MAX_FILE_SIZE = int(float(os.getenv("BLOB_MAX_SIZE_MB", 250)) * 1024 * 1024)
+
+# Downloads larger than this are spooled to a temp file and memory-mapped
+SPOOL_THRESHOLD = int(float(os.getenv("BLOB_SPOOL_THRESHOLD_MB", 16)) * 1024 * 1024)
+
+DOWNLOAD_CHUNK_SIZE = 256 * 1024
+
+# Spooled downloads are written to disk in batches of this size
+SPOOL_WRITE_SIZE = 4 * 1024 * 1024
+
+# Blueprint contents: small files in memory, large ones as a read-only mmap.
+# Both support len(), slicing, hashing and the buffer protocol.
+FileData = bytes | mmap.mmap
+
+# Concurrent fetches of one URL share a download
+blob_fetches: SingleFlight[FileData] = SingleFlight("blob fetch")
+
+
+class FileTooLargeError(Exception):
+    """Raised when a blueprint exceeds the configured maximum download size."""
+
+    def __init__(self, size: int, max_size: int):
+        self.size = size
+        self.max_size = max_size
+        super().__init__(
+            f"Blueprint is larger than the {max_size / (1024 * 1024):g} MB limit"
+        )
+
 
 class FileInfo(TypedDict):
     """Type definition for file metadata."""
@@ -12,16 +54,182 @@ class FileInfo(TypedDict):
 class FileService:
     """Service for fetching blueprint files."""
 
+    # Shared connection pool, opened in the app lifespan (or lazily on first fetch)
+    _client: httpx.AsyncClient | None = None
+
+    @staticmethod
+    def create_client() -> httpx.AsyncClient:
+        """Create a pooled HTTP client configured from BLOB_* environment variables."""
+        http2 = os.getenv("BLOB_HTTP2", "true").lower() == "true"
+        if http2 and importlib.util.find_spec("h2") is None:
+            logger.warning("HTTP/2 requested but the h2 package is not installed; using HTTP/1.1")
+            http2 = False
+
+        return httpx.AsyncClient(
+            http2=http2,
+            limits=httpx.Limits(
+                max_connections=int(os.getenv("BLOB_MAX_CONNECTIONS", 100)),
+                max_keepalive_connections=int(os.getenv("BLOB_MAX_KEEPALIVE_CONNECTIONS", 20)),
+                keepalive_expiry=float(os.getenv("BLOB_KEEPALIVE_EXPIRY", 30.0)),
+            ),
+            timeout=httpx.Timeout(
+                connect=float(os.getenv("BLOB_CONNECT_TIMEOUT", 5.0)),
+                read=float(os.getenv("BLOB_READ_TIMEOUT", 60.0)),
+                write=float(os.getenv("BLOB_WRITE_TIMEOUT", 30.0)),
+                pool=float(os.getenv("BLOB_POOL_TIMEOUT", 10.0)),
+            ),
+            follow_redirects=True,
+        )
+
+    @staticmethod
+    async def startup() -> None:
+        """Open the shared HTTP client."""
+        if FileService._client is None or FileService._client.is_closed:
+            FileService._client = FileService.create_client()
+
     @staticmethod
-    async def fetch_file(url: str) -> bytes:
-        """Fetch file from URL."""
-        async with httpx.AsyncClient() as client:
-            response = await client.get(url, timeout=60.0)
+    async def shutdown() -> None:
+        """Close the shared HTTP client and its pooled connections."""
+        if FileService._client is not None:
+            await FileService._client.aclose()
+            FileService._client = None
+
+    @staticmethod
+    def get_client() -> httpx.AsyncClient:
+        """Get the shared HTTP client, creating it if the lifespan hasn't run."""
+        if FileService._client is None or FileService._client.is_closed:
+            FileService._client = FileService.create_client()
+        return FileService._client
+
+    @staticmethod
+    async def fetch_file(
+        url: str,
+        max_size: int = MAX_FILE_SIZE,
+        spool_threshold: int = SPOOL_THRESHOLD,
+    ) -> FileData:
+        """Fetch file from URL.
+
+        The body is streamed: downloads over max_size are aborted (up front
+        when Content-Length says so), small files are returned as bytes and
+        larger ones are spooled to an unlinked temp file and returned as a
+        read-only memory map.
+
+        When the blob cache is enabled, downloads carrying an ETag or
+        Last-Modified are kept on disk and revalidated with a conditional
+        GET; a 304 is served from the cached copy.
+
+        Concurrent fetches of the same URL share one download (and one
+        revalidation) and get the same data.
+
+        Raises:
+            FileTooLargeError: If the file exceeds max_size
+            httpx.HTTPError: If the download fails
+        """
+        return await blob_fetches.run(
+            f"{url}:{max_size}:{spool_threshold}",
+            lambda: FileService._fetch(url, max_size, spool_threshold),
+        )
+
+    @staticmethod
+    async def _fetch(url: str, max_size: int, spool_threshold: int) -> FileData:
+        if blob_cache is None:
+            data, _ = await FileService._download(url, {}, max_size, spool_threshold)
+            return data
+
+        entry = await asyncio.to_thread(blob_cache.lookup, url)
+        if entry is not None:
+            headers = BlobCache.conditional_headers(entry)
+            data, response = await FileService._download(url, headers, max_size, spool_threshold)
+            if data is not None:
+                await FileService._store(url, data, response, replaced=True)
+                return data
+
+            cached = await asyncio.to_thread(blob_cache.read, entry, spool_threshold)
+            if cached is not None:
+                return cached
+
+        # No usable cached copy; fetch unconditionally
+        data, response = await FileService._download(url, {}, max_size, spool_threshold)
+        await FileService._store(url, data, response)
+        return data
+
+    @staticmethod
+    async def _download(
+        url: str,
+        headers: dict[str, str],
+        max_size: int,
+        spool_threshold: int,
+    ) -> tuple[FileData | None, httpx.Response]:
+        """Stream a download; the data is None when the server answered 304."""
+        async with FileService.get_client().stream("GET", url, headers=headers) as response:
+            if response.status_code == 304 and headers:
+                return None, response
             response.raise_for_status()
-            return response.content
+
+            content_length = response.headers.get("Content-Length")
+            if content_length and content_length.isdigit() and int(content_length) > max_size:
+                raise FileTooLargeError(int(content_length), max_size)
+
+            return await FileService._read_body(response, max_size, spool_threshold), response
+
+    @staticmethod
+    async def _store(url: str, data: FileData, response: httpx.Response, replaced: bool = False) -> None:
+        try:
+            await asyncio.to_thread(
+                blob_cache.store,
+                url,
+                data,
+                response.headers.get("ETag"),
+                response.headers.get("Last-Modified"),
+                replaced,
+            )
+        except OSError as e:
+            logger.warning(f"Failed to write blueprint to blob cache: {e}")
 
     @staticmethod
-    def get_file_info(data: bytes) -> FileInfo:
+    async def _read_body(
+        response: httpx.Response, max_size: int, spool_threshold: int
+    ) -> FileData:
+        chunks: list[bytes] = []
+        buffered = 0
+        spool = None
+        size = 0
+
+        def write(pending: list[bytes]) -> None:
+            nonlocal spool
+            if spool is None:
+                spool = tempfile.TemporaryFile()
+            spool.writelines(pending)
+
+        try:
+            async for chunk in response.aiter_bytes(DOWNLOAD_CHUNK_SIZE):
+                size += len(chunk)
+                if size > max_size:
+                    raise FileTooLargeError(size, max_size)
+
+                chunks.append(chunk)
+                buffered += len(chunk)
+                # Disk writes go to a thread, a batch at a time, so other requests keep streaming
+                if size > spool_threshold and buffered >= SPOOL_WRITE_SIZE:
+                    pending, chunks, buffered = chunks, [], 0
+                    await asyncio.to_thread(write, pending)
+
+            if spool is None and size <= spool_threshold:
+                return b"".join(chunks)
+
+            def finish() -> mmap.mmap:
+                write(chunks)
+                spool.flush()
+                # The mapping keeps the unlinked file alive after the handle is closed
+                return mmap.mmap(spool.fileno(), 0, access=mmap.ACCESS_READ)
+
+            return await asyncio.to_thread(finish)
+        finally:
+            if spool is not None:
+                spool.close()
+
+    @staticmethod
+    def get_file_info(data: FileData) -> FileInfo:
         """Get basic file info."""
         file_type = "unknown"
         if data[:4] == b'%PDF':
@@ -37,7 +245,7 @@ class FileService:
         }
 
     @staticmethod
-    def get_mime_type(data: bytes) -> str:
+    def get_mime_type(data: FileData) -> str:
         """Get MIME type from file bytes."""
         if data[:4] == b'%PDF':
             return "application/pdf"
@@ -46,3 +254,42 @@ class FileService:
         elif data[:2] == b'\xff\xd8':
             return "image/jpeg"
         return "application/octet-stream"
+
+    @staticmethod
+    def split_pdf_pages(data: FileData) -> list[BlueprintPage]:
+        """Split a PDF into single-page PDFs.
+
+        Page sizes are reported in PDF user space (72 per inch), honoring
+        the crop box and page rotation. Returns an empty list for non-PDF
+        files or PDFs that cannot be read.
+        """
+        if data[:4] != b'%PDF':
+            return []
+
+        from pypdf import PdfReader, PdfWriter
+        from pypdf.errors import PdfReadError
+
+        try:
+            # A memory map is already a seekable stream; avoid copying it
+            reader = PdfReader(data if isinstance(data, mmap.mmap) else io.BytesIO(data))
+            pages = []
+            for page_number, page in enumerate(reader.pages, start=1):
+                writer = PdfWriter()
+                writer.add_page(page)
+                buffer = io.BytesIO()
+                writer.write(buffer)
+
+                width, height = float(page.cropbox.width), float(page.cropbox.height)
+                if page.rotation % 180 == 90:
+                    width, height = height, width
+
+                pages.append(BlueprintPage(
+                    page_number=page_number,
+                    pdf_data=buffer.getvalue(),
+                    width_px=round(width),
+                    height_px=round(height),
+                ))
+            return pages
+        except (PdfReadError, ValueError, KeyError) as e:
+            logger.info(f"Could not split PDF into pages: {e}")
+            return []
@@ -0,0 +1,211 @@
+import io
+import logging
+import math
+import mmap
+import os
+import re
+import threading
+from dataclasses import dataclass
+
+from python_api.models import BlueprintPage
+from .pdf_service import FileData, FileService
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class RenderProfile:
+    """How pages are rasterized before they are sent to the model."""
+    name: str
+    dpi: float
+    max_pixels: int
+    # 'bilevel' (1-bit PNG, line art only) or 'grayscale' (8-bit PNG)
+    color_mode: str
+
+
+RENDER_PROFILES: dict[str, RenderProfile] = {
+    "fast": RenderProfile("fast", dpi=72, max_pixels=4_000_000, color_mode="bilevel"),
+    "balanced": RenderProfile("balanced", dpi=100, max_pixels=9_000_000, color_mode="grayscale"),
+    "accurate": RenderProfile("accurate", dpi=150, max_pixels=24_000_000, color_mode="grayscale"),
+}
+
+# Profile used when a request doesn't pick one; unset sends original files
+DEFAULT_RENDER_PROFILE = os.getenv("DEFAULT_RENDER_PROFILE") or None
+
+# Image XObjects mark scanned content; pages without them are pure vector
+_IMAGE_XOBJECT = re.compile(rb"/Subtype\s*/Image\b")
+
+# pdfium is not thread-safe; renders from concurrent requests are serialized
+PDFIUM_LOCK = threading.Lock()
+
+
+class _MappedReader(io.RawIOBase):
+    """A read-only stream over a memory map, read by pdfium a block at a time."""
+
+    def __init__(self, data: mmap.mmap):
+        self._data = data
+        self._position = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        base = {io.SEEK_SET: 0, io.SEEK_CUR: self._position, io.SEEK_END: len(self._data)}[whence]
+        self._position = max(0, base + offset)
+        return self._position
+
+    def tell(self) -> int:
+        return self._position
+
+    def readinto(self, buffer) -> int:
+        chunk = self._data[self._position:self._position + len(buffer)]
+        memoryview(buffer).cast("B")[:len(chunk)] = chunk
+        self._position += len(chunk)
+        return len(chunk)
+
+
+def pdfium_input(data: FileData):
+    """What to open a blueprint with in pdfium.
+
+    pdfium takes bytes but not a memory map (large downloads are spooled
+    to one), so those are read through a stream instead of being copied.
+    """
+    return _MappedReader(data) if isinstance(data, mmap.mmap) else data
+
+
+def fit_scale(width: float, height: float, scale: float, max_pixels: int) -> float:
+    """Reduce a render scale so the output stays within the pixel budget."""
+    pixels = width * scale * height * scale
+    if pixels <= max_pixels:
+        return scale
+    return scale * math.sqrt(max_pixels / pixels)
+
+
+class RasterService:
+    """Service for rasterizing and downsampling blueprints for the model."""
+
+    @staticmethod
+    def get_profile(name: str | None) -> RenderProfile | None:
+        """Resolve a profile name (falling back to DEFAULT_RENDER_PROFILE)."""
+        name = name or DEFAULT_RENDER_PROFILE
+        if not name:
+            return None
+        if name not in RENDER_PROFILES:
+            raise ValueError(f"Unknown render profile: {name}")
+        return RENDER_PROFILES[name]
+
+    @staticmethod
+    def page_payload(page: BlueprintPage, file_data: FileData) -> tuple[FileData, str]:
+        """Get the bytes and MIME type sent to the model for a page.
+
+        Falls back to the original file when the page kept no payload of
+        its own (an image that didn't shrink when re-encoded).
+        """
+        if page.image_data is not None:
+            return page.image_data, page.media_type or "image/png"
+        if page.pdf_data is not None:
+            return page.pdf_data, "application/pdf"
+        return file_data, FileService.get_mime_type(file_data)
+
+    @staticmethod
+    def encode(image, profile: RenderProfile) -> bytes:
+        """Encode a PIL image as a compact PNG for the profile."""
+        image = image.convert("1" if profile.color_mode == "bilevel" else "L")
+        buffer = io.BytesIO()
+        image.save(buffer, format="PNG")
+        return buffer.getvalue()
+
+    @staticmethod
+    def render_pdf_pages(
+        data: FileData,
+        profile: RenderProfile,
+        pages: list[BlueprintPage] | None = None,
+        max_pages: int | None = None,
+    ) -> list[BlueprintPage]:
+        """Render each PDF page to an image at the profile's DPI and pixel budget.
+
+        When the split pages are given, vector pages (no embedded images)
+        are not rendered, and a page keeps its single-page PDF instead of the
+        image whenever the PDF is the smaller payload.
+
+        Args:
+            data: PDF bytes
+            profile: Render profile
+            pages: Pages from FileService.split_pdf_pages, if already split
+            max_pages: Only render the first pages
+        """
+        import pypdfium2 as pdfium
+
+        def split_pdf(index: int) -> bytes | None:
+            return pages[index].pdf_data if pages and index < len(pages) else None
+
+        rendered = []
+        with PDFIUM_LOCK:
+            document = pdfium.PdfDocument(pdfium_input(data))
+            try:
+                for index in range(min(len(document), max_pages or len(document))):
+                    pdf_data = split_pdf(index)
+                    if pdf_data is not None and not _IMAGE_XOBJECT.search(pdf_data):
+                        # Vector linework is always smaller as a PDF than as pixels
+                        rendered.append(None)
+                        continue
+                    page = document[index]
+                    width, height = page.get_size()
+                    scale = fit_scale(width, height, profile.dpi / 72, profile.max_pixels)
+                    image = page.render(scale=scale, grayscale=True).to_pil()
+                    rendered.append(image)
+                    page.close()
+            finally:
+                document.close()
+
+        result = []
+        for index, image in enumerate(rendered):
+            pdf_data = split_pdf(index)
+            if image is None:
+                result.append(pages[index])
+                continue
+
+            image_data = RasterService.encode(image, profile)
+            if pdf_data is not None and len(pdf_data) <= len(image_data):
+                image_data = None
+
+            result.append(BlueprintPage(
+                page_number=index + 1,
+                image_data=image_data,
+                media_type="image/png" if image_data else None,
+                pdf_data=pdf_data,
+                width_px=image.width,
+                height_px=image.height,
+            ))
+        return result
+
+    @staticmethod
+    def downsample_image(data: FileData, profile: RenderProfile) -> BlueprintPage:
+        """Downsample a scanned image to the profile's pixel budget and re-encode it.
+
+        The original bytes are kept (image_data is None) when re-encoding
+        doesn't make the payload smaller.
+        """
+        from PIL import Image
+
+        image = Image.open(io.BytesIO(data))
+        width, height = image.size
+        scale = fit_scale(width, height, 1.0, profile.max_pixels)
+        if scale < 1.0:
+            image = image.resize(
+                (max(1, round(width * scale)), max(1, round(height * scale))),
+                Image.Resampling.LANCZOS,
+            )
+
+        image_data = RasterService.encode(image, profile)
+        keep_original = len(image_data) >= len(data)
+        return BlueprintPage(
+            page_number=1,
+            image_data=None if keep_original else image_data,
+            media_type=None if keep_original else "image/png",
+            width_px=width if keep_original else image.width,
+            height_px=height if keep_original else image.height,
+        )
@@ -0,0 +1,228 @@
+import io
+import logging
+import os
+import re
+from dataclasses import dataclass
+
+from .pdf_service import FileData, FileService
+from .raster_service import RasterService, RenderProfile, fit_scale, pdfium_input, PDFIUM_LOCK
+from .scale_parser import IMPERIAL_PATTERN, METRIC_PATTERN
+
+logger = logging.getLogger(__name__)
+
+# Title block candidate as fractions of the displayed sheet (left, bottom, right, top)
+TITLE_BLOCK_REGION = (0.7, 0.0, 1.0, 0.3)
+
+# Crops are rendered sharper than whole pages so small title block text stays legible
+REGION_PROFILE = RenderProfile(
+    "region",
+    dpi=float(os.getenv("SCALE_REGION_DPI", 150)),
+    max_pixels=4_000_000,
+    color_mode="grayscale",
+)
+
+# At most this many crops go to the scale detector
+MAX_REGIONS = 6
+
+# Padding around scale text in PDF units; graphic bar scales sit to the right of their label
+TEXT_PADDING = (72.0, 54.0, 288.0, 54.0)
+
+SCALE_TEXT_PATTERN = re.compile(
+    rf"\bscale\b|{IMPERIAL_PATTERN.pattern}|{METRIC_PATTERN.pattern}", re.IGNORECASE
+)
+
+
+@dataclass
+class RegionCrop:
+    """A rendered region of interest on a sheet."""
+    name: str  # 'title_block' or 'scale_text'
+    page_number: int
+    image_data: bytes
+    width_px: int
+    height_px: int
+
+
+Box = tuple[float, float, float, float]
+
+
+def _rotate_box(box: Box, rotation: int, width: float, height: float) -> Box:
+    """Map a box from unrotated page space to the displayed (rotated) page."""
+    left, bottom, right, top = box
+    if rotation == 90:
+        corners = [(y, width - x) for x, y in ((left, bottom), (right, top))]
+    elif rotation == 180:
+        corners = [(width - x, height - y) for x, y in ((left, bottom), (right, top))]
+    elif rotation == 270:
+        corners = [(height - y, x) for x, y in ((left, bottom), (right, top))]
+    else:
+        return box
+    (x0, y0), (x1, y1) = corners
+    return min(x0, x1), min(y0, y1), max(x0, x1), max(y0, y1)
+
+
+def _overlaps(a: Box, b: Box) -> bool:
+    return a[0] < b[2] and b[0] < a[2] and a[1] < b[3] and b[1] < a[3]
+
+
+def _merge_boxes(boxes: list[Box]) -> list[Box]:
+    """Merge overlapping boxes until none overlap."""
+    merged: list[Box] = []
+    for box in boxes:
+        while True:
+            overlapping = next((m for m in merged if _overlaps(m, box)), None)
+            if overlapping is None:
+                break
+            merged.remove(overlapping)
+            box = (
+                min(box[0], overlapping[0]), min(box[1], overlapping[1]),
+                max(box[2], overlapping[2]), max(box[3], overlapping[3]),
+            )
+        merged.append(box)
+    return merged
+
+
+def _contains(outer: Box, inner: Box) -> bool:
+    return outer[0] <= inner[0] and outer[1] <= inner[1] and outer[2] >= inner[2] and outer[3] >= inner[3]
+
+
+class RegionService:
+    """Service for cropping the parts of a sheet that carry its scale notation."""
+
+    @staticmethod
+    def title_block_box(width: float, height: float) -> Box:
+        """The title block candidate on a displayed sheet of the given size."""
+        left, bottom, right, top = TITLE_BLOCK_REGION
+        return width * left, height * bottom, width * right, height * top
+
+    @staticmethod
+    def scale_text_boxes(textpage, pdfium_raw, origin: tuple[float, float]) -> list[Box]:
+        """Find boxes around scale-like text on a page's text layer (unrotated page space)."""
+        text = textpage.get_text_range()
+        boxes = []
+        for match in SCALE_TEXT_PATTERN.finditer(text):
+            char_boxes = []
+            for text_index in (match.start(), match.end() - 1):
+                char_index = pdfium_raw.FPDFText_GetCharIndexFromTextIndex(textpage.raw, text_index)
+                if char_index >= 0:
+                    char_boxes.append(textpage.get_charbox(char_index))
+            if not char_boxes:
+                continue
+
+            pad_left, pad_bottom, pad_right, pad_top = TEXT_PADDING
+            boxes.append((
+                min(b[0] for b in char_boxes) - origin[0] - pad_left,
+                min(b[1] for b in char_boxes) - origin[1] - pad_bottom,
+                max(b[2] for b in char_boxes) - origin[0] + pad_right,
+                max(b[3] for b in char_boxes) - origin[1] + pad_top,
+            ))
+        return boxes
+
+    @staticmethod
+    def crop_pdf(data: FileData, page_index: int = 0) -> list[RegionCrop]:
+        """Render the title block and scale-text regions of one PDF page.
+
+        Regions are merged where they overlap, clipped to the sheet and
+        rendered at REGION_PROFILE's DPI. Scale text inside the title block
+        is already covered by the title block crop.
+        """
+        import pypdfium2 as pdfium
+
+        crops = []
+        with PDFIUM_LOCK:
+            document = pdfium.PdfDocument(pdfium_input(data))
+            try:
+                if page_index >= len(document):
+                    return []
+                page = document[page_index]
+                # pdfium reports the displayed size; text boxes are in unrotated page space
+                shown = page.get_size()
+                rotation = page.get_rotation()
+                cropbox = page.get_cropbox()
+                width, height = (shown[1], shown[0]) if rotation in (90, 270) else shown
+
+                title_block = RegionService.title_block_box(*shown)
+                textpage = page.get_textpage()
+                text_boxes = [
+                    _rotate_box(box, rotation, width, height)
+                    for box in RegionService.scale_text_boxes(textpage, pdfium.raw, cropbox[:2])
+                ]
+                textpage.close()
+
+                boxes = [title_block] + [
+                    box for box in _merge_boxes(text_boxes) if not _contains(title_block, box)
+                ]
+                for index, box in enumerate(boxes[:MAX_REGIONS]):
+                    left, bottom = max(0.0, box[0]), max(0.0, box[1])
+                    right, top = min(shown[0], box[2]), min(shown[1], box[3])
+                    if right - left < 1 or top - bottom < 1:
+                        continue
+
+                    scale = fit_scale(
+                        right - left, top - bottom, REGION_PROFILE.dpi / 72, REGION_PROFILE.max_pixels
+                    )
+                    image = page.render(
+                        scale=scale,
+                        crop=(left, bottom, shown[0] - right, shown[1] - top),
+                        grayscale=True,
+                    ).to_pil()
+                    crops.append((
+                        "title_block" if index == 0 else "scale_text",
+                        image,
+                    ))
+                page.close()
+            finally:
+                document.close()
+
+        return [
+            RegionCrop(
+                name=name,
+                page_number=page_index + 1,
+                image_data=RasterService.encode(image, REGION_PROFILE),
+                width_px=image.width,
+                height_px=image.height,
+            )
+            for name, image in crops
+        ]
+
+    @staticmethod
+    def crop_image(data: FileData) -> list[RegionCrop]:
+        """Crop the title block of a scanned image (no text layer to search)."""
+        from PIL import Image
+
+        image = Image.open(io.BytesIO(data))
+        width, height = image.size
+        left, bottom, right, top = RegionService.title_block_box(width, height)
+        # Image rows run top-down
+        region = image.crop((round(left), round(height - top), round(right), round(height - bottom)))
+
+        scale = fit_scale(region.width, region.height, 1.0, REGION_PROFILE.max_pixels)
+        if scale < 1.0:
+            region = region.resize(
+                (max(1, round(region.width * scale)), max(1, round(region.height * scale))),
+                Image.Resampling.LANCZOS,
+            )
+        return [RegionCrop(
+            name="title_block",
+            page_number=1,
+            image_data=RasterService.encode(region, REGION_PROFILE),
+            width_px=region.width,
+            height_px=region.height,
+        )]
+
+    @staticmethod
+    def scale_regions(data: FileData) -> list[RegionCrop]:
+        """Crop the regions most likely to hold the scale on the first sheet.
+
+        Returns an empty list when pdfium or PIL can't read the file.
+        """
+        import pypdfium2 as pdfium
+        from PIL import Image
+
+        try:
+            if FileService.get_mime_type(data) == "application/pdf":
+                return RegionService.crop_pdf(data)
+            return RegionService.crop_image(data)
+        # PIL raises OSError (UnidentifiedImageError among them) for files it can't decode
+        except (pdfium.PdfiumError, OSError, Image.DecompressionBombError) as e:
+            logger.warning(f"Could not crop scale regions: {e!r}")
+            return []
@@ -0,0 +1,235 @@
+import asyncio
+import logging
+import os
+import time
+import uuid
+from collections import deque
+from typing import AsyncIterator, TypedDict
+
+from .stream_service import StreamService
+
+logger = logging.getLogger(__name__)
+
+# Finished streams stay resumable for this long
+REPLAY_TTL_SECONDS = float(os.getenv("SSE_REPLAY_TTL_SECONDS", 300))
+
+# A running analysis nobody is listening to is cancelled after this long
+REPLAY_IDLE_SECONDS = float(os.getenv("SSE_REPLAY_IDLE_SECONDS", 120))
+
+# Replay buffer caps: per stream (oldest events dropped) and across all streams
+REPLAY_MAX_STREAM_BYTES = int(float(os.getenv("SSE_REPLAY_MAX_STREAM_MB", 4)) * 1024 * 1024)
+REPLAY_MAX_TOTAL_BYTES = int(float(os.getenv("SSE_REPLAY_MAX_TOTAL_MB", 64)) * 1024 * 1024)
+
+
+class ReplayStats(TypedDict):
+    """Type definition for replay buffer statistics."""
+    streams: int
+    running: int
+    bytes: int
+    max_bytes: int
+    resumed: int
+    joined: int
+    expired_resumes: int
+    idle_cancelled: int
+
+
+class StreamSession:
+    """One analysis stream and the buffer of events it has produced."""
+
+    def __init__(self, key: str):
+        self.id = uuid.uuid4().hex
+        self.key = key
+        self.events: deque[tuple[int, str]] = deque()
+        self.bytes = 0
+        self.last_seq = 0
+        self.done = False
+        self.subscribers = 0
+        self.detached_at = time.monotonic()
+        self.finished_at: float | None = None
+        self.task: asyncio.Task | None = None
+        self._changed = asyncio.Condition()
+
+    async def publish(self, event: str) -> None:
+        """Tag an event with the next id, buffer it and wake subscribers."""
+        self.last_seq += 1
+        event = f"id: {self.id}:{self.last_seq}\n{event}"
+        self.events.append((self.last_seq, event))
+        self.bytes += len(event)
+        while self.bytes > REPLAY_MAX_STREAM_BYTES and len(self.events) > 1:
+            _, dropped = self.events.popleft()
+            self.bytes -= len(dropped)
+        async with self._changed:
+            self._changed.notify_all()
+
+    async def finish(self) -> None:
+        """Mark the stream as complete."""
+        self.done = True
+        self.finished_at = time.monotonic()
+        async with self._changed:
+            self._changed.notify_all()
+
+    def since(self, seq: int) -> list[tuple[int, str]] | None:
+        """Buffered events after seq, or None if some were already dropped."""
+        if self.events and self.events[0][0] > seq + 1:
+            return None
+        if not self.events and seq < self.last_seq:
+            return None
+        return [(s, event) for s, event in self.events if s > seq]
+
+    async def wait(self, seq: int) -> None:
+        """Wait until there are events after seq or the stream is done."""
+        async with self._changed:
+            await self._changed.wait_for(lambda: self.last_seq > seq or self.done)
+
+
+class ReplayService:
+    """Registry of resumable SSE streams.
+
+    Each stream's producer runs in its own task, detached from the HTTP
+    connection, and every event is tagged "id: <stream>:<seq>". A client
+    that reconnects with Last-Event-ID attaches to the same stream and is
+    sent only the events after that id, so a dropped connection doesn't
+    restart the analysis. Identical concurrent requests share one stream.
+    Buffers are bounded per stream and in total; finished streams expire
+    after REPLAY_TTL_SECONDS.
+    """
+
+    _sessions: dict[str, StreamSession] = {}
+    _sweeper: asyncio.Task | None = None
+    _stats = {"resumed": 0, "joined": 0, "expired_resumes": 0, "idle_cancelled": 0}
+
+    @staticmethod
+    def start(key: str, producer: AsyncIterator[str]) -> StreamSession:
+        """Run a producer of formatted SSE events as a new resumable stream.
+
+        Args:
+            key: Fingerprint of the request; a resume must present the same one
+            producer: Formatted SSE events
+        """
+        session = StreamSession(key)
+
+        async def pump() -> None:
+            try:
+                async for event in producer:
+                    await session.publish(event)
+            except Exception as e:
+                logger.exception("Stream producer failed")
+                await session.publish(StreamService.error_event(str(e)))
+            finally:
+                await session.finish()
+
+        session.task = asyncio.create_task(pump())
+        ReplayService._sessions[session.id] = session
+        ReplayService._evict()
+
+        if ReplayService._sweeper is None or ReplayService._sweeper.done():
+            ReplayService._sweeper = asyncio.create_task(ReplayService._sweep())
+        return session
+
+    @staticmethod
+    def resume(last_event_id: str | None, key: str) -> tuple[StreamSession, int] | None:
+        """Find the stream and position a Last-Event-ID header points to.
+
+        Returns None when the id is missing, malformed, expired or belongs
+        to a different request.
+        """
+        if not last_event_id:
+            return None
+        session_id, _, seq = last_event_id.strip().partition(":")
+        session = ReplayService._sessions.get(session_id)
+        if session is None or session.key != key or not seq.isdigit():
+            ReplayService._stats["expired_resumes"] += 1
+            return None
+        ReplayService._stats["resumed"] += 1
+        return session, int(seq)
+
+    @staticmethod
+    def join(key: str) -> StreamSession | None:
+        """Find a running stream for the same request that still holds all its events."""
+        for session in ReplayService._sessions.values():
+            if session.key == key and not session.done and (
+                not session.events or session.events[0][0] == 1
+            ):
+                ReplayService._stats["joined"] += 1
+                return session
+        return None
+
+    @staticmethod
+    async def subscribe(session: StreamSession, after: int = 0) -> AsyncIterator[str]:
+        """Yield a stream's events after a sequence number, then follow it live."""
+        session.subscribers += 1
+        try:
+            seq = after
+            while True:
+                events = session.since(seq)
+                if events is None:
+                    yield StreamService.error_event(
+                        "Missed events are no longer available; restart the analysis",
+                        code="RESUME_EXPIRED",
+                    )
+                    return
+                for seq, event in events:
+                    yield event
+                if session.done and seq >= session.last_seq:
+                    return
+                await session.wait(seq)
+        finally:
+            session.subscribers -= 1
+            session.detached_at = time.monotonic()
+
+    @staticmethod
+    def stats() -> ReplayStats:
+        """Get buffer sizes and resume counters."""
+        sessions = list(ReplayService._sessions.values())
+        return {
+            "streams": len(sessions),
+            "running": sum(1 for s in sessions if not s.done),
+            "bytes": sum(s.bytes for s in sessions),
+            "max_bytes": REPLAY_MAX_TOTAL_BYTES,
+            **ReplayService._stats,
+        }
+
+    @staticmethod
+    async def shutdown() -> None:
+        """Cancel running streams and drop all buffers."""
+        for session in list(ReplayService._sessions.values()):
+            ReplayService._drop(session)
+        if ReplayService._sweeper and not ReplayService._sweeper.done():
+            ReplayService._sweeper.cancel()
+        ReplayService._sweeper = None
+
+    @staticmethod
+    def _drop(session: StreamSession) -> None:
+        ReplayService._sessions.pop(session.id, None)
+        if session.task and not session.task.done():
+            session.task.cancel()
+
+    @staticmethod
+    def _evict() -> None:
+        """Drop finished streams, oldest first, until the total fits the cap."""
+        total = sum(s.bytes for s in ReplayService._sessions.values())
+        finished = sorted(
+            (s for s in ReplayService._sessions.values() if s.done and not s.subscribers),
+            key=lambda s: s.finished_at or 0,
+        )
+        for session in finished:
+            if total <= REPLAY_MAX_TOTAL_BYTES:
+                break
+            total -= session.bytes
+            ReplayService._drop(session)
+
+    @staticmethod
+    async def _sweep() -> None:
+        """Expire finished streams and cancel abandoned analyses."""
+        while ReplayService._sessions:
+            await asyncio.sleep(min(REPLAY_TTL_SECONDS, REPLAY_IDLE_SECONDS, 10))
+            now = time.monotonic()
+            for session in list(ReplayService._sessions.values()):
+                if session.done:
+                    if session.finished_at and now - session.finished_at > REPLAY_TTL_SECONDS:
+                        ReplayService._drop(session)
+                elif not session.subscribers and now - session.detached_at > REPLAY_IDLE_SECONDS:
+                    logger.info(f"Cancelling stream {session.id}: no client for {REPLAY_IDLE_SECONDS:g}s")
+                    ReplayService._stats["idle_cancelled"] += 1
+                    ReplayService._drop(session)
+            ReplayService._evict()
@@ -0,0 +1,232 @@
+import io
+import logging
+import mmap
+import re
+from collections import Counter
+from dataclasses import dataclass
+from fractions import Fraction
+
+from python_api.models import ScaleInfo
+from .pdf_service import FileData
+
+logger = logging.getLogger(__name__)
+
+# PDF user space is 72 units per inch; pixels_per_foot is reported at this density
+REFERENCE_DPI = 72.0
+
+# Only scan the first pages of very large sets; title blocks repeat on every sheet
+MAX_PAGES = 50
+
+# Ratios used on metric drawings (1:N)
+METRIC_DENOMINATORS = {
+    1, 2, 5, 10, 20, 25, 50, 75, 100, 125, 200, 250, 500, 1000, 1250, 2000, 2500, 5000,
+}
+
+_INCH_MARK = r"(?:\"|''|”|″|in\b\.?|inch(?:es)?\b)"
+_FOOT_MARK = r"(?:'|’|′|ft\b\.?|feet\b|foot\b)"
+_NUMBER = r"(?:\d+\s+\d+/\d+|\d+/\d+|\d*\.\d+|\d+)"
+
+IMPERIAL_PATTERN = re.compile(
+    rf"(?P<paper>{_NUMBER})\s*{_INCH_MARK}\s*=\s*"
+    rf"(?P<feet>\d+(?:\.\d+)?)\s*{_FOOT_MARK}"
+    rf"(?:\s*-?\s*(?P<inches>{_NUMBER})\s*{_INCH_MARK})?",
+    re.IGNORECASE,
+)
+
+METRIC_PATTERN = re.compile(r"(?<![\d:./])1\s*:\s*(?P<denominator>\d{1,5})(?![\d:])")
+
+LABEL_PATTERN = re.compile(r"scale\s*[:=]?\s*$", re.IGNORECASE)
+
+# Feet just before the paper side mean it's the inches of a dimension (12'-6" = ...)
+DIMENSION_PREFIX = re.compile(rf"\d\s*{_FOOT_MARK}\s*-?\s*$", re.IGNORECASE)
+
+
+@dataclass(frozen=True)
+class ScaleMatch:
+    """A scale notation found in drawing text."""
+    scale_string: str
+    notation: str  # 'architectural', 'engineering' or 'metric'
+    paper_inches: float
+    real_feet: float
+    labelled: bool
+
+    @property
+    def pixels_per_foot(self) -> float:
+        """Pixels per real-world foot at the reference DPI."""
+        return round(REFERENCE_DPI * self.paper_inches / self.real_feet, 4)
+
+    @property
+    def confidence(self) -> float:
+        """Base confidence for this match."""
+        if self.notation == "metric":
+            return 0.9 if self.labelled else 0.6
+        return 0.95 if self.labelled else 0.85
+
+
+@dataclass
+class TextLayerScale:
+    """Scale determined from the PDF text layer."""
+    scale_info: ScaleInfo
+    reasoning: str
+
+
+def _parse_number(value: str) -> Fraction:
+    parts = value.split()
+    return sum((Fraction(part) for part in parts), Fraction(0))
+
+
+def _format_inches(value: Fraction) -> str:
+    whole, remainder = divmod(value, 1)
+    if remainder == 0:
+        return str(int(whole))
+    if whole == 0:
+        return f"{remainder.numerator}/{remainder.denominator}"
+    return f"{int(whole)} {remainder.numerator}/{remainder.denominator}"
+
+
+def _is_labelled(text: str, start: int) -> bool:
+    return bool(LABEL_PATTERN.search(text[max(0, start - 20):start]))
+
+
+class ScaleParser:
+    """Deterministic parser for scale notations in PDF text layers."""
+
+    @staticmethod
+    def parse_text(text: str) -> list[ScaleMatch]:
+        """Find every recognizable scale notation in a block of text.
+
+        Args:
+            text: Text extracted from a drawing (or a bare scale string)
+
+        Returns:
+            Matches in the order they appear
+        """
+        matches: list[tuple[int, ScaleMatch]] = []
+
+        for match in IMPERIAL_PATTERN.finditer(text):
+            if DIMENSION_PREFIX.search(text[max(0, match.start() - 12):match.start()]):
+                continue
+            try:
+                paper = _parse_number(match.group("paper"))
+                feet = Fraction(match.group("feet"))
+                inches = _parse_number(match.group("inches")) if match.group("inches") else Fraction(0)
+            except (ValueError, ZeroDivisionError):
+                continue
+
+            real_feet = feet + inches / 12
+            if paper <= 0 or real_feet <= 0:
+                continue
+
+            if real_feet == 1:
+                notation = "architectural"
+                scale_string = f"{_format_inches(paper)}\" = 1'-0\""
+            else:
+                notation = "engineering"
+                scale_string = f"{_format_inches(paper)}\" = {_format_inches(real_feet)}'"
+
+            matches.append((match.start(), ScaleMatch(
+                scale_string=scale_string,
+                notation=notation,
+                paper_inches=float(paper),
+                real_feet=float(real_feet),
+                labelled=_is_labelled(text, match.start()),
+            )))
+
+        for match in METRIC_PATTERN.finditer(text):
+            denominator = int(match.group("denominator"))
+            labelled = _is_labelled(text, match.start())
+            if denominator not in METRIC_DENOMINATORS or (denominator == 1 and not labelled):
+                continue
+
+            # 1 unit on paper = N units real; one real foot is 12/N paper inches
+            matches.append((match.start(), ScaleMatch(
+                scale_string=f"1:{denominator}",
+                notation="metric",
+                paper_inches=12 / denominator,
+                real_feet=1.0,
+                labelled=labelled,
+            )))
+
+        matches.sort(key=lambda pair: pair[0])
+        return [scale for _, scale in matches]
+
+    @staticmethod
+    def extract_page_texts(data: FileData, max_pages: int = MAX_PAGES) -> list[str]:
+        """Extract the text layer of each PDF page.
+
+        Returns an empty list when the file has no readable text layer.
+        """
+        from pypdf import PdfReader
+        from pypdf.errors import PdfReadError
+
+        try:
+            # A memory map is already a seekable stream; avoid copying it
+            reader = PdfReader(data if isinstance(data, mmap.mmap) else io.BytesIO(data))
+            texts = []
+            for page in reader.pages[:max_pages]:
+                texts.append(page.extract_text() or "")
+            return texts
+        except (PdfReadError, ValueError, KeyError) as e:
+            logger.info(f"Could not read PDF text layer: {e}")
+            return []
+
+    @staticmethod
+    def pick_page_scale(matches: list[ScaleMatch]) -> ScaleMatch | None:
+        """Pick the governing scale of a sheet from its matches.
+
+        Labelled notations win over bare ones; among those the most frequent
+        notation wins. Returns None if the top candidates are tied.
+        """
+        if not matches:
+            return None
+
+        labelled = [m for m in matches if m.labelled]
+        candidates = labelled or matches
+        ranked = Counter(m.scale_string for m in candidates).most_common()
+        if len(ranked) > 1 and ranked[0][1] == ranked[1][1]:
+            return None
+
+        top = ranked[0][0]
+        return next(m for m in candidates if m.scale_string == top)
+
+    @staticmethod
+    def detect_from_pdf(data: FileData) -> TextLayerScale | None:
+        """Detect the scale of a vector PDF from its text layer.
+
+        Returns None when no notation parses or when sheets disagree, in which
+        case the caller should fall back to the LLM.
+        """
+        if data[:4] != b"%PDF":
+            return None
+
+        page_scales: dict[int, ScaleMatch] = {}
+        for page_number, text in enumerate(ScaleParser.extract_page_texts(data), start=1):
+            scale = ScaleParser.pick_page_scale(ScaleParser.parse_text(text))
+            if scale:
+                page_scales[page_number] = scale
+
+        if not page_scales:
+            return None
+
+        distinct = {scale.scale_string for scale in page_scales.values()}
+        if len(distinct) > 1:
+            logger.info(f"Sheets disagree on scale: {sorted(distinct)}")
+            return None
+
+        scale = next(iter(page_scales.values()))
+        pages = sorted(page_scales)
+        confidence = min(0.99, scale.confidence + 0.02 * (len(pages) - 1))
+        page_list = ", ".join(str(p) for p in pages)
+
+        return TextLayerScale(
+            scale_info=ScaleInfo(
+                scale_string=scale.scale_string,
+                pixels_per_foot=scale.pixels_per_foot,
+                confidence=round(confidence, 2),
+                source="auto",
+            ),
+            reasoning=(
+                f"Found {scale.notation} scale notation '{scale.scale_string}' "
+                f"in the PDF text layer on page(s) {page_list}."
+            ),
+        )
@@ -0,0 +1,76 @@
+import asyncio
+import logging
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Generic, TypedDict, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class SingleFlightStats(TypedDict):
+    """Type definition for single-flight statistics."""
+    in_flight: int
+    started: int
+    joined: int
+    cancelled: int
+
+
+@dataclass
+class _Call(Generic[T]):
+    task: asyncio.Task[T]
+    waiters: int = 0
+
+
+@dataclass
+class SingleFlight(Generic[T]):
+    """Share one in-flight call between concurrent callers with the same key.
+
+    The first caller for a key starts the work in its own task; callers
+    that arrive while it runs await the same task and get the same result
+    or exception. Waiters are counted: a caller going away doesn't cancel
+    the work for the others, and the work is cancelled only when the last
+    waiter is gone.
+    """
+
+    name: str
+    _calls: dict[str, _Call[T]] = field(default_factory=dict)
+    _stats: dict[str, int] = field(
+        default_factory=lambda: {"started": 0, "joined": 0, "cancelled": 0}
+    )
+
+    async def run(self, key: str, fn: Callable[[], Awaitable[T]]) -> T:
+        """Run fn, or join the call already in flight for key.
+
+        Args:
+            key: Identifies calls that would produce the same result
+            fn: Starts the work; only called when nothing is in flight
+        """
+        call = self._calls.get(key)
+        if call is None:
+            call = _Call(asyncio.ensure_future(fn()))
+            self._calls[key] = call
+            call.task.add_done_callback(lambda _: self._forget(key, call))
+            self._stats["started"] += 1
+        else:
+            logger.info(f"Joining in-flight {self.name} call")
+            self._stats["joined"] += 1
+
+        call.waiters += 1
+        try:
+            # Shielded so one waiter's cancellation doesn't reach the shared task
+            return await asyncio.shield(call.task)
+        finally:
+            call.waiters -= 1
+            if call.waiters == 0 and not call.task.done():
+                self._stats["cancelled"] += 1
+                call.task.cancel()
+                self._forget(key, call)
+
+    def stats(self) -> SingleFlightStats:
+        """Get the number of calls in flight and how often callers joined one."""
+        return {"in_flight": len(self._calls), **self._stats}
+
+    def _forget(self, key: str, call: _Call[T]) -> None:
+        if self._calls.get(key) is call:
+            del self._calls[key]
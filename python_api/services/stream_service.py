@@ -1,26 +1,130 @@
+import asyncio
 import json
-from typing import AsyncGenerator, Any
+import os
+import time
+from typing import AsyncGenerator, AsyncIterator, Any, Callable
+
+from pydantic import BaseModel
+
+from .metrics import timed
+
+try:
+    import orjson
+except ImportError:  # optional; stdlib json is used without it
+    orjson = None
+
+JsonEncoder = Callable[[Any], str]
+
+
+def _orjson_dumps(data: Any) -> str:
+    return orjson.dumps(data).decode()
+
+
+ENCODERS: dict[str, JsonEncoder] = {"json": json.dumps}
+if orjson is not None:
+    ENCODERS["orjson"] = _orjson_dumps
+
+# Encoder for non-model payloads: 'orjson' (default when installed) or 'json'
+SSE_JSON_ENCODER = os.getenv("SSE_JSON_ENCODER", "orjson" if orjson is not None else "json")
+
+# Events produced within this window (or up to this many bytes) go out in one write
+SSE_COALESCE_WINDOW = float(os.getenv("SSE_COALESCE_WINDOW_MS", 20)) / 1000
+SSE_COALESCE_MAX_BYTES = int(os.getenv("SSE_COALESCE_MAX_BYTES", 64 * 1024))
 
 
 class StreamService:
     """Service for Server-Sent Events (SSE) streaming."""
 
+    # Pluggable JSON encoder for dict/list payloads; pydantic models always
+    # serialize themselves with model_dump_json
+    encoder: JsonEncoder = ENCODERS.get(SSE_JSON_ENCODER, json.dumps)
+
     @staticmethod
     def format_sse(event: str, data: Any) -> str:
         """Format data as an SSE message.
 
         Args:
             event: Event type name
-            data: Data to send (will be JSON encoded if not a string)
+            data: Data to send (pydantic models are serialized directly,
+                other non-strings are JSON encoded)
 
         Returns:
             Formatted SSE string
         """
-        if not isinstance(data, str):
-            data = json.dumps(data)
+        with timed("serialize"):
+            if isinstance(data, BaseModel):
+                data = data.model_dump_json()
+            elif not isinstance(data, str):
+                data = StreamService.encoder(data)
 
         return f"event: {event}\ndata: {data}\n\n"
 
+    @staticmethod
+    async def coalesce(
+        events: AsyncIterator[str],
+        window: float = SSE_COALESCE_WINDOW,
+        max_bytes: int = SSE_COALESCE_MAX_BYTES,
+    ) -> AsyncGenerator[bytes, None]:
+        """Batch formatted SSE events into fewer, larger writes.
+
+        The first event of a batch starts a window; everything produced
+        before it closes (or until max_bytes is reached) is sent in one
+        write. Yields bytes, which EventSourceResponse sends as-is instead
+        of wrapping them in another data field.
+
+        Args:
+            events: Formatted SSE messages
+            window: Seconds to hold a batch open (0 only batches events
+                that are already waiting)
+            max_bytes: Flush early once a batch reaches this size
+        """
+        # A pump task reads the source so waiting on the window never
+        # cancels the generator mid-event
+        queue: asyncio.Queue[str | None] = asyncio.Queue()
+
+        async def pump() -> None:
+            try:
+                async for event in events:
+                    queue.put_nowait(event)
+            finally:
+                queue.put_nowait(None)
+
+        task = asyncio.create_task(pump())
+        try:
+            done = False
+            while not done:
+                event = await queue.get()
+                if event is None:
+                    break
+
+                batch = [event.encode()]
+                size = len(batch[0])
+                deadline = time.monotonic() + window
+                while size < max_bytes:
+                    if queue.empty():
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            break
+                        try:
+                            event = await asyncio.wait_for(queue.get(), remaining)
+                        except asyncio.TimeoutError:
+                            break
+                    else:
+                        event = queue.get_nowait()
+                    if event is None:
+                        done = True
+                        break
+                    batch.append(event.encode())
+                    size += len(batch[-1])
+
+                yield b"".join(batch)
+
+            # Surface errors from the source
+            await task
+        finally:
+            if not task.done():
+                task.cancel()
+
     @staticmethod
     async def stream_items(
         items: list[Any],
@@ -36,8 +140,8 @@ class StreamService:
             SSE formatted strings
         """
         for item in items:
-            if hasattr(item, "model_dump"):
-                data = item.model_dump()
+            if isinstance(item, BaseModel):
+                data = item
             elif hasattr(item, "__dict__"):
                 data = item.__dict__
             else:
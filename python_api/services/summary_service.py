@@ -0,0 +1,191 @@
+import logging
+import re
+
+from python_api.models import MeasurementCategory, TakeoffItem, TakeoffOutput, TakeoffResult, VectorLabel
+from .geometry_service import GeometryService
+
+logger = logging.getLogger(__name__)
+
+# Every category is reported in one unit so its items can be totalled
+STANDARD_UNITS = {
+    MeasurementCategory.COUNT: "ea",
+    MeasurementCategory.LINEAR: "LF",
+    MeasurementCategory.AREA: "SF",
+    MeasurementCategory.VOLUME: "CY",
+}
+
+# Unit spellings (lowercased, without spaces or periods) and their size in the standard unit
+UNIT_FACTORS: dict[MeasurementCategory, dict[str, float]] = {
+    MeasurementCategory.COUNT: {
+        unit: 1.0
+        for unit in ("ea", "each", "pc", "pcs", "piece", "pieces", "no", "nr", "qty", "unit", "units", "count")
+    },
+    MeasurementCategory.LINEAR: {
+        "lf": 1.0, "ft": 1.0, "feet": 1.0, "foot": 1.0, "'": 1.0, "linft": 1.0, "linearfeet": 1.0,
+        "in": 1 / 12, "inch": 1 / 12, "inches": 1 / 12, '"': 1 / 12,
+        "yd": 3.0, "yds": 3.0, "yard": 3.0, "yards": 3.0,
+        "m": 3.28084, "lm": 3.28084, "meter": 3.28084, "meters": 3.28084, "metre": 3.28084, "metres": 3.28084,
+        "cm": 0.0328084, "mm": 0.00328084,
+    },
+    MeasurementCategory.AREA: {
+        "sf": 1.0, "sqft": 1.0, "ft2": 1.0, "squarefeet": 1.0, "squarefoot": 1.0,
+        "sy": 9.0, "sqyd": 9.0, "yd2": 9.0, "squareyards": 9.0,
+        "sqin": 1 / 144, "in2": 1 / 144,
+        "m2": 10.7639, "sqm": 10.7639, "squaremeters": 10.7639, "squaremetres": 10.7639,
+        # Roofing square
+        "sq": 100.0,
+    },
+    MeasurementCategory.VOLUME: {
+        "cy": 1.0, "cuyd": 1.0, "yd3": 1.0, "cubicyards": 1.0,
+        "cf": 1 / 27, "cuft": 1 / 27, "ft3": 1 / 27, "cubicfeet": 1 / 27,
+        "cuin": 1 / 46656, "in3": 1 / 46656,
+        "m3": 1.30795, "cum": 1.30795, "cubicmeters": 1.30795, "cubicmetres": 1.30795,
+    },
+}
+
+_UNIT_NOISE = re.compile(r"[\s._\-^]")
+
+
+def _unit_key(unit: str) -> str:
+    return _UNIT_NOISE.sub("", unit.lower()).replace("²", "2").replace("³", "3")
+
+
+class SummaryService:
+    """Service for settling units and totals of a takeoff on the server.
+
+    The model only lists items; units are normalized, duplicates merged
+    and totals computed here, so none of that costs output tokens or
+    depends on the model's arithmetic.
+    """
+
+    @staticmethod
+    def normalize_item(item: TakeoffItem) -> TakeoffItem:
+        """Convert an item to its category's standard unit.
+
+        Units that aren't recognized are kept as they are.
+        """
+        standard = STANDARD_UNITS[item.category]
+        factor = UNIT_FACTORS[item.category].get(_unit_key(item.unit))
+        if factor is None or item.unit == standard:
+            return item
+        if factor == 1.0:
+            return item.model_copy(update={"unit": standard})
+
+        converted = f"Converted from {item.quantity:g} {item.unit}"
+        return item.model_copy(update={
+            "quantity": round(item.quantity * factor, 2),
+            "unit": standard,
+            "notes": f"{item.notes}; {converted}" if item.notes else converted,
+        })
+
+    @staticmethod
+    def merge_items(items: list[TakeoffItem]) -> list[TakeoffItem]:
+        """Merge items with the same name, category, location and unit.
+
+        Quantities are summed, the lowest confidence is kept and distinct
+        notes are joined. Items keep the order they were first seen in.
+        """
+        merged: dict[tuple, TakeoffItem] = {}
+        for item in items:
+            key = (
+                item.name.strip().casefold(),
+                item.category,
+                (item.location or "").strip().casefold(),
+                item.unit,
+            )
+            first = merged.get(key)
+            if first is None:
+                merged[key] = item
+                continue
+
+            # Notes already merged are joined with "; "; split them so repeats stay out
+            notes = [note for text in (first.notes, item.notes) if text for note in text.split("; ")]
+            merged[key] = first.model_copy(update={
+                "quantity": round(first.quantity + item.quantity, 2),
+                "confidence": min(first.confidence, item.confidence),
+                "notes": "; ".join(dict.fromkeys(notes)) or None,
+            })
+        return list(merged.values())
+
+    @staticmethod
+    def label_vector_items(items: list[TakeoffItem], labels: list[VectorLabel]) -> list[TakeoffItem]:
+        """Name measured vector items with the model's labels.
+
+        Quantities always come from the measurement. Only groups the model
+        named are kept: those labeled skip (annotation, dimensioning,
+        hatching) and those it didn't label (borders, title blocks, symbols
+        it couldn't place) are dropped.
+
+        Args:
+            items: Items from GeometryService.measure, in its order
+            labels: The model's labels, by group id
+        """
+        by_id = {label.group_id: label for label in labels}
+        unknown = by_id.keys() - {GeometryService.group_id(index) for index in range(len(items))}
+        if unknown:
+            logger.warning(f"Ignoring labels for unknown vector groups: {', '.join(sorted(unknown))}")
+
+        labeled = []
+        for index, item in enumerate(items):
+            label = by_id.get(GeometryService.group_id(index))
+            if label is not None and not label.skip:
+                labeled.append(item.model_copy(update={"name": label.name.strip() or item.name}))
+        unlabeled = len(items) - len(by_id.keys() - unknown)
+        if unlabeled:
+            logger.info(f"Dropping {unlabeled} vector groups the model didn't label")
+        return labeled
+
+    @staticmethod
+    def summarize(items: list[TakeoffItem]) -> tuple[dict[str, float], dict[str, float]]:
+        """Totals by category and unit, and by item name and unit.
+
+        Returns:
+            (summary, type_totals), e.g. {"linear_lf": 850.0} and
+            {"Interior Wall (LF)": 850.0}
+        """
+        summary: dict[str, float] = {}
+        type_totals: dict[str, float] = {}
+        # Names that differ only in case or spacing are one type, shown as first written
+        type_names: dict[tuple[str, str], str] = {}
+        for item in items:
+            key = f"{item.category.value}_{_unit_key(item.unit)}"
+            summary[key] = summary.get(key, 0.0) + item.quantity
+
+            name = type_names.setdefault(
+                (item.name.strip().casefold(), item.unit), f"{item.name.strip()} ({item.unit})"
+            )
+            type_totals[name] = type_totals.get(name, 0.0) + item.quantity
+
+        return (
+            {key: round(value, 2) for key, value in summary.items()},
+            {key: round(value, 2) for key, value in type_totals.items()},
+        )
+
+    @staticmethod
+    def finalize(
+        output: TakeoffOutput,
+        scale_used: str | None = None,
+        page_count: int = 1,
+        vector_items: list[TakeoffItem] | None = None,
+    ) -> TakeoffResult:
+        """Build the takeoff result from what the model wrote and what was measured.
+
+        Args:
+            output: The model's items, vector labels and notes
+            scale_used: Scale the run measured with
+            page_count: Number of pages the items come from
+            vector_items: Items measured from the vector linework, named
+                with output.vector_labels
+        """
+        items = [SummaryService.normalize_item(item) for item in output.items]
+        items += SummaryService.label_vector_items(vector_items or [], output.vector_labels)
+        items = SummaryService.merge_items(items)
+        summary, type_totals = SummaryService.summarize(items)
+        return TakeoffResult(
+            items=items,
+            summary=summary,
+            type_totals=type_totals,
+            notes=output.notes,
+            scale_used=scale_used,
+            page_count=page_count,
+        )
@@ -0,0 +1,349 @@
+import asyncio
+import logging
+import os
+from collections import Counter
+from typing import AsyncIterator
+
+from python_api.agents import (
+    get_takeoff_agent,
+    tool_call_counts,
+    TakeoffDeps,
+    ScaleDetectionResult,
+)
+from python_api.models import BlueprintPage, TakeoffItem, TakeoffResult
+from .document_service import PreparedDocument
+from .metrics import record_tool_calls, timed
+from .pdf_service import FileData, FileService
+from .raster_service import RasterService
+from .summary_service import SummaryService
+
+logger = logging.getLogger(__name__)
+
+# Maximum number of pages analyzed at the same time
+PAGE_CONCURRENCY = int(os.getenv("TAKEOFF_PAGE_CONCURRENCY", 4))
+
+# Seconds to group streamed tokens before re-validating the partial output
+STREAM_DEBOUNCE = float(os.getenv("TAKEOFF_STREAM_DEBOUNCE", 0.05))
+
+TAKEOFF_PROMPT = "Analyze this blueprint and perform a complete quantity takeoff."
+
+
+class TakeoffService:
+    """Service for running takeoff analyses, fanning multi-page PDFs out per page."""
+
+    @staticmethod
+    async def split_pages(file_data: FileData) -> list[BlueprintPage]:
+        """Split a multi-page PDF into pages.
+
+        Returns an empty list when the file should be analyzed as a whole
+        (images, single-page PDFs and unreadable files).
+        """
+        pages = await asyncio.to_thread(FileService.split_pdf_pages, file_data)
+        return pages if len(pages) > 1 else []
+
+    @staticmethod
+    async def prepare_pages(
+        file_data: FileData | PreparedDocument,
+        render_profile: str | None = None,
+    ) -> list[BlueprintPage]:
+        """Split and, with a render profile, rasterize a file for the model.
+
+        Without a profile this is split_pages. With one, PDF pages are
+        rendered to images (keeping a page's PDF when it's the smaller
+        payload) and scanned images are downsampled, so a single-page
+        file comes back as one page.
+
+        Args:
+            file_data: Blueprint file, or the document prepared from it
+            render_profile: Profile name (None uses DEFAULT_RENDER_PROFILE)
+        """
+        profile = RasterService.get_profile(render_profile)
+        document = PreparedDocument.of(file_data)
+        file_data = document.data
+        with timed("sniff"):
+            if profile is None:
+                return await TakeoffService.split_pages(file_data)
+
+            if document.mime_type != "application/pdf":
+                page = await asyncio.to_thread(RasterService.downsample_image, file_data, profile)
+                return [page]
+
+            def render() -> list[BlueprintPage]:
+                pages = FileService.split_pdf_pages(file_data)
+                return RasterService.render_pdf_pages(file_data, profile, pages)
+
+            return await asyncio.to_thread(render)
+
+    @staticmethod
+    def build_messages(
+        document: PreparedDocument,
+        page_number: int | None = None,
+        page_count: int | None = None,
+    ) -> list:
+        """Build the agent prompt for a whole file or a single page."""
+        prompt = TAKEOFF_PROMPT
+        if page_number is not None:
+            prompt = (
+                f"Analyze this blueprint sheet (page {page_number} of {page_count}) "
+                "and perform a complete quantity takeoff."
+            )
+        # Gemini handles PDF/images directly
+        return [prompt, document.content()]
+
+    @staticmethod
+    def build_deps(
+        data: FileData,
+        scale: str | None,
+        focus_areas: list[str] | None,
+        scale_task: "asyncio.Future[ScaleDetectionResult] | None" = None,
+        vector_data: FileData | None = None,
+    ) -> TakeoffDeps:
+        """Create agent dependencies for one run.
+
+        vector_data is the PDF to measure vector paths from, when the model
+        is sent something else (a rendered page); it defaults to data.
+        """
+        return TakeoffDeps(
+            project_id="temp",
+            blueprint_data=data,
+            scale=scale,
+            focus_areas=focus_areas,
+            scale_task=scale_task,
+            vector_data=vector_data if vector_data is not None else data,
+        )
+
+    @staticmethod
+    def file_document(document: PreparedDocument, pages: list[BlueprintPage]) -> PreparedDocument:
+        """The document sent for a whole-file run.
+
+        That's the prepared page of a single-page file, or the original
+        document when nothing was prepared or the page kept no payload of
+        its own (so calls on the original share its upload and encoding).
+        """
+        if not pages:
+            return document
+        data, media_type = RasterService.page_payload(pages[0], document.data)
+        return document if data is document.data else PreparedDocument(data, media_type)
+
+    @staticmethod
+    async def run_file(
+        file_data: FileData | PreparedDocument,
+        scale: str | None,
+        focus_areas: list[str] | None,
+        scale_task: "asyncio.Future[ScaleDetectionResult] | None" = None,
+        mime_type: str | None = None,
+        vector_data: FileData | None = None,
+    ) -> TakeoffResult:
+        """Run the takeoff on a whole file in a single agent call."""
+        document = PreparedDocument.of(file_data, mime_type)
+        await document.upload()
+        deps = TakeoffService.build_deps(document.data, scale, focus_areas, scale_task, vector_data)
+        with timed("model"):
+            result = await get_takeoff_agent().run(
+                TakeoffService.build_messages(document), deps=deps
+            )
+        record_tool_calls(tool_call_counts(result.all_messages()))
+        # Measured only if the model asked for them (and so could label them)
+        vector_items = deps.vector_items or []
+        return SummaryService.finalize(result.output, deps.scale, vector_items=vector_items)
+
+    @staticmethod
+    async def stream_file(
+        file_data: FileData | PreparedDocument,
+        scale: str | None,
+        focus_areas: list[str] | None,
+        scale_task: "asyncio.Future[ScaleDetectionResult] | None" = None,
+        mime_type: str | None = None,
+        vector_data: FileData | None = None,
+    ) -> AsyncIterator[TakeoffItem | TakeoffResult]:
+        """Run the takeoff on a whole file, yielding each item as soon as it's complete.
+
+        The structured output is validated in partial mode as it streams.
+        Every item but the last in a partial output is closed (the model has
+        moved on to the next one), so it is yielded right away; the rest
+        follow from the final output. Items are yielded once each, in order,
+        in standard units, followed by the measured vector items under the
+        model's labels; the full result is yielded last (where duplicate
+        items have been merged).
+        """
+        document = PreparedDocument.of(file_data, mime_type)
+        await document.upload()
+        deps = TakeoffService.build_deps(document.data, scale, focus_areas, scale_task, vector_data)
+        with timed("model"):
+            async with get_takeoff_agent().run_stream(
+                TakeoffService.build_messages(document), deps=deps
+            ) as response:
+                emitted = 0
+                async for partial in response.stream_output(debounce_by=STREAM_DEBOUNCE):
+                    for item in partial.items[emitted:-1]:
+                        yield SummaryService.normalize_item(item)
+                    emitted = max(emitted, len(partial.items) - 1)
+
+                output = await response.get_output()
+                record_tool_calls(tool_call_counts(response.all_messages()))
+
+        for item in output.items[emitted:]:
+            yield SummaryService.normalize_item(item)
+        vector_items = deps.vector_items or []
+        for item in SummaryService.label_vector_items(vector_items, output.vector_labels):
+            yield SummaryService.normalize_item(item)
+        yield SummaryService.finalize(output, deps.scale, vector_items=vector_items)
+
+    @staticmethod
+    def reconcile(streamed: list[TakeoffItem], result: TakeoffResult) -> bool:
+        """Check that the streamed items are exactly the result's items, in any order."""
+        return (
+            Counter(item.model_dump_json() for item in streamed)
+            == Counter(item.model_dump_json() for item in result.items)
+        )
+
+    @staticmethod
+    async def run_page(
+        page: BlueprintPage,
+        page_count: int,
+        scale: str | None,
+        focus_areas: list[str] | None,
+        scale_task: "asyncio.Future[ScaleDetectionResult] | None" = None,
+    ) -> TakeoffResult:
+        """Run the takeoff on a single page."""
+        document = PreparedDocument(*RasterService.page_payload(page, page.pdf_data))
+        # Tool turns send the page again; upload it once instead
+        await document.upload()
+        deps = TakeoffService.build_deps(document.data, scale, focus_areas, scale_task, page.pdf_data)
+        result = await get_takeoff_agent().run(
+            TakeoffService.build_messages(document, page.page_number, page_count), deps=deps
+        )
+        record_tool_calls(tool_call_counts(result.all_messages()))
+        vector_items = deps.vector_items or []
+        return TakeoffService.tag_page(
+            SummaryService.finalize(result.output, deps.scale, vector_items=vector_items), page.page_number
+        )
+
+    @staticmethod
+    async def iter_pages(
+        pages: list[BlueprintPage],
+        scale: str | None,
+        focus_areas: list[str] | None,
+        scale_task: "asyncio.Future[ScaleDetectionResult] | None" = None,
+        concurrency: int = PAGE_CONCURRENCY,
+    ) -> AsyncIterator[tuple[int, TakeoffResult | Exception]]:
+        """Run the takeoff per page and yield each page's result as it finishes.
+
+        At most `concurrency` pages run at once. A failed page yields its
+        exception instead of a result so the remaining pages keep going.
+        """
+        semaphore = asyncio.Semaphore(max(1, concurrency))
+
+        async def run(page: BlueprintPage) -> tuple[int, TakeoffResult | Exception]:
+            async with semaphore:
+                try:
+                    result = await TakeoffService.run_page(
+                        page, len(pages), scale, focus_areas, scale_task
+                    )
+                    return page.page_number, result
+                except Exception as e:
+                    logger.warning(f"Takeoff failed on page {page.page_number}: {e}")
+                    return page.page_number, e
+
+        # Pages overlap, so the model stage is wall time for all of them
+        tasks = [asyncio.create_task(run(page)) for page in pages]
+        try:
+            with timed("model"):
+                for next_done in asyncio.as_completed(tasks):
+                    yield await next_done
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    @staticmethod
+    async def run(
+        file_data: FileData | PreparedDocument,
+        scale: str | None,
+        focus_areas: list[str] | None,
+        scale_task: "asyncio.Future[ScaleDetectionResult] | None" = None,
+        render_profile: str | None = None,
+    ) -> tuple[TakeoffResult, bool]:
+        """Run the full takeoff, fanning multi-page PDFs out per page.
+
+        Returns:
+            The result, and whether every page succeeded (partial results
+            should not be cached)
+        """
+        document = PreparedDocument.of(file_data)
+        pages = await TakeoffService.prepare_pages(document, render_profile)
+        if len(pages) <= 1:
+            result = await TakeoffService.run_file(
+                TakeoffService.file_document(document, pages), scale, focus_areas, scale_task,
+                vector_data=document.data,
+            )
+            return result, True
+
+        page_results = [
+            page_result
+            async for page_result in TakeoffService.iter_pages(
+                pages, scale, focus_areas, scale_task
+            )
+        ]
+        complete = not any(isinstance(result, Exception) for _, result in page_results)
+        return TakeoffService.merge_results(page_results, len(pages)), complete
+
+    @staticmethod
+    def tag_page(result: TakeoffResult, page_number: int) -> TakeoffResult:
+        """Prefix each item's location with its page number."""
+        prefix = f"Page {page_number}"
+        items = [
+            item.model_copy(update={
+                "location": f"{prefix} - {item.location}" if item.location else prefix,
+            })
+            for item in result.items
+        ]
+        return result.model_copy(update={"items": items, "page_count": 1})
+
+    @staticmethod
+    def merge_results(
+        page_results: list[tuple[int, TakeoffResult | Exception]],
+        page_count: int,
+    ) -> TakeoffResult:
+        """Merge per-page results into one result.
+
+        Items are concatenated in page order, totals are recomputed over all
+        of them and notes are prefixed with their page. Failed pages are reported in the
+        notes; if every page failed the first error is raised.
+
+        Args:
+            page_results: (page_number, result or exception) pairs in any order
+            page_count: Total number of pages in the document
+        """
+        succeeded = sorted(
+            (pair for pair in page_results if not isinstance(pair[1], Exception)),
+            key=lambda pair: pair[0],
+        )
+        failed = sorted(
+            (pair for pair in page_results if isinstance(pair[1], Exception)),
+            key=lambda pair: pair[0],
+        )
+        if not succeeded and failed:
+            raise failed[0][1]
+
+        items: list[TakeoffItem] = []
+        notes: list[str] = []
+        scales: list[str] = []
+
+        for page_number, result in succeeded:
+            items.extend(result.items)
+            notes.extend(f"Page {page_number}: {note}" for note in result.notes)
+            if result.scale_used and result.scale_used not in scales:
+                scales.append(result.scale_used)
+
+        for page_number, error in failed:
+            notes.append(f"Page {page_number}: analysis failed ({error})")
+
+        summary, type_totals = SummaryService.summarize(items)
+        return TakeoffResult(
+            items=items,
+            summary=summary,
+            type_totals=type_totals,
+            notes=notes,
+            scale_used=", ".join(scales) if scales else None,
+            page_count=page_count,
+        )
@@ -0,0 +1,35 @@
+import mmap
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+# Import python_api and benchmarks from the repository root however pytest is invoked
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+# Agents are built on first use and need a key; tests never reach the real API
+os.environ.setdefault("GOOGLE_API_KEY", "test")
+
+
+@pytest.fixture
+def anyio_backend() -> str:
+    # Async tests (marked anyio) run on asyncio, like the API
+    return "asyncio"
+
+
+@pytest.fixture
+def spooled(tmp_path):
+    """Map bytes read-only from a file, like a download spooled to disk."""
+    maps = []
+
+    def spool(data: bytes) -> mmap.mmap:
+        path = tmp_path / f"spool-{len(maps)}"
+        path.write_bytes(data)
+        with open(path, "rb") as file:
+            maps.append(mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ))
+        return maps[-1]
+
+    yield spool
+    for mapped in maps:
+        mapped.close()
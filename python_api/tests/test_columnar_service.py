@@ -0,0 +1,93 @@
+import pytest
+
+from python_api.models import MeasurementCategory, TakeoffItem, TakeoffResult
+from python_api.services import ColumnarService
+from python_api.services import columnar_service
+
+msgpack = pytest.importorskip("msgpack")
+pytest.importorskip("numpy")
+
+JSON = columnar_service.JSON_MEDIA_TYPE
+MSGPACK = columnar_service.MSGPACK_MEDIA_TYPE
+
+
+def result(count: int = 3) -> TakeoffResult:
+    items = [
+        TakeoffItem(
+            name=f"Wall type {i % 2}",
+            category=MeasurementCategory.LINEAR if i % 2 else MeasurementCategory.COUNT,
+            quantity=i * 1.25,
+            unit="LF" if i % 2 else "ea",
+            location=None if i % 3 else f"Room {i}",
+            notes=f"note {i}" if i % 2 else None,
+            confidence=0.9,
+        )
+        for i in range(count)
+    ]
+    return TakeoffResult(items=items, summary={"linear_lf": 1.25}, notes=["checked"], page_count=2)
+
+
+@pytest.mark.parametrize("accept, expected", [
+    (None, JSON),
+    ("", JSON),
+    ("application/json", JSON),
+    ("application/msgpack", MSGPACK),
+    ("application/x-msgpack", MSGPACK),
+    ("application/json, application/msgpack", MSGPACK),
+    ("application/json;q=1.0, application/msgpack;q=0.8", JSON),
+    ("application/msgpack;q=0.9, */*;q=0.5", MSGPACK),
+    ("application/msgpack;q=0", JSON),
+    ("application/msgpack;q=abc", JSON),
+    ("text/html", JSON),
+])
+def test_negotiate_q_values(accept, expected):
+    assert ColumnarService.negotiate(accept) == expected
+
+
+def test_negotiate_without_msgpack_is_json(monkeypatch):
+    monkeypatch.setattr(columnar_service, "msgpack", None)
+    assert ColumnarService.negotiate("application/msgpack") == JSON
+
+
+def test_encoded_result_round_trips():
+    original = result()
+    body = msgpack.unpackb(ColumnarService.encode_result(original))
+
+    assert body["items"]["format"] == columnar_service.COLUMNAR_FORMAT
+    assert body["items"]["length"] == 3
+    assert (body["summary"], body["notes"], body["page_count"]) == ({"linear_lf": 1.25}, ["checked"], 2)
+    assert ColumnarService.decode_items(body["items"]) == [
+        item.model_dump(mode="json", include=set(columnar_service.ITEM_COLUMNS)) for item in original.items
+    ]
+
+
+def test_stored_json_encodes_like_the_models():
+    original = result()
+    from_models = ColumnarService.result_columns(original)
+    from_json = ColumnarService.stored_result_columns(original.model_dump_json())
+    assert from_json == from_models
+
+    stored_items = [item.model_dump_json() for item in original.items]
+    assert ColumnarService.stored_item_columns(stored_items) == from_models["items"]
+
+
+def test_repeated_strings_are_stored_once():
+    columns = ColumnarService.result_columns(result(10))["items"]["columns"]
+    assert columns["name"]["dictionary"] == ["Wall type 0", "Wall type 1"]
+    assert columns["category"]["dictionary"] == ["count", "linear"]
+    assert len(columns["name"]["codes"]) == 10
+
+
+@pytest.mark.parametrize("distinct, dtype", [(1, "<u1"), (256, "<u2"), (70000, "<u4")])
+def test_code_width_fits_the_dictionary(distinct, dtype):
+    items = [{"name": str(i), "category": "count", "unit": "ea", "location": None,
+              "quantity": 1.0, "confidence": 0.8, "notes": None} for i in range(distinct)]
+    columns = ColumnarService.item_columns(items)
+    assert columns["columns"]["name"]["dtype"] == dtype
+    assert ColumnarService.decode_items(columns)[-1]["name"] == str(distinct - 1)
+
+
+def test_empty_result():
+    body = msgpack.unpackb(ColumnarService.encode_result(TakeoffResult()))
+    assert body["items"]["length"] == 0
+    assert ColumnarService.decode_items(body["items"]) == []
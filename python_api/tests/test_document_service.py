@@ -0,0 +1,131 @@
+import asyncio
+import hashlib
+
+import pytest
+from pydantic_ai.messages import BinaryContent, DocumentUrl, ImageUrl
+
+from python_api.services import FileStore, PreparedDocument, StageTimer, current_timer
+from python_api.services.document_service import LocalFileStore
+
+PDF = b"%PDF-1.7\n" + b"0" * 1000
+PNG = b"\x89PNG\r\n\x1a\n" + b"0" * 1000
+
+
+class CountingStore(LocalFileStore):
+    """The local store, counting upload calls and taking a moment over each."""
+
+    def __init__(self, error: Exception | None = None):
+        super().__init__()
+        self.calls = 0
+        self.error = error
+
+    async def upload(self, data, media_type: str, digest: str) -> str:
+        self.calls += 1
+        await asyncio.sleep(0.01)
+        if self.error is not None:
+            raise self.error
+        return await super().upload(data, media_type, digest)
+
+
+@pytest.fixture
+def store(monkeypatch) -> CountingStore:
+    store = CountingStore()
+    monkeypatch.setattr(PreparedDocument, "store", store)
+    return store
+
+
+@pytest.mark.parametrize("data, file_type", [(PDF, "pdf"), (PNG, "png"), (b"\xff\xd8\xff", "jpeg"), (b"GIF89a", "unknown")])
+def test_type_is_sniffed_once(data, file_type):
+    document = PreparedDocument(data)
+    assert document.info == {"file_type": file_type, "size": len(data)}
+
+
+def test_of_passes_prepared_documents_through():
+    document = PreparedDocument(PDF)
+    assert PreparedDocument.of(document) is document
+    assert PreparedDocument.of(PDF).data is PDF
+
+
+def test_digest_is_computed_once():
+    document = PreparedDocument(PDF)
+    assert document.digest() == hashlib.sha256(PDF).hexdigest()
+    assert document._digest is not None
+
+
+def test_inline_content_is_shared_and_encoded_once():
+    document = PreparedDocument(PNG)
+    content = document.content()
+    assert isinstance(content, BinaryContent)
+    assert document.content() is content
+    assert content.data_uri is content.data_uri
+    assert content.data_uri.startswith("data:image/png;base64,")
+
+
+def test_production_has_no_file_store():
+    assert PreparedDocument.store is None
+
+
+def test_file_store_is_abstract():
+    with pytest.raises(TypeError):
+        FileStore()
+
+
+@pytest.mark.anyio
+async def test_without_a_store_upload_does_nothing():
+    document = PreparedDocument(PDF)
+    await document.upload()
+    assert document.handle is None
+    assert isinstance(document.content(), BinaryContent)
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize("data, reference", [(PDF, DocumentUrl), (PNG, ImageUrl)])
+async def test_uploaded_document_is_sent_by_handle(store, data, reference):
+    document = PreparedDocument(data)
+    timer = StageTimer("test")
+    token = current_timer.set(timer)
+    try:
+        await document.upload()
+    finally:
+        current_timer.reset(token)
+
+    content = document.content()
+    assert isinstance(content, reference)
+    assert content.url == f"local-file://{document.digest()}"
+    assert store.get(content.url) == data
+    assert timer.upstream_bytes == {"file_upload": len(data)}
+
+
+@pytest.mark.anyio
+async def test_concurrent_uploads_share_one(store):
+    document = PreparedDocument(PDF)
+    await asyncio.gather(*(document.upload() for _ in range(5)))
+    await document.upload()
+    assert store.calls == 1
+
+
+@pytest.mark.anyio
+async def test_cancelled_caller_doesnt_cancel_the_upload(store):
+    document = PreparedDocument(PDF)
+    leaving = asyncio.create_task(document.upload())
+    await asyncio.sleep(0)
+    leaving.cancel()
+    await document.upload()
+    assert document.handle is not None
+    assert store.calls == 1
+
+
+@pytest.mark.anyio
+async def test_same_content_is_stored_once(store):
+    await PreparedDocument(PDF).upload()
+    await PreparedDocument(PDF).upload()
+    assert (store.calls, store.uploads) == (2, 1)
+
+
+@pytest.mark.anyio
+async def test_failed_upload_falls_back_to_inline(monkeypatch):
+    monkeypatch.setattr(PreparedDocument, "store", CountingStore(RuntimeError("quota")))
+    document = PreparedDocument(PDF)
+    await document.upload()
+    assert document.handle is None
+    assert isinstance(document.content(), BinaryContent)
@@ -0,0 +1,116 @@
+import pytest
+
+from benchmarks.samples import build_pdf
+from python_api.models import MeasurementCategory, ScaleInfo
+from python_api.services import GeometryService
+from python_api.services.geometry_service import _tokenize
+
+pytest.importorskip("numpy")
+pytest.importorskip("pypdf")
+
+# 1/4" = 1'-0": 18 page units per foot
+QUARTER_INCH = ScaleInfo(scale_string="1/4\" = 1'-0\"")
+
+
+def geometry(content: bytes):
+    [page] = GeometryService.extract_stream(content)
+    return page
+
+
+def test_tokenizer_parses_numbers_and_operators():
+    tokens = _tokenize(b"12 -3.5 .25 +4 m 0.125 1.0 l S")
+    assert tokens.numbers.tolist() == [12, -3.5, 0.25, 4, 0.125, 1.0]
+    assert [tokens.token(t) for t in tokens.op_tokens] == [b"m", b"l", b"S"]
+    assert tokens.op_numbers.tolist() == [4, 6, 6]
+
+
+def test_tokenizer_skips_numbers_in_strings_comments_and_names():
+    tokens = _tokenize(b"BT (Room 101) Tj <3132> Tj ET % 99 99 l\n/F1 12 Tf 5 w")
+    assert tokens.numbers.tolist() == [12, 5]
+
+
+def test_stroked_segment_lengths():
+    page = geometry(b"0 0 m 30 40 l 30 100 l S")
+    assert sorted(page.lengths.tolist()) == [50, 60]
+
+
+def test_unpainted_paths_arent_measured():
+    page = geometry(b"0 0 m 100 0 l n 0 0 100 100 re W n")
+    assert not len(page.lengths) and not len(page.areas)
+
+
+def test_rectangle_shoelace_area_and_perimeter():
+    page = geometry(b"10 10 180 90 re S")
+    assert page.areas.tolist() == [180 * 90]
+    assert page.lengths.sum() == 2 * (180 + 90)
+
+
+def test_filled_polygon_is_closed_for_its_area():
+    # A right triangle, filled without an explicit close
+    page = geometry(b"0 0 m 60 0 l 0 40 l f")
+    assert page.areas.tolist() == [1200]
+    assert not len(page.lengths)
+
+
+def test_transform_applies_to_coordinates_and_line_width():
+    page = geometry(b"q 2 0 0 2 0 0 cm 1 w 0 0 10 10 re S Q")
+    assert page.areas.tolist() == [400]
+    assert page.styles[page.area_styles[0]].width == 2
+
+
+def test_styles_separate_by_width_and_color_and_restore():
+    page = geometry(b"q 2 w 1 0 0 RG 0 0 m 10 0 l S Q 0 0 m 20 0 l S")
+    styles = [page.styles[i] for i in page.length_styles]
+    assert [s.describe() for s in styles] == ["2 pt, rgb(1, 0, 0)", "1 pt, black"]
+
+
+def test_measure_groups_by_style_in_feet():
+    content = b"2 w 0 0 m 180 0 l S 0.5 w 0 0 360 180 re S"
+    items = GeometryService.measure(build_pdf([content]), QUARTER_INCH)
+
+    linear = {item.name: item.quantity for item in items if item.category == MeasurementCategory.LINEAR}
+    area = [item for item in items if item.category == MeasurementCategory.AREA]
+    assert linear == {"Stroked linework (2 pt, black)": 10, "Stroked linework (0.5 pt, black)": 60}
+    assert [(item.quantity, item.unit) for item in area] == [(200, "SF")]
+    assert all(item.location is None for item in items)
+
+
+def test_measure_locates_items_by_page_on_multi_page_sets():
+    pdf = build_pdf([b"0 0 m 180 0 l S", b"0 0 m 360 0 l S"])
+    items = GeometryService.measure(pdf, QUARTER_INCH)
+    assert [(item.location, item.quantity) for item in items] == [("Page 1", 10), ("Page 2", 20)]
+
+
+def test_measure_drops_tiny_groups_and_non_pdfs():
+    assert GeometryService.measure(build_pdf([b"0 0 m 9 0 l S"]), QUARTER_INCH) == []
+    assert GeometryService.measure(b"\x89PNG\r\n", QUARTER_INCH) == []
+
+
+def test_pixels_per_foot_prefers_the_notation():
+    assert GeometryService.pixels_per_foot(QUARTER_INCH) == 18
+    assert GeometryService.pixels_per_foot(ScaleInfo(scale_string="1/8\" = 1'-0\"", pixels_per_foot=48)) == 9
+    assert GeometryService.pixels_per_foot(ScaleInfo(scale_string="as noted", pixels_per_foot=48)) == 48
+    assert GeometryService.pixels_per_foot(ScaleInfo(scale_string="NTS")) is None
+
+
+def test_group_ids():
+    assert [GeometryService.group_id(i) for i in range(3)] == ["V1", "V2", "V3"]
+
+
+@pytest.mark.parametrize("content", [b"m l S", b"q Q Q 0 0 m", b"re f", b"0 0 m 10 0 l"])
+def test_malformed_content_doesnt_raise(content):
+    GeometryService.extract_stream(content)
+
+
+def test_unreadable_page_only_loses_its_own_measurements(monkeypatch):
+    extract = GeometryService.extract_stream
+
+    def fail_on_marker(content, *args, **kwargs):
+        if b"360" in content:
+            raise IndexError("bad stream")
+        return extract(content, *args, **kwargs)
+
+    monkeypatch.setattr(GeometryService, "extract_stream", staticmethod(fail_on_marker))
+    pdf = build_pdf([b"0 0 m 180 0 l S", b"0 0 m 360 0 l S"])
+    items = GeometryService.measure(pdf, QUARTER_INCH)
+    assert [(item.location, item.quantity) for item in items] == [("Page 1", 10)]
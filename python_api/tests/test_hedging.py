@@ -0,0 +1,117 @@
+import asyncio
+
+import pytest
+
+from python_api.agents import Hedger
+from python_api.agents import hedging
+
+pytestmark = pytest.mark.anyio
+
+
+def primed(budget: float = 1.0, latency: float = 0.01) -> Hedger:
+    """A hedger that has seen enough fast calls to start hedging."""
+    hedger = Hedger("test", budget=budget)
+    hedger.latencies.extend([latency] * hedging.HEDGE_MIN_SAMPLES)
+    return hedger
+
+
+class Attempts:
+    """Each call starts the next attempt: a (delay, result) pair, raised if an exception."""
+
+    def __init__(self, *attempts):
+        self.attempts = list(attempts)
+        self.started = 0
+        self.cancelled = 0
+
+    async def __call__(self):
+        delay, result = self.attempts[self.started]
+        self.started += 1
+        try:
+            await asyncio.sleep(delay)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        if isinstance(result, BaseException):
+            raise result
+        return result
+
+
+async def test_no_hedging_until_there_are_enough_samples():
+    hedger = Hedger("test", budget=1.0)
+    attempts = Attempts((0.05, "primary"))
+    assert hedger.delay() is None
+    assert await hedger.run(attempts) == "primary"
+    assert attempts.started == 1
+
+
+async def test_fast_call_isnt_hedged():
+    hedger = primed(latency=0.05)
+    attempts = Attempts((0, "primary"))
+    assert await hedger.run(attempts) == "primary"
+    assert hedger.stats()["fired"] == 0
+
+
+async def test_hedge_wins_and_the_slow_primary_is_cancelled():
+    hedger = primed()
+    attempts = Attempts((10, "primary"), (0, "hedge"))
+
+    assert await hedger.run(attempts) == "hedge"
+    await asyncio.sleep(0)
+    assert attempts.cancelled == 1
+    assert hedger.stats() | {"delay": None} == {
+        "requests": 1, "fired": 1, "won": 1, "over_budget": 0, "delay": None, "budget": 1.0,
+    }
+
+
+async def test_primary_still_wins_if_it_finishes_first():
+    hedger = primed()
+    attempts = Attempts((0.05, "primary"), (10, "hedge"))
+
+    assert await hedger.run(attempts) == "primary"
+    assert hedger.stats()["won"] == 0
+
+
+async def test_budget_limits_hedges_per_request():
+    hedger = primed(budget=0.5)
+    first = Attempts((0.03, "primary"), (0, "hedge"))
+    assert await hedger.run(first) == "primary"
+    assert first.started == 1
+
+    # Two requests in, one duplicate fits the budget
+    second = Attempts((0.03, "primary"), (0, "hedge"))
+    assert await hedger.run(second) == "hedge"
+    stats = hedger.stats()
+    assert (stats["requests"], stats["fired"], stats["over_budget"]) == (2, 1, 1)
+
+
+async def test_zero_budget_disables_hedging():
+    hedger = primed(budget=0)
+    attempts = Attempts((0.03, "primary"))
+    assert await hedger.run(attempts) == "primary"
+    assert hedger.stats()["over_budget"] == 0
+
+
+async def test_failed_attempt_waits_for_the_other():
+    hedger = primed()
+    attempts = Attempts((0.03, ValueError("primary failed")), (0.05, "hedge"))
+    assert await hedger.run(attempts) == "hedge"
+
+
+async def test_all_attempts_failing_raises_the_first_error():
+    hedger = primed()
+    attempts = Attempts((0.03, ValueError("primary")), (0.01, ValueError("hedge")))
+    with pytest.raises(ValueError, match="primary"):
+        await hedger.run(attempts)
+
+
+async def test_cancelled_attempt_is_skipped_for_the_real_error():
+    hedger = primed()
+    attempts = Attempts((0.02, asyncio.CancelledError()), (0.05, ValueError("hedge")))
+    with pytest.raises(ValueError, match="hedge"):
+        await hedger.run(attempts)
+
+
+async def test_cancelled_attempt_doesnt_stop_the_other_succeeding():
+    hedger = primed()
+    attempts = Attempts((0.02, asyncio.CancelledError()), (0.05, "hedge"))
+    assert await hedger.run(attempts) == "hedge"
@@ -0,0 +1,93 @@
+import time
+
+import pytest
+
+from python_api.models import TakeoffItem, TakeoffRequest, TakeoffResult
+from python_api.services import JobStore
+
+pytestmark = pytest.mark.anyio
+
+REQUEST = TakeoffRequest(blueprint_url="https://example.com/plan.pdf")
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = JobStore(str(tmp_path / "jobs.sqlite3"), ttl_seconds=60)
+    yield store
+    store.close()
+
+
+def item(name: str) -> TakeoffItem:
+    return TakeoffItem(name=name, category="count", quantity=1, unit="ea")
+
+
+async def test_create_and_get(store):
+    job = await store.create(REQUEST)
+    assert job["status"] == "queued"
+    assert job["blueprint_url"] == REQUEST.blueprint_url
+    assert (await store.get(job["id"]))["id"] == job["id"]
+    assert await store.get_request(job["id"]) == REQUEST
+    assert await store.get("missing") is None
+
+
+async def test_items_are_numbered_and_read_after_a_sequence(store):
+    job = await store.create(REQUEST)
+    await store.add_items(job["id"], [item("Door"), item("Window")])
+    await store.add_items(job["id"], [item("Outlet")])
+
+    items = await store.items(job["id"])
+    assert [seq for seq, _ in items] == [1, 2, 3]
+    assert [TakeoffItem.model_validate_json(data).name for _, data in await store.items(job["id"], after=2)] == ["Outlet"]
+    assert (await store.get(job["id"]))["item_count"] == 3
+
+
+async def test_succeed_stores_result_and_drops_partial_items(store):
+    job = await store.create(REQUEST)
+    await store.update(job["id"], status="running", progress=40, message="Analyzing")
+    await store.add_items(job["id"], [item("Door")])
+    await store.succeed(job["id"], TakeoffResult(items=[item("Door"), item("Window")]))
+
+    row = await store.get(job["id"])
+    assert (row["status"], row["progress"], row["item_count"]) == ("succeeded", 100, 2)
+    assert len(TakeoffResult.model_validate_json(row["result"]).items) == 2
+    assert await store.items(job["id"]) == []
+
+
+async def test_update_keeps_fields_not_given(store):
+    job = await store.create(REQUEST)
+    await store.update(job["id"], status="running", progress=30, message="Fetching")
+    await store.update(job["id"], progress=60)
+
+    row = await store.get(job["id"])
+    assert (row["status"], row["progress"], row["message"]) == ("running", 60, "Fetching")
+
+
+async def test_fail_stale_only_fails_jobs_without_progress(store):
+    stale = await store.create(REQUEST)
+    live = await store.create(REQUEST)
+    done = await store.create(REQUEST)
+    await store.succeed(done["id"], TakeoffResult())
+    store._execute("UPDATE jobs SET updated_at = ? WHERE id IN (?, ?)", (time.time() - 600, stale["id"], done["id"]))
+
+    assert await store.fail_stale(300, "restarted") == 1
+    row = await store.get(stale["id"])
+    assert (row["status"], row["error_code"]) == ("failed", "INTERRUPTED")
+    assert (await store.get(live["id"]))["status"] == "queued"
+    assert (await store.get(done["id"]))["status"] == "succeeded"
+
+
+async def test_touch_keeps_running_jobs_fresh(store):
+    job = await store.create(REQUEST)
+    store._execute("UPDATE jobs SET updated_at = ? WHERE id = ?", (time.time() - 600, job["id"]))
+    await store.touch([job["id"]])
+
+    assert await store.fail_stale(300, "restarted") == 0
+
+
+async def test_finished_jobs_past_ttl_are_pruned(store):
+    old = await store.create(REQUEST)
+    await store.fail(old["id"], "boom")
+    store._execute("UPDATE jobs SET updated_at = ? WHERE id = ?", (time.time() - 120, old["id"]))
+
+    await store.create(REQUEST)
+    assert await store.get(old["id"]) is None
@@ -0,0 +1,52 @@
+import pytest
+
+from benchmarks.samples import build_pdf, floor_plan_pdf, scanned_plan_pdf
+from python_api.services import FileService, RasterService
+from python_api.services.raster_service import RENDER_PROFILES, fit_scale, pdfium_input
+
+pytest.importorskip("pypdfium2")
+pytest.importorskip("PIL")
+
+FAST = RENDER_PROFILES["fast"]
+
+
+def test_fit_scale_keeps_the_pixel_budget():
+    assert fit_scale(100, 100, 2.0, 1_000_000) == 2.0
+    scale = fit_scale(2592, 1728, 150 / 72, 4_000_000)
+    assert 2592 * scale * 1728 * scale == pytest.approx(4_000_000)
+
+
+def test_renders_every_page():
+    pages = RasterService.render_pdf_pages(floor_plan_pdf(pages=2, segments=50, rooms=2), FAST)
+    assert [page.page_number for page in pages] == [1, 2]
+    assert all(page.media_type == "image/png" for page in pages)
+    # pdfium rounds the bitmap size up to whole pixels
+    assert all(page.width_px * page.height_px <= FAST.max_pixels * 1.001 for page in pages)
+
+
+def test_renders_a_spooled_download_like_bytes(spooled):
+    data = floor_plan_pdf(pages=2, segments=50, rooms=2)
+    from_map = RasterService.render_pdf_pages(spooled(data), FAST)
+    assert [page.image_data for page in from_map] == [page.image_data for page in RasterService.render_pdf_pages(data, FAST)]
+
+
+def test_vector_pages_keep_their_pdf(spooled):
+    data = spooled(build_pdf([b"0 0 m 100 0 l S"]))
+    pages = FileService.split_pdf_pages(data)
+    [page] = RasterService.render_pdf_pages(data, FAST, pages)
+    assert page.image_data is None and page.pdf_data == pages[0].pdf_data
+
+
+def test_scanned_pages_are_rendered_from_a_spooled_download(spooled):
+    data = spooled(scanned_plan_pdf())
+    [page] = RasterService.render_pdf_pages(data, FAST, FileService.split_pdf_pages(data))
+    assert page.image_data is not None
+
+
+def test_pdfium_input_streams_memory_maps(spooled):
+    data = build_pdf([b"0 0 m 100 0 l S"])
+    assert pdfium_input(data) is data
+    stream = pdfium_input(spooled(data))
+    assert stream.seek(0, 2) == len(data)
+    stream.seek(0)
+    assert stream.read() == data
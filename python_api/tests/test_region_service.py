@@ -0,0 +1,52 @@
+import pytest
+
+from benchmarks.samples import E_SHEET_SIZE, build_pdf, floor_plan_content, floor_plan_pdf, scanned_plan_png
+from python_api.services.region_service import RegionService
+
+pytest.importorskip("pypdfium2")
+pytest.importorskip("PIL")
+
+
+def plan(scale_note: bool = True) -> bytes:
+    """An E-size sheet with the scale in its title block and, optionally, a scale note on the drawing."""
+    content = floor_plan_content(1, segments=50, rooms=2, size=E_SHEET_SIZE)
+    if scale_note:
+        content += b"\nBT /F1 12 Tf 1 0 0 1 200 1800 Tm (PLAN  SCALE: 1/8\" = 1'-0\") Tj ET"
+    return build_pdf([content], size=E_SHEET_SIZE)
+
+
+def test_crops_title_block_and_scale_text():
+    crops = RegionService.crop_pdf(plan())
+    assert [crop.name for crop in crops] == ["title_block", "scale_text"]
+    assert all(crop.image_data.startswith(b"\x89PNG") for crop in crops)
+
+
+def test_scale_text_in_the_title_block_isnt_cropped_twice():
+    assert [crop.name for crop in RegionService.crop_pdf(plan(scale_note=False))] == ["title_block"]
+
+
+def test_crops_a_spooled_download(spooled):
+    data = plan()
+    from_map = RegionService.scale_regions(spooled(data))
+    assert [crop.image_data for crop in from_map] == [crop.image_data for crop in RegionService.crop_pdf(data)]
+
+
+def test_crops_the_title_block_of_a_scan():
+    [crop] = RegionService.scale_regions(scanned_plan_png(width=1200, height=800))
+    assert crop.name == "title_block"
+    assert (crop.width_px, crop.height_px) == (360, 240)
+
+
+@pytest.mark.parametrize("data", [b"%PDF-1.7\nnot really a pdf", b"neither a pdf nor an image"])
+def test_unreadable_files_have_no_regions(data, caplog):
+    assert RegionService.scale_regions(data) == []
+    assert "Could not crop scale regions" in caplog.text
+
+
+def test_other_errors_arent_hidden(monkeypatch):
+    def broken(data, page_index=0):
+        raise AttributeError("bug")
+
+    monkeypatch.setattr(RegionService, "crop_pdf", staticmethod(broken))
+    with pytest.raises(AttributeError):
+        RegionService.scale_regions(floor_plan_pdf(segments=1, rooms=1))
@@ -0,0 +1,120 @@
+import asyncio
+
+import pytest
+
+from python_api.services import ReplayService, StreamService
+from python_api.services import replay_service
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture(autouse=True)
+async def clean_registry(monkeypatch):
+    monkeypatch.setattr(ReplayService, "_stats", dict.fromkeys(ReplayService._stats, 0))
+    yield
+    await ReplayService.shutdown()
+
+
+def event(n: int) -> str:
+    return StreamService.format_sse("item", {"n": n})
+
+
+async def producer(count: int, release: asyncio.Event | None = None):
+    """Yield count events, pausing halfway until released."""
+    for n in range(count):
+        if release is not None and n == count // 2:
+            await release.wait()
+        yield event(n)
+
+
+async def collect(events, limit: int | None = None) -> list[str]:
+    out = []
+    async for e in events:
+        out.append(e)
+        if len(out) == limit:
+            break
+    return out
+
+
+def event_id(e: str) -> str:
+    return e.split("\n", 1)[0].removeprefix("id: ")
+
+
+async def test_events_are_tagged_with_stream_and_sequence():
+    session = ReplayService.start("key", producer(3))
+    events = await collect(ReplayService.subscribe(session))
+
+    assert [event_id(e) for e in events] == [f"{session.id}:{n}" for n in (1, 2, 3)]
+    assert events[0].endswith(event(0))
+
+
+async def test_resume_sends_only_events_after_last_event_id():
+    release = asyncio.Event()
+    session = ReplayService.start("key", producer(6, release))
+
+    # The client drops after two events
+    first = await collect(ReplayService.subscribe(session), limit=2)
+    release.set()
+
+    resumed = ReplayService.resume(event_id(first[-1]), "key")
+    assert resumed == (session, 2)
+    rest = await collect(ReplayService.subscribe(*resumed))
+    assert [event_id(e) for e in rest] == [f"{session.id}:{n}" for n in range(3, 7)]
+    assert ReplayService.stats()["resumed"] == 1
+
+
+async def test_resume_after_the_stream_finished():
+    session = ReplayService.start("key", producer(3))
+    await session.task
+
+    resumed = ReplayService.resume(f"{session.id}:1", "key")
+    assert len(await collect(ReplayService.subscribe(*resumed))) == 2
+
+
+@pytest.mark.parametrize("last_event_id", [None, "", "unknown:1", "{id}:x", "{id}"])
+async def test_resume_rejects_missing_or_malformed_ids(last_event_id):
+    session = ReplayService.start("key", producer(1))
+    if last_event_id:
+        last_event_id = last_event_id.format(id=session.id)
+    assert ReplayService.resume(last_event_id, "key") is None
+
+
+async def test_resume_rejects_another_requests_stream():
+    session = ReplayService.start("key", producer(1))
+    assert ReplayService.resume(f"{session.id}:0", "other") is None
+    assert ReplayService.stats()["expired_resumes"] == 1
+
+
+async def test_resume_past_dropped_events_reports_expiry(monkeypatch):
+    monkeypatch.setattr(replay_service, "REPLAY_MAX_STREAM_BYTES", len(event(0)) * 2)
+    session = ReplayService.start("key", producer(10))
+    await session.task
+
+    events = await collect(ReplayService.subscribe(session, after=1))
+    assert len(events) == 1
+    assert "RESUME_EXPIRED" in events[0]
+
+
+async def test_identical_running_request_joins_the_stream():
+    release = asyncio.Event()
+    session = ReplayService.start("key", producer(4, release))
+    await asyncio.sleep(0)
+
+    assert ReplayService.join("key") is session
+    assert ReplayService.join("other") is None
+    release.set()
+    await session.task
+    # A finished stream isn't joined; an identical request starts again
+    assert ReplayService.join("key") is None
+
+
+async def test_producer_failure_ends_the_stream_with_an_error():
+    async def failing():
+        yield event(0)
+        raise RuntimeError("boom")
+
+    session = ReplayService.start("key", failing())
+    events = await collect(ReplayService.subscribe(session))
+
+    assert len(events) == 2
+    assert "event: error" in events[1] and "boom" in events[1]
@@ -0,0 +1,84 @@
+import pytest
+
+from benchmarks.samples import build_pdf, floor_plan_content
+from python_api.services import ScaleParser
+
+
+def scale_strings(text: str) -> list[str]:
+    return [match.scale_string for match in ScaleParser.parse_text(text)]
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("SCALE: 1/4\" = 1'-0\"", "1/4\" = 1'-0\""),
+    ("1/8\"=1'-0\"", "1/8\" = 1'-0\""),
+    ("1 1/2\" = 1'-0\"", "1 1/2\" = 1'-0\""),
+    ("3/4 in = 1 ft", "3/4\" = 1'-0\""),
+    ("1\" = 20'", "1\" = 20'"),
+    ("1\" = 10'-6\"", "1\" = 10 1/2'"),
+    ("SCALE 1:100", "1:100"),
+])
+def test_parses_notations(text, expected):
+    assert scale_strings(text) == [expected]
+
+
+def test_pixels_per_foot_at_72_dpi():
+    quarter, = ScaleParser.parse_text("1/4\" = 1'-0\"")
+    assert quarter.pixels_per_foot == 18.0
+    metric, = ScaleParser.parse_text("SCALE 1:50")
+    assert metric.pixels_per_foot == pytest.approx(72 * 12 / 50, abs=1e-4)
+
+
+def test_labelled_notation_is_more_confident():
+    labelled, = ScaleParser.parse_text("SCALE: 1/4\" = 1'-0\"")
+    bare, = ScaleParser.parse_text("1/4\" = 1'-0\"")
+    assert labelled.labelled and not bare.labelled
+    assert labelled.confidence > bare.confidence
+
+
+@pytest.mark.parametrize("text", [
+    "12'-6\" = 1'-0\"",
+    "12' - 6\" = 1'-0\"",
+    "12' 6\" = 1'-0\"",
+])
+def test_dimension_is_not_a_scale(text):
+    # The 6" is the inches of a 12'-6" dimension, not the paper side of a scale
+    assert scale_strings(text) == []
+
+
+@pytest.mark.parametrize("text", ["1:7", "1:1", "10:100", "TIME 11:50", "0\" = 1'-0\""])
+def test_rejects_non_scales(text):
+    assert scale_strings(text) == []
+
+
+def test_matches_in_text_order():
+    assert scale_strings("PLAN 1:50 DETAIL 3/4\" = 1'-0\"") == ["1:50", "3/4\" = 1'-0\""]
+
+
+def test_pick_page_scale_prefers_labelled_and_refuses_ties():
+    matches = ScaleParser.parse_text("1/8\" = 1'-0\" 1/8\" = 1'-0\" SCALE: 1/4\" = 1'-0\"")
+    assert ScaleParser.pick_page_scale(matches).scale_string == "1/4\" = 1'-0\""
+
+    tied = ScaleParser.parse_text("1/8\" = 1'-0\" 1/4\" = 1'-0\"")
+    assert ScaleParser.pick_page_scale(tied) is None
+    assert ScaleParser.pick_page_scale([]) is None
+
+
+def test_detect_from_pdf_text_layer():
+    pdf = build_pdf([floor_plan_content(1, segments=10, rooms=1), floor_plan_content(2, segments=10, rooms=1)])
+    result = ScaleParser.detect_from_pdf(pdf)
+    assert result is not None
+    assert result.scale_info.scale_string == "1/4\" = 1'-0\""
+    assert result.scale_info.pixels_per_foot == 18.0
+    assert "page(s) 1, 2" in result.reasoning
+
+
+def test_detect_from_pdf_gives_up_when_sheets_disagree():
+    pdf = build_pdf([
+        floor_plan_content(1, segments=10, rooms=1, scale="1/4\" = 1'-0\""),
+        floor_plan_content(2, segments=10, rooms=1, scale="1/8\" = 1'-0\""),
+    ])
+    assert ScaleParser.detect_from_pdf(pdf) is None
+
+
+def test_detect_from_pdf_ignores_other_files():
+    assert ScaleParser.detect_from_pdf(b"\x89PNG\r\n\x1a\n") is None
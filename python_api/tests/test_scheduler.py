@@ -0,0 +1,151 @@
+import asyncio
+import time
+from email.utils import formatdate
+
+import httpx
+import pytest
+
+from python_api.agents import ModelScheduler
+from python_api.agents import scheduler as scheduler_module
+
+
+class ProviderError(Exception):
+    """A provider error carrying an HTTP status and response, like the SDK's."""
+
+    def __init__(self, status_code: int, headers: dict[str, str] | None = None):
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+        self.response = httpx.Response(status_code, headers=headers)
+
+
+def test_success_increases_limit_by_one_over_limit():
+    scheduler = ModelScheduler(limit=4, max_limit=8)
+    scheduler.record(0.5)
+    assert scheduler.limit == pytest.approx(4.25)
+    assert scheduler.stats()["successes"] == 1
+
+
+def test_increase_stops_at_max_limit():
+    scheduler = ModelScheduler(limit=7.9, max_limit=8)
+    for _ in range(5):
+        scheduler.record(0.5)
+    assert scheduler.limit == 8
+
+
+@pytest.mark.parametrize("status, counter", [(429, "throttled"), (500, "server_errors"), (503, "server_errors")])
+def test_throttling_and_server_errors_back_off(status, counter):
+    scheduler = ModelScheduler(limit=10)
+    scheduler.record(0.5, ProviderError(status))
+    assert scheduler.limit == pytest.approx(10 * scheduler_module.MODEL_BACKOFF)
+    assert scheduler.stats()[counter] == 1
+
+
+def test_client_errors_leave_limit_alone():
+    scheduler = ModelScheduler(limit=10)
+    scheduler.record(0.5, ProviderError(400))
+    scheduler.record(0.5, ValueError("bad output"))
+    assert scheduler.limit == 10
+
+
+def test_burst_of_failures_backs_off_once():
+    scheduler = ModelScheduler(limit=10)
+    for _ in range(5):
+        scheduler.record(0.5, ProviderError(429))
+    assert scheduler.limit == pytest.approx(10 * scheduler_module.MODEL_BACKOFF)
+    assert scheduler.stats()["throttled"] == 5
+
+
+def test_backoff_stops_at_min_limit():
+    scheduler = ModelScheduler(limit=1.2, min_limit=1)
+    scheduler.record(0.5, ProviderError(429))
+    assert scheduler.limit == 1
+
+
+def test_slow_response_counts_as_congestion():
+    scheduler = ModelScheduler(limit=10)
+    scheduler.record(1.0)
+    scheduler.record(1.0 * scheduler_module.MODEL_LATENCY_TOLERANCE + 1)
+    assert scheduler.stats()["slow"] == 1
+    assert scheduler.limit < 10
+
+
+@pytest.mark.anyio
+async def test_waiters_are_admitted_by_priority_then_arrival():
+    scheduler = ModelScheduler(limit=1)
+    await scheduler.acquire("interactive")
+    admitted = []
+
+    async def request(name: str, priority: str):
+        await scheduler.acquire(priority)
+        admitted.append(name)
+        scheduler.release()
+
+    tasks = []
+    for name, priority in [("bg", "background"), ("batch-1", "batch"), ("ui", "interactive"), ("batch-2", "batch")]:
+        tasks.append(asyncio.create_task(request(name, priority)))
+        await asyncio.sleep(0)
+    assert scheduler.stats()["queues"]["batch"]["waiting"] == 2
+
+    scheduler.release()
+    await asyncio.gather(*tasks)
+    assert admitted == ["ui", "batch-1", "batch-2", "bg"]
+    assert scheduler.in_flight == 0
+
+
+@pytest.mark.anyio
+async def test_cancelled_waiter_gives_up_its_place():
+    scheduler = ModelScheduler(limit=1)
+    await scheduler.acquire()
+    waiter = asyncio.create_task(scheduler.acquire())
+    await asyncio.sleep(0)
+
+    waiter.cancel()
+    await asyncio.gather(waiter, return_exceptions=True)
+    scheduler.release()
+    assert scheduler.in_flight == 0
+    assert sum(q["waiting"] for q in scheduler.stats()["queues"].values()) == 0
+
+
+@pytest.mark.anyio
+async def test_slot_records_the_outcome():
+    scheduler = ModelScheduler(limit=10)
+    with pytest.raises(ProviderError):
+        async with scheduler.slot():
+            raise ProviderError(429)
+    assert scheduler.stats()["throttled"] == 1
+    assert scheduler.in_flight == 0
+
+
+def test_retry_after_seconds():
+    assert ModelScheduler().retry_delay(ProviderError(429, {"Retry-After": "7"}), 0) == 7
+
+
+def test_retry_after_http_date():
+    when = formatdate(time.time() + 12, usegmt=True)
+    delay = ModelScheduler().retry_delay(ProviderError(503, {"Retry-After": when}), 0)
+    assert 10 <= delay <= 12
+
+
+def test_retry_after_on_the_cause():
+    error = RuntimeError("wrapped")
+    error.status_code = 429
+    error.__cause__ = ProviderError(429, {"Retry-After": "3"})
+    assert ModelScheduler().retry_delay(error, 0) == 3
+
+
+def test_exponential_backoff_without_retry_after():
+    scheduler = ModelScheduler()
+    assert [scheduler.retry_delay(ProviderError(429), attempt) for attempt in range(3)] == [1, 2, 4]
+    assert scheduler.stats()["retries"] == 3
+
+
+def test_retry_delay_is_capped(monkeypatch):
+    monkeypatch.setattr(scheduler_module, "MODEL_MAX_RETRY_DELAY", 5)
+    assert ModelScheduler().retry_delay(ProviderError(429, {"Retry-After": "120"}), 0) == 5
+
+
+def test_gives_up_after_max_retries_or_on_other_errors():
+    scheduler = ModelScheduler()
+    assert scheduler.retry_delay(ProviderError(429), scheduler_module.MODEL_MAX_RETRIES) is None
+    assert scheduler.retry_delay(ProviderError(500), 0) is None
+    assert scheduler.retry_delay(ValueError("bad output"), 0) is None
@@ -0,0 +1,106 @@
+import asyncio
+
+import pytest
+
+from python_api.services import SingleFlight
+
+pytestmark = pytest.mark.anyio
+
+
+class Work:
+    """Counts calls and blocks each one until released."""
+
+    def __init__(self, result="done"):
+        self.result = result
+        self.calls = 0
+        self.release = asyncio.Event()
+        self.cancelled = False
+
+    async def __call__(self):
+        self.calls += 1
+        try:
+            await self.release.wait()
+        except asyncio.CancelledError:
+            self.cancelled = True
+            raise
+        if isinstance(self.result, Exception):
+            raise self.result
+        return self.result
+
+
+async def test_concurrent_callers_share_one_call():
+    flight = SingleFlight("test")
+    work = Work()
+    callers = [asyncio.create_task(flight.run("key", work)) for _ in range(5)]
+    await asyncio.sleep(0)
+    work.release.set()
+
+    assert await asyncio.gather(*callers) == ["done"] * 5
+    assert work.calls == 1
+    assert flight.stats() == {"in_flight": 0, "started": 1, "joined": 4, "cancelled": 0}
+
+
+async def test_different_keys_run_separately():
+    flight = SingleFlight("test")
+    work = Work()
+    work.release.set()
+
+    await asyncio.gather(flight.run("a", work), flight.run("b", work))
+    assert work.calls == 2
+
+
+async def test_joiners_share_the_exception():
+    flight = SingleFlight("test")
+    work = Work(ValueError("boom"))
+    callers = [asyncio.create_task(flight.run("key", work)) for _ in range(3)]
+    await asyncio.sleep(0)
+    work.release.set()
+
+    results = await asyncio.gather(*callers, return_exceptions=True)
+    assert all(isinstance(r, ValueError) for r in results)
+    assert work.calls == 1
+
+
+async def test_one_waiter_leaving_doesnt_cancel_the_work():
+    flight = SingleFlight("test")
+    work = Work()
+    leaving = asyncio.create_task(flight.run("key", work))
+    staying = asyncio.create_task(flight.run("key", work))
+    await asyncio.sleep(0)
+
+    leaving.cancel()
+    await asyncio.sleep(0)
+    assert not work.cancelled
+    assert flight.stats()["in_flight"] == 1
+
+    work.release.set()
+    assert await staying == "done"
+    assert leaving.cancelled()
+
+
+async def test_last_waiter_leaving_cancels_the_work():
+    flight = SingleFlight("test")
+    work = Work()
+    callers = [asyncio.create_task(flight.run("key", work)) for _ in range(2)]
+    await asyncio.sleep(0)
+
+    for caller in callers:
+        caller.cancel()
+    await asyncio.gather(*callers, return_exceptions=True)
+    await asyncio.sleep(0)
+
+    assert work.cancelled
+    assert flight.stats() == {"in_flight": 0, "started": 1, "joined": 1, "cancelled": 1}
+
+
+async def test_a_new_call_starts_after_a_cancelled_one():
+    flight = SingleFlight("test")
+    work = Work()
+    caller = asyncio.create_task(flight.run("key", work))
+    await asyncio.sleep(0)
+    caller.cancel()
+    await asyncio.gather(caller, return_exceptions=True)
+
+    work.release.set()
+    assert await flight.run("key", work) == "done"
+    assert work.calls == 2
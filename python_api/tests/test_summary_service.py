@@ -0,0 +1,140 @@
+import pytest
+
+from python_api.models import MeasurementCategory, TakeoffItem, TakeoffOutput, VectorLabel
+from python_api.services import SummaryService
+
+
+def item(name: str, quantity: float, unit: str, category=MeasurementCategory.LINEAR, **fields) -> TakeoffItem:
+    return TakeoffItem(name=name, category=category, quantity=quantity, unit=unit, **fields)
+
+
+@pytest.mark.parametrize("category, quantity, unit, expected", [
+    (MeasurementCategory.LINEAR, 24, "in", 2),
+    (MeasurementCategory.LINEAR, 10, "m", 32.81),
+    (MeasurementCategory.LINEAR, 2, "yds.", 6),
+    (MeasurementCategory.AREA, 3, "sq. yd", 27),
+    (MeasurementCategory.AREA, 10, "m²", 107.64),
+    (MeasurementCategory.AREA, 2, "SQ", 200),
+    (MeasurementCategory.VOLUME, 54, "cu ft", 2),
+    (MeasurementCategory.VOLUME, 1, "m3", 1.31),
+])
+def test_units_are_converted_to_the_standard_unit(category, quantity, unit, expected):
+    normalized = SummaryService.normalize_item(item("Item", quantity, unit, category, notes="Level 1"))
+    assert normalized.quantity == expected
+    assert normalized.unit == {"linear": "LF", "area": "SF", "volume": "CY"}[category.value]
+    assert normalized.notes == f"Level 1; Converted from {quantity:g} {unit}"
+
+
+@pytest.mark.parametrize("unit, category", [
+    ("feet", MeasurementCategory.LINEAR),
+    ("sq ft", MeasurementCategory.AREA),
+    ("EACH", MeasurementCategory.COUNT),
+])
+def test_unit_spellings_are_renamed_without_a_note(unit, category):
+    normalized = SummaryService.normalize_item(item("Item", 5, unit, category))
+    assert normalized.quantity == 5
+    assert normalized.unit != unit and normalized.notes is None
+
+
+def test_unknown_and_standard_units_are_kept():
+    for unit, category in (("LF", MeasurementCategory.LINEAR), ("bundles", MeasurementCategory.COUNT)):
+        original = item("Item", 5, unit, category)
+        assert SummaryService.normalize_item(original) is original
+
+
+def test_merge_sums_duplicates_and_keeps_the_lowest_confidence():
+    merged = SummaryService.merge_items([
+        item("Interior Wall", 10, "LF", notes="A", confidence=0.9),
+        item("Door", 2, "ea", MeasurementCategory.COUNT),
+        item(" interior wall ", 5.5, "LF", notes="B", confidence=0.7),
+        item("Interior Wall", 1, "LF", notes="A", confidence=0.8),
+    ])
+    assert [(m.name, m.quantity, m.confidence, m.notes) for m in merged] == [
+        ("Interior Wall", 16.5, 0.7, "A; B"), ("Door", 2, 0.8, None),
+    ]
+
+
+def test_merge_keeps_locations_and_units_apart():
+    merged = SummaryService.merge_items([
+        item("Wall", 10, "LF", location="Floor 1"),
+        item("Wall", 10, "LF", location="Floor 2"),
+        item("Wall", 10, "bundles"),
+    ])
+    assert len(merged) == 3
+
+
+def test_summarize_totals_by_category_and_type():
+    summary, type_totals = SummaryService.summarize([
+        item("Interior Wall", 10.004, "LF"),
+        item("interior wall", 5, "LF"),
+        item("Flooring", 200, "SF", MeasurementCategory.AREA),
+    ])
+    assert summary == {"linear_lf": 15.0, "area_sf": 200}
+    assert type_totals == {"Interior Wall (LF)": 15.0, "Flooring (SF)": 200}
+
+
+def test_finalize_normalizes_before_merging():
+    output = TakeoffOutput(items=[item("Wall", 10, "LF"), item("Wall", 24, "in")], notes=["Checked"])
+    result = SummaryService.finalize(output, scale_used="1/4\" = 1'-0\"", page_count=2)
+    assert [(m.name, m.quantity, m.unit) for m in result.items] == [("Wall", 12, "LF")]
+    assert (result.summary, result.type_totals) == ({"linear_lf": 12}, {"Wall (LF)": 12})
+    assert (result.notes, result.page_count) == (["Checked"], 2)
+
+
+def linework(quantity: float, notes: str | None = "12 segments measured") -> TakeoffItem:
+    return TakeoffItem(
+        name="Stroked linework (0.5 pt, black)",
+        category=MeasurementCategory.LINEAR,
+        quantity=quantity,
+        unit="LF",
+        notes=notes,
+        confidence=0.95,
+    )
+
+
+def test_labels_name_vector_groups_by_id():
+    items = SummaryService.label_vector_items(
+        [linework(120), linework(40)],
+        [VectorLabel(group_id="V2", name="Interior Wall"), VectorLabel(group_id="V1", name="Exterior Wall")],
+    )
+    assert [(item.name, item.quantity, item.confidence) for item in items] == [
+        ("Exterior Wall", 120, 0.95), ("Interior Wall", 40, 0.95),
+    ]
+
+
+def test_skipped_groups_are_dropped():
+    items = SummaryService.label_vector_items(
+        [linework(120), linework(40)],
+        [VectorLabel(group_id="V1", name="Dimension strings", skip=True), VectorLabel(group_id="V2", name="Wall")],
+    )
+    assert [item.quantity for item in items] == [40]
+
+
+def test_unlabeled_groups_are_dropped():
+    items = SummaryService.label_vector_items(
+        [linework(120), linework(40)], [VectorLabel(group_id="V2", name="Wall")]
+    )
+    assert [(item.name, item.quantity) for item in items] == [("Wall", 40)]
+    assert SummaryService.label_vector_items([linework(40)], []) == []
+
+
+def test_labels_for_unknown_groups_are_ignored(caplog):
+    items = SummaryService.label_vector_items([linework(40)], [VectorLabel(group_id="V7", name="Wall")])
+    assert items == []
+    assert "V7" in caplog.text
+
+
+def test_finalize_adds_labeled_vector_items_to_the_models_items():
+    output = TakeoffOutput(
+        items=[TakeoffItem(name="Interior Wall", category=MeasurementCategory.LINEAR, quantity=10, unit="ft")],
+        vector_labels=[VectorLabel(group_id="V1", name="Interior Wall"), VectorLabel(group_id="V2", name="Hatch", skip=True)],
+    )
+    result = SummaryService.finalize(output, vector_items=[linework(120), linework(300), linework(80)])
+
+    assert [(item.name, item.quantity) for item in result.items] == [("Interior Wall", 130)]
+    assert result.summary == {"linear_lf": 130}
+
+
+def test_finalize_ignores_labels_without_vector_items():
+    output = TakeoffOutput(items=[], vector_labels=[VectorLabel(group_id="V1", name="Wall")])
+    assert SummaryService.finalize(output).items == []
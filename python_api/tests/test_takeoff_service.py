@@ -0,0 +1,73 @@
+import asyncio
+import json
+
+import pytest
+from pydantic_ai.messages import ModelResponse, ToolCallPart
+from pydantic_ai.models.function import AgentInfo, DeltaToolCall, FunctionModel
+
+from benchmarks.samples import build_pdf
+from python_api.agents import get_takeoff_agent
+from python_api.services import TakeoffService
+
+pytestmark = pytest.mark.anyio
+
+QUARTER_INCH = "1/4\" = 1'-0\""
+# Two line weights: 10 LF of heavy walls and 20 LF of light linework at 1/4" = 1'-0"
+PLAN = build_pdf([b"2 w 0 0 m 180 0 l S 0.5 w 0 0 m 360 0 l S"])
+
+OUTPUT = {
+    "items": [{"name": "Door", "category": "count", "quantity": 2, "unit": "ea"}],
+    "vector_labels": [{"group_id": "V1", "name": "Exterior Wall"}],
+}
+
+
+def model(calls_vector_tool: bool) -> FunctionModel:
+    """Writes OUTPUT, calling get_vector_measurements first if asked to."""
+    def call(messages, info: AgentInfo) -> tuple[str, dict]:
+        if calls_vector_tool and len(messages) == 1:
+            return "get_vector_measurements", {}
+        return info.output_tools[0].name, OUTPUT
+
+    async def respond(messages, info: AgentInfo) -> ModelResponse:
+        return ModelResponse(parts=[ToolCallPart(*call(messages, info))])
+
+    async def stream(messages, info: AgentInfo):
+        name, args = call(messages, info)
+        yield {0: DeltaToolCall(name=name, json_args=json.dumps(args))}
+
+    return FunctionModel(respond, stream_function=stream)
+
+
+async def test_labeled_vector_groups_are_added_to_the_result():
+    with get_takeoff_agent().override(model=model(calls_vector_tool=True)):
+        result = await TakeoffService.run_file(PLAN, QUARTER_INCH, None)
+
+    # V2 wasn't labeled, so only the heavy walls are taken off
+    assert [(item.name, item.quantity) for item in result.items] == [("Door", 2), ("Exterior Wall", 10)]
+    assert result.summary == {"count_ea": 2, "linear_lf": 10}
+
+
+async def test_nothing_is_measured_unless_the_model_asks():
+    with get_takeoff_agent().override(model=model(calls_vector_tool=False)):
+        result = await TakeoffService.run_file(PLAN, QUARTER_INCH, None)
+
+    assert [item.name for item in result.items] == ["Door"]
+
+
+async def test_run_doesnt_wait_for_a_scale_it_never_used():
+    scale_task = asyncio.get_running_loop().create_future()
+    with get_takeoff_agent().override(model=model(calls_vector_tool=False)):
+        result = await asyncio.wait_for(TakeoffService.run_file(PLAN, None, None, scale_task), timeout=5)
+
+    assert [item.name for item in result.items] == ["Door"]
+    assert not scale_task.done()
+    scale_task.cancel()
+
+
+async def test_stream_yields_the_labeled_vector_items():
+    with get_takeoff_agent().override(model=model(calls_vector_tool=True)):
+        streamed = [item async for item in TakeoffService.stream_file(PLAN, QUARTER_INCH, None)]
+
+    *items, result = streamed
+    assert [item.name for item in items] == ["Door", "Exterior Wall"]
+    assert TakeoffService.reconcile(items, result)
@@ -17,6 +17,9 @@ interface TakeoffStreamState {
   error: string | null;
 }
 
+// Reconnects attempted after a dropped connection before giving up
+const MAX_RESUME_ATTEMPTS = 3;
+
 interface UseTakeoffStreamOptions {
   apiUrl?: string;
 }
@@ -58,85 +61,122 @@ export function useTakeoffStream(options: UseTakeoffStreamOptions = {}) {
         error: null,
       });
 
-      try {
-        // Use /python (Python serverless via rewrite) in production, /takeoff in local dev
-        const endpoint = apiUrl ? `${apiUrl}/takeoff/stream` : "/python/takeoff/stream";
-        const response = await fetch(endpoint, {
-          method: "POST",
-          headers: {
-            "Content-Type": "application/json",
-          },
-          body: JSON.stringify({
-            blueprint_url: blueprintUrl,
-            scale: scale || null,
-            auto_detect_scale: !scale,
-          }),
-          signal: abortControllerRef.current.signal,
-        });
-
-        if (!response.ok) {
-          throw new Error(`HTTP error: ${response.status}`);
-        }
-
-        if (!response.body) {
-          throw new Error("No response body");
-        }
+      // Use /python (Python serverless via rewrite) in production, /takeoff in local dev
+      const endpoint = apiUrl ? `${apiUrl}/takeoff/stream` : "/python/takeoff/stream";
+      const body = JSON.stringify({
+        blueprint_url: blueprintUrl,
+        scale: scale || null,
+        auto_detect_scale: !scale,
+      });
+      const signal = abortControllerRef.current.signal;
 
-        setState((prev) => ({ ...prev, status: "streaming" }));
+      // Id of the last event received; a dropped connection resumes after it
+      let lastEventId = "";
+      let finished = false;
 
-        const reader = response.body.getReader();
-        const decoder = new TextDecoder();
-        let buffer = "";
+      for (let attempt = 0; ; attempt++) {
+        try {
+          const headers: Record<string, string> = {
+            "Content-Type": "application/json",
+          };
+          if (lastEventId) {
+            headers["Last-Event-ID"] = lastEventId;
+          }
 
-        while (true) {
-          const { done, value } = await reader.read();
+          const response = await fetch(endpoint, {
+            method: "POST",
+            headers,
+            body,
+            signal,
+          });
 
-          if (done) break;
+          if (!response.ok) {
+            throw new Error(`HTTP error: ${response.status}`);
+          }
 
-          buffer += decoder.decode(value, { stream: true });
+          if (!response.body) {
+            throw new Error("No response body");
+          }
 
-          // Parse SSE events
-          const lines = buffer.split("\n");
-          buffer = lines.pop() || "";
+          setState((prev) => ({ ...prev, status: "streaming" }));
 
+          const reader = response.body.getReader();
+          const decoder = new TextDecoder();
+          let buffer = "";
+          // Kept across reads so an event split between chunks isn't dropped
+          let eventId = "";
           let eventType = "";
           let eventData = "";
 
-          for (const line of lines) {
-            if (line.startsWith("event: ")) {
-              eventType = line.slice(7).trim();
-            } else if (line.startsWith("data: ")) {
-              eventData = line.slice(6);
-
-              if (eventType && eventData) {
-                try {
-                  const data = JSON.parse(eventData);
-                  handleEvent(eventType, data);
-                } catch {
-                  // Skip malformed JSON
+          while (true) {
+            const { done, value } = await reader.read();
+
+            if (done) break;
+
+            buffer += decoder.decode(value, { stream: true });
+
+            // Parse SSE events
+            const lines = buffer.split("\n");
+            buffer = lines.pop() || "";
+
+            for (const line of lines) {
+              if (line.startsWith("id: ")) {
+                eventId = line.slice(4).trim();
+              } else if (line.startsWith("event: ")) {
+                eventType = line.slice(7).trim();
+              } else if (line.startsWith("data: ")) {
+                eventData = line.slice(6);
+
+                if (eventType && eventData) {
+                  try {
+                    const data = JSON.parse(eventData);
+                    handleEvent(eventType, data);
+                  } catch {
+                    // Skip malformed JSON
+                  }
+                  if (eventId) {
+                    lastEventId = eventId;
+                  }
+                  if (eventType === "complete" || eventType === "error") {
+                    finished = true;
+                  }
+                  eventId = "";
+                  eventType = "";
+                  eventData = "";
                 }
-                eventType = "";
-                eventData = "";
               }
             }
           }
-        }
 
-        setState((prev) => ({
-          ...prev,
-          status: prev.error ? "error" : "complete",
-        }));
-      } catch (error) {
-        if ((error as Error).name === "AbortError") {
-          setState((prev) => ({ ...prev, status: "idle" }));
+          if (!finished && lastEventId && attempt < MAX_RESUME_ATTEMPTS) {
+            // Connection closed early; resume after the last event
+            continue;
+          }
+
+          setState((prev) => ({
+            ...prev,
+            status: prev.error ? "error" : "complete",
+          }));
           return;
-        }
+        } catch (error) {
+          if ((error as Error).name === "AbortError") {
+            setState((prev) => ({ ...prev, status: "idle" }));
+            return;
+          }
 
-        setState((prev) => ({
-          ...prev,
-          status: "error",
-          error: (error as Error).message || "Failed to connect",
-        }));
+          // Network drop mid-stream: the server keeps the analysis running
+          if (!finished && lastEventId && attempt < MAX_RESUME_ATTEMPTS) {
+            await new Promise((resolve) => setTimeout(resolve, 500 * 2 ** attempt));
+            continue;
+          }
+
+          setState((prev) => ({
+            ...prev,
+            status: "error",
+            error: (error as Error).message || "Failed to connect",
+          }));
+          return;
+        }
       }
     },
     [apiUrl]
@@ -170,6 +210,7 @@ export function useTakeoffStream(options: UseTakeoffStreamOptions = {}) {
           ...prev,
           status: "complete",
           summary: data as CompleteEvent,
+          items: (data as CompleteEvent).items ?? prev.items,
         }));
         break;
 
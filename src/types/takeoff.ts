@@ -71,4 +71,6 @@ export interface CompleteEvent {
   summary: Record<string, number>;
   notes: string[];
   scale_used?: string | null;
+  // Present only when the streamed items didn't match the final result
+  items?: TakeoffItem[];
 }